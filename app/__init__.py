@@ -6,11 +6,13 @@ from flask_cors import CORS
 from app.services.cloud_storage_client import CloudStorageClient
 import json
 from flask_migrate import Migrate  
-from app.clients.drive import get_drive_service_user
+from sqlalchemy import text
+from app.clients.drive import get_drive_credentials_user, DriveClientPool
+from app.services.db_routing import RoutingSession, ReplicaRouter
 import os
 
-# Initialize SQLAlchemy
-db = SQLAlchemy()
+# Initialize SQLAlchemy (las lecturas de GET pueden ir a una réplica)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 # Initialize JWT
 jwt = JWTManager()
 migrate = Migrate() 
@@ -19,6 +21,27 @@ cloud_storage_client = CloudStorageClient()
 
 # Import config after db to avoid circular imports
 from app.config import get_config
+from app.services.drive_folder_cache import DriveFolderCache
+
+from app.services.storage import Storage
+from app.services.image_cache import ImageCache
+from app.services.upload_jobs import UploadJobQueue
+from app.services.client_warmup import ClientWarmup
+from app.services.db_client import DatabaseClient
+from app.services.sqlite_tuning import SqliteOptimizer
+from app.utils.uploads import init_upload_handling
+from app.utils.query_count import init_query_count
+from app.utils.bulk import BulkConflict, BulkError
+from app.utils.pagination import PaginationError
+from app.utils.sparse_fields import FieldsError
+
+drive_folder_cache = DriveFolderCache()
+drive_clients = DriveClientPool()
+storage = Storage()
+image_cache = ImageCache()
+upload_jobs = UploadJobQueue()
+db_client = DatabaseClient()
+db_router = ReplicaRouter()
 
 def log_endpoints(app):
     print("\n📡 Endpoints disponibles:")
@@ -33,21 +56,42 @@ def create_app(config_name='development'):
 
     # Load configuration
     app.config.from_object(get_config())
+    init_upload_handling(app)
+    init_query_count(app)
 
-    cloud_storage_client.init_app(app)
-    sa_path = os.getenv("GOOGLE_DRIVE_SA_JSON")  # ruta al JSON del Service Account
-    if not sa_path:
-        raise RuntimeError("Falta GOOGLE_DRIVE_SA_JSON en el entorno")
-    app.config["GDRIVE_SERVICE"] = get_drive_service_user(
-        client_secret_path=os.getenv("GOOGLE_OAUTH_CLIENT_SECRET", "client_secret.json"),
-        token_path=os.getenv("GOOGLE_OAUTH_TOKEN_PATH", "token.json"),
-    )
+    # Solo se configuran los clientes de Google que usa el backend de almacenamiento.
+    # Ninguno toca la red aquí: se conectan en el primer uso o en el warm-up.
+    google_clients = {}
+    if app.config['STORAGE_BACKEND'] == 'gcs':
+        cloud_storage_client.init_app(app)
+        google_clients['gcs'] = cloud_storage_client
+    if app.config['STORAGE_BACKEND'] == 'drive':
+        sa_path = os.getenv("GOOGLE_DRIVE_SA_JSON")  # ruta al JSON del Service Account
+        if not sa_path:
+            raise RuntimeError("Falta GOOGLE_DRIVE_SA_JSON en el entorno")
+        drive_clients.init_app(app, lambda: get_drive_credentials_user(
+            client_secret_path=os.getenv("GOOGLE_OAUTH_CLIENT_SECRET", "client_secret.json"),
+            token_path=os.getenv("GOOGLE_OAUTH_TOKEN_PATH", "token.json"),
+        ))
+        google_clients['drive'] = drive_clients
+    app.extensions['google_clients'] = google_clients
     # Initialize extensions
-    db.init_app(app)
+    db_client.init_app(app)
+    db_router.init_app(app)
+    drive_folder_cache.init_app(app)
+    storage.init_app(app)
+    image_cache.init_app(app)
+    upload_jobs.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
     CORS(app)
 
+    if google_clients and app.config.get('CLIENT_WARMUP') and not app.config.get('TESTING'):
+        ClientWarmup(google_clients).start()
+
+    if db_client.sqlite_engines and app.config.get('SQLITE_OPTIMIZE_INTERVAL') and not app.config.get('TESTING'):
+        SqliteOptimizer(db_client.sqlite_engines, app.config['SQLITE_OPTIMIZE_INTERVAL']).start()
+
     # Register error handlers
     register_error_handlers(app)
 
@@ -66,7 +110,9 @@ def create_app(config_name='development'):
 
             return jsonify({
                 "status": "ok",
-                "db_response": value
+                "db_response": value,
+                "pool": db_client.pool_status(),
+                "replicas": {key: db_client.pool_status(key) for key in db_router.replicas}
             }), 200
 
         except Exception as e:
@@ -95,6 +141,20 @@ def create_app(config_name='development'):
             "message": "API funcionando correctamente"
         }), 200
 
+    @app.route("/health/ready", methods=["GET"])
+    def health_ready():
+        # Solo informa: no fuerza la conexión de ningún cliente
+        backends = {
+            name: client.status()
+            for name, client in app.extensions['google_clients'].items()
+        }
+        ready = all(backend['connected'] for backend in backends.values())
+        return jsonify({
+            "status": "ready" if ready else "starting",
+            "storage_backend": app.config['STORAGE_BACKEND'],
+            "backends": backends
+        }), 200 if ready else 503
+
     # Create a route to serve the Swagger JSON
     @app.route('/static/swagger.json')
     def swagger():
@@ -112,6 +172,8 @@ def register_blueprints(app):
     from app.routes.emergency_contacts import contacts_bp
     from app.routes.insurance_policies import policies_bp
     from app.routes.vehicle_images import images_bp
+    from app.routes.upload_jobs import jobs_bp
+    from app.routes.files import files_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(users_bp, url_prefix='/api/users')
@@ -120,6 +182,8 @@ def register_blueprints(app):
     app.register_blueprint(contacts_bp, url_prefix='/api/emergency-contacts')
     app.register_blueprint(policies_bp, url_prefix='/api/insurance-policies')
     app.register_blueprint(images_bp, url_prefix='/api/vehicle-images')
+    app.register_blueprint(jobs_bp, url_prefix='/api/upload-jobs')
+    app.register_blueprint(files_bp, url_prefix=app.config['LOCAL_STORAGE_URL_PREFIX'])
 
 def register_error_handlers(app):
     """Register error handlers for application"""
@@ -152,6 +216,22 @@ def register_error_handlers(app):
             'message': 'The requested resource was not found'
         }), 404
 
+    @app.errorhandler(BulkError)
+    @app.errorhandler(FieldsError)
+    @app.errorhandler(PaginationError)
+    def query_parameter_error(error):
+        return jsonify({
+            'success': False,
+            'message': error.description
+        }), 400
+
+    @app.errorhandler(BulkConflict)
+    def conflict(error):
+        return jsonify({
+            'success': False,
+            'message': error.description
+        }), 409
+
     @app.errorhandler(500)
     def internal_server_error(error):
         return jsonify({
@@ -2,9 +2,14 @@
 from typing import Optional, List
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
+from googleapiclient.http import MediaIoBaseUpload, MediaIoBaseDownload
 from googleapiclient.errors import HttpError
-import os, io
+import os, io, re, queue, threading
+from contextlib import contextmanager
+from datetime import datetime
+import httplib2
+import http.client as http_client
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
@@ -12,7 +17,7 @@ from google.auth.transport.requests import Request
 SCOPES = ["https://www.googleapis.com/auth/drive.file"]
 # Si quieres gestionar TODO (y/o eliminar archivos que ya existían), usa:
 # SCOPES = ["https://www.googleapis.com/auth/drive"]
-def get_drive_service_user(
+def get_drive_credentials_user(
     client_secret_path: str,
     token_path: str = "token.json",
 ):
@@ -29,41 +34,426 @@ def get_drive_service_user(
         with open(token_path, "w") as f:
             f.write(creds.to_json())
 
+    return creds
+
+def get_drive_service_user(
+    client_secret_path: str,
+    token_path: str = "token.json",
+):
+    creds = get_drive_credentials_user(client_secret_path, token_path)
     return build("drive", "v3", credentials=creds)
 
-def ensure_folder_path(service, parts, parent_id=None):
-    def _find(name, mime, parent):
-        escaped_name = name.replace("'", "\\'")
-        q = [f"name = '{escaped_name}'", "trashed = false"]
-        if parent:
-            q.append(f"'{parent}' in parents")
-        if mime:
-            q.append(f"mimeType = '{mime}'")
-        res = service.files().list(q=" and ".join(q), fields="files(id,name)").execute()
-        items = res.get("files", [])
-        return items[0] if items else None
-
-    folder_mime = "application/vnd.google-apps.folder"
+
+class SharedCredentials:
+    """
+    Credenciales compartidas por todos los transportes del pool.
+    El refresh se hace con un lock: si varios hilos ven el token vencido
+    (o un 401) a la vez, solo uno pide un token nuevo y el resto lo reutiliza.
+    """
+
+    def __init__(self, credentials):
+        self._credentials = credentials
+        self._lock = threading.Lock()
+
+    def before_request(self, request, method, url, headers):
+        if not self._credentials.valid:
+            self.refresh(request, stale_token=self._credentials.token)
+        self._credentials.apply(headers)
+
+    def refresh(self, request, stale_token=None):
+        stale_token = stale_token or self._credentials.token
+        with self._lock:
+            # Otro hilo ya lo renovó mientras esperábamos el lock
+            if self._credentials.token != stale_token and self._credentials.valid:
+                return
+            self._credentials.refresh(request)
+
+    def __getattr__(self, name):
+        return getattr(self._credentials, name)
+
+
+class DriveClientPool:
+    """
+    Pool de servicios de Drive. httplib2.Http no es thread-safe, así que
+    cada servicio tiene su propio transporte autorizado; los servicios se
+    prestan con checkout() y vuelven al pool con su conexión keep-alive
+    abierta, de modo que las llamadas siguientes (de cualquier hilo) no
+    repiten el handshake TLS. Todos comparten las mismas credenciales.
+    Las credenciales se cargan en el primer uso (o con connect() desde un
+    hilo de warm-up), no al arrancar la app.
+    """
+
+    def __init__(self, credentials=None, size=8, timeout=60, wait_timeout=30):
+        self._credentials = SharedCredentials(credentials) if credentials else None
+        self._load_credentials = None
+        self.size = size
+        self.timeout = timeout
+        self.wait_timeout = wait_timeout
+        self.connected_at = None
+        self.last_error = None
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._credentials_lock = threading.Lock()
+
+    def init_app(self, app, load_credentials):
+        """
+        Configura el pool sin tocar la red. ``load_credentials`` es una
+        función sin argumentos que devuelve las credenciales de Google.
+        """
+        self._load_credentials = load_credentials
+        self.size = app.config.get("DRIVE_POOL_SIZE", self.size)
+        self.timeout = app.config.get("DRIVE_HTTP_TIMEOUT", self.timeout)
+        self.wait_timeout = app.config.get("DRIVE_POOL_WAIT_TIMEOUT", self.wait_timeout)
+
+    @property
+    def credentials(self):
+        if self._credentials is not None:
+            return self._credentials
+        if self._load_credentials is None:
+            raise RuntimeError("Drive client pool not initialized")
+        with self._credentials_lock:
+            if self._credentials is None:
+                try:
+                    self._credentials = SharedCredentials(self._load_credentials())
+                except Exception as e:
+                    self.last_error = str(e)
+                    raise
+        return self._credentials
+
+    def connect(self):
+        """Carga las credenciales y deja un servicio listo en el pool (warm-up)"""
+        with self.checkout():
+            pass
+        if self.connected_at is None:
+            self.connected_at = datetime.utcnow()
+        self.last_error = None
+
+    def status(self):
+        """Estado de la conexión para el endpoint de readiness"""
+        return {
+            "connected": self._created > 0,
+            "connected_at": self.connected_at.isoformat() if self.connected_at else None,
+            "error": self.last_error,
+            **self.stats()
+        }
+
+    def _build(self):
+        http = AuthorizedHttp(self.credentials, http=build_transport(self.timeout))
+        return build("drive", "v3", http=http, cache_discovery=False)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if create:
+            try:
+                return self._build()
+            except Exception as e:
+                with self._lock:
+                    self._created -= 1
+                self.last_error = str(e)
+                raise
+
+        try:
+            return self._idle.get(timeout=self.wait_timeout)
+        except queue.Empty:
+            raise RuntimeError("No hay servicios de Drive disponibles en el pool") from None
+
+    @contextmanager
+    def checkout(self):
+        """Presta un servicio de Drive para uso exclusivo del hilo actual"""
+        service = self._acquire()
+        try:
+            yield service
+        finally:
+            self._idle.put(service)
+
+    def stats(self):
+        return {"size": self.size, "created": self._created, "idle": self._idle.qsize()}
+
+def build_transport(timeout=60):
+    """
+    httplib2.Http para la API de Drive. Como build_http() de googleapiclient,
+    no trata el 308 como redirección: en las subidas reanudables significa
+    "Resume Incomplete" y no trae Location.
+    """
+    http = httplib2.Http(timeout=timeout)
+    http.redirect_codes = http.redirect_codes - {308}
+    return http
+
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+
+def _escape(name):
+    return name.replace("'", "\\'")
+
+def _find_folders(service, names, http=None):
+    """
+    Una sola consulta (paginada) para todas las carpetas con esos nombres.
+    Devuelve {(parent_id, name): folder_id}; (None, name) = primera encontrada en cualquier lugar.
+    """
+    clauses = " or ".join(f"name = '{_escape(n)}'" for n in dict.fromkeys(names))
+    q = f"mimeType = '{FOLDER_MIME}' and trashed = false and ({clauses})"
+    found = {}
+    page_token = None
+    while True:
+        res = service.files().list(
+            q=q, fields="nextPageToken, files(id,name,parents)",
+            pageSize=1000, pageToken=page_token
+        ).execute(http=http)
+        for item in res.get("files", []):
+            for parent in item.get("parents") or []:
+                found.setdefault((parent, item["name"]), item["id"])
+            found.setdefault((None, item["name"]), item["id"])
+        page_token = res.get("nextPageToken")
+        if not page_token:
+            return found
+
+def resolve_folder_chain(service, parts, parent_id=None, cache=None, http=None, create=True):
+    """
+    Resuelve (o crea) cada carpeta de la ruta y devuelve la lista de IDs.
+    Lo que no está en caché se busca con una sola consulta para toda la ruta.
+    Con ``create=False`` solo busca: devuelve None si falta alguna carpeta.
+    """
     cur = parent_id
-    for p in parts:
-        ex = _find(p, folder_mime, cur)
-        if ex:
-            cur = ex["id"]
+    chain = []
+    found = None
+    for index, p in enumerate(parts):
+        cached = cache.get(cur, p) if cache else None
+        if cached:
+            cur = cached
+            chain.append(cur)
+            continue
+
+        if found is None:
+            found = _find_folders(service, parts[index:], http=http)
+
+        parent = cur
+        if (cur, p) in found:
+            cur = found[(cur, p)]
+        elif not create:
+            return None
         else:
-            body = {"name": p, "mimeType": folder_mime}
+            body = {"name": p, "mimeType": FOLDER_MIME}
             if cur:
                 body["parents"] = [cur]
-            cur = service.files().create(body=body, fields="id").execute()["id"]
-    return cur
+            cur = service.files().create(body=body, fields="id").execute(http=http)["id"]
+        if cache:
+            cache.set(parent, p, cur)
+        chain.append(cur)
+    return chain
+
+
+def iter_folder_files(checkout, folder_ids, page_size=1000, group=20, http=None):
+    """
+    Recorre recursivamente las carpetas ``folder_ids`` y produce páginas
+    (listas) de archivos {id, name, modifiedTime}. Cada consulta cubre hasta
+    ``group`` carpetas a la vez, así que el número de llamadas crece con las
+    páginas de resultados y no con el número de carpetas. ``checkout``
+    (p. ej. DriveClientPool.checkout) presta un servicio para cada página:
+    mientras quien consume el generador procesa una, no retiene ninguno.
+    """
+    pending = list(dict.fromkeys(f for f in folder_ids if f))
+    while pending:
+        folders, pending = pending[:group], pending[group:]
+        parents = " or ".join(f"'{_escape(f)}' in parents" for f in folders)
+        q = f"trashed = false and ({parents})"
+        page_token = None
+        while True:
+            with checkout() as service:
+                res = service.files().list(
+                    q=q, fields="nextPageToken, files(id,name,mimeType,modifiedTime)",
+                    pageSize=page_size, pageToken=page_token
+                ).execute(http=http)
+            files = []
+            for item in res.get("files", []):
+                if item.get("mimeType") == FOLDER_MIME:
+                    pending.append(item["id"])
+                else:
+                    files.append(item)
+            if files:
+                yield files
+            page_token = res.get("nextPageToken")
+            if not page_token:
+                break
+
+
+def ensure_folder_path(service, parts, parent_id=None, cache=None):
+    chain = resolve_folder_chain(service, parts, parent_id=parent_id, cache=cache)
+    return chain[-1] if chain else parent_id
+
 
+# La API exige chunks múltiplos de 256 KB en las subidas reanudables
+CHUNK_GRANULARITY = 256 * 1024
+DEFAULT_CHUNK_SIZE = 4 * CHUNK_GRANULARITY
 
-def upload_file_to_folder(service, file_stream, filename, mimetype, folder_id):
-    media = MediaIoBaseUpload(file_stream, mimetype=mimetype or "application/octet-stream", resumable=True)
+# Errores de red tras los que una subida reanudable pregunta el offset y continúa
+TRANSIENT_ERRORS = (OSError, httplib2.HttpLib2Error, http_client.HTTPException)
+
+class ChunkedUpload(MediaIoBaseUpload):
+    """
+    MediaIoBaseUpload que entrega cada chunk como bytes. Con el stream,
+    googleapiclient envía un slice que httplib2 ya consumió si reintenta la
+    petición por su cuenta tras un corte: el reintento declara el chunk
+    completo sin cuerpo y se queda colgado hasta el timeout.
+    """
+
+    def has_stream(self):
+        return False
+
+
+def normalize_chunksize(chunksize):
+    """Redondea hacia abajo a un múltiplo de 256 KB (mínimo 256 KB)."""
+    return max(CHUNK_GRANULARITY, int(chunksize) // CHUNK_GRANULARITY * CHUNK_GRANULARITY)
+
+
+def _stream_size(stream):
+    position = stream.tell()
+    stream.seek(0, io.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def query_resumable_offset(request, http=None):
+    """
+    Pregunta a Drive cuántos bytes de la sesión reanudable tiene confirmados
+    (PUT vacío con ``Content-Range: bytes */<tamaño>``). Devuelve
+    (offset, respuesta final o None si la subida no terminó).
+    """
+    size = request.resumable.size()
+    headers = {"Content-Range": f"bytes */{size}", "Content-Length": "0"}
+    resp, content = (http or request.http).request(request.resumable_uri, "PUT", headers=headers)
+    if resp.status in (200, 201):
+        return size, request.postproc(resp, content)
+    if resp.status == 308:
+        # "Range: bytes=0-N" = N+1 bytes confirmados; sin Range todavía no hay ninguno
+        confirmed = resp.get("range")
+        return (int(confirmed.rsplit("-", 1)[1]) + 1 if confirmed else 0), None
+    raise HttpError(resp, content, uri=request.resumable_uri)
+
+
+def execute_resumable(request, sessions=None, session_key=None, http=None, num_retries=3, max_stalls=5):
+    """
+    Ejecuta una subida reanudable chunk a chunk y devuelve la respuesta final.
+    Tras cada chunk confirmado se guarda la URI de sesión y el offset en
+    ``sessions`` (claim/save/release/discard), de modo que si la conexión se
+    cae o el worker se reinicia la subida sigue desde el último chunk confirmado.
+    La sesión se reclama antes de usarla: si otra subida la tiene, esta va
+    sin persistir en vez de continuar el mismo archivo de Drive.
+    Después de un corte (o al retomar una sesión guardada) se pregunta a
+    Drive el offset real antes de enviar el siguiente chunk.
+    """
+    persist = sessions is not None and session_key is not None
+    saved = None
+    if persist:
+        # Otra subida del mismo contenido (de este u otro worker) usa la sesión: se sube sin guardarla
+        persist, saved = sessions.claim(session_key)
+    if saved:
+        request.resumable_uri, request.resumable_progress = saved
+    try:
+        response = _run_resumable(request, sessions if persist else None, session_key, saved, http,
+                                  num_retries, max_stalls)
+    except BaseException:
+        if persist:
+            sessions.release(session_key)
+        raise
+    if persist:
+        sessions.discard(session_key)
+    return response
+
+
+def _run_resumable(request, sessions, session_key, saved, http, num_retries, max_stalls):
+    persist = sessions is not None
+    resync = bool(saved)
+
+    stalls = 0
+    response = None
+    while response is None:
+        try:
+            if resync:
+                request.resumable_progress, response = query_resumable_offset(request, http=http)
+                resync = False
+            if response is None:
+                _, response = request.next_chunk(http=http, num_retries=num_retries)
+        except HttpError as e:
+            status = getattr(e.resp, "status", None)
+            if saved and status in (404, 410):
+                # Sesión expirada o desconocida: se empieza de cero una vez
+                sessions.discard(session_key)
+                saved = None
+                resync = False
+                request.resumable_uri = None
+                request.resumable_progress = 0
+                continue
+            if status is not None and status < 500:
+                raise
+            stalls += 1
+            if stalls > max_stalls:
+                raise
+            resync = request.resumable_uri is not None
+            continue
+        except TRANSIENT_ERRORS:
+            stalls += 1
+            if stalls > max_stalls:
+                raise
+            # El chunk pudo llegar entero, en parte o nada: se pregunta antes de reenviar
+            resync = request.resumable_uri is not None
+            continue
+
+        stalls = 0
+        if response is None and persist and request.resumable_uri:
+            sessions.save(session_key, request.resumable_uri, request.resumable_progress)
+    return response
+
+
+def upload_file_to_folder(service, file_stream, filename, mimetype, folder_id, http=None,
+                          chunksize=DEFAULT_CHUNK_SIZE, sessions=None, session_key=None):
+    """
+    Sube el archivo a la carpeta. Los archivos que caben en un chunk van en
+    una sola petición; los demás, en una subida reanudable por chunks de
+    ``chunksize`` (persistida en ``sessions`` si se indica ``session_key``).
+    """
+    mimetype = mimetype or "application/octet-stream"
     meta = {"name": filename, "parents": [folder_id]}
-    return service.files().create(
-        body=meta, media_body=media,
-        fields="id,name,webViewLink,webContentLink"
-    ).execute()
+    fields = "id,name,webViewLink,webContentLink"
+    chunksize = normalize_chunksize(chunksize)
+
+    if _stream_size(file_stream) <= chunksize:
+        media = MediaIoBaseUpload(file_stream, mimetype=mimetype, resumable=False)
+        return service.files().create(body=meta, media_body=media, fields=fields).execute(http=http)
+
+    media = ChunkedUpload(file_stream, mimetype=mimetype, chunksize=chunksize, resumable=True)
+    request = service.files().create(body=meta, media_body=media, fields=fields)
+    # La sesión depende de la carpeta de destino (va en los metadatos iniciales)
+    key = f"{folder_id}:{session_key}" if session_key else None
+    return execute_resumable(request, sessions=sessions, session_key=key, http=http)
+
+
+def upload_file_to_path(service, file_stream, filename, mimetype, parts, cache=None, http=None, **upload_options):
+    """
+    Sube el archivo a la ruta de carpetas indicada.
+    Si Drive responde 404 para una carpeta en caché, se invalida la ruta
+    completa y se reintenta una vez resolviendo las carpetas de nuevo.
+    ``upload_options`` (chunksize, sessions, session_key) pasan a upload_file_to_folder.
+    """
+    chain = resolve_folder_chain(service, parts, cache=cache)
+    try:
+        return upload_file_to_folder(service, file_stream, filename, mimetype, chain[-1], http=http, **upload_options)
+    except HttpError as e:
+        if cache is None or getattr(e.resp, "status", None) != 404:
+            raise
+        cache.invalidate(*chain)
+        file_stream.seek(0)
+        chain = resolve_folder_chain(service, parts, cache=cache)
+        return upload_file_to_folder(service, file_stream, filename, mimetype, chain[-1], http=http, **upload_options)
 
 
 def get_drive_service_from_sa(sa_json_path: str):
@@ -134,5 +524,78 @@ def make_anyone_with_link_viewer(service, file_id: str):
     }
     return service.permissions().create(fileId=file_id, body=perm).execute()
 
-def delete_file(service, file_id: str):
-    service.files().delete(fileId=file_id).execute()
\ No newline at end of file
+def delete_file(service, file_id: str, http=None):
+    service.files().delete(fileId=file_id).execute(http=http)
+
+
+def get_file(service, file_id: str, fields="id,name,mimeType,webViewLink,webContentLink,trashed", http=None):
+    """Metadata de un archivo (HttpError 404 si no existe)."""
+    return service.files().get(fileId=file_id, fields=fields).execute(http=http)
+
+
+def download_file(service, file_id: str, out, http=None, chunksize=1024 * 1024):
+    """Descarga el contenido del archivo en ``out`` por partes y lo deja al inicio."""
+    request = service.files().get_media(fileId=file_id)
+    if http is not None:
+        request.http = http
+    downloader = MediaIoBaseDownload(out, request, chunksize=chunksize)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+    out.seek(0)
+    return out
+
+
+# Límite de llamadas por petición batch de la API de Drive
+BATCH_LIMIT = 100
+
+def batch_execute(service, requests, http=None):
+    """
+    Ejecuta las requests con BatchHttpRequest en lotes de hasta BATCH_LIMIT.
+    Devuelve una lista [(respuesta, error)] en el mismo orden que ``requests``.
+    """
+    results = [(None, None)] * len(requests)
+
+    def callback(request_id, response, exception):
+        results[int(request_id)] = (response, exception)
+
+    for start in range(0, len(requests), BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=callback)
+        for index, req in enumerate(requests[start:start + BATCH_LIMIT], start):
+            batch.add(req, request_id=str(index))
+        batch.execute(http=http)
+    return results
+
+def batch_delete_files(service, file_ids, http=None):
+    """
+    Elimina varios archivos en una o pocas peticiones batch.
+    Devuelve {file_id: None | error}; un 404 cuenta como eliminado.
+    """
+    ids = list(dict.fromkeys(f for f in file_ids if f))
+    if not ids:
+        return {}
+    results = batch_execute(service, [service.files().delete(fileId=f) for f in ids], http=http)
+    report = {}
+    for file_id, (_, error) in zip(ids, results):
+        if isinstance(error, HttpError) and getattr(error.resp, "status", None) == 404:
+            error = None
+        report[file_id] = error
+    return report
+
+
+DRIVE_URL_PATTERNS = [
+    r"https://drive\.google\.com/file/d/([^/?#]+)",
+    r"https://drive\.google\.com/open\?id=([^&]+)",
+    r"https://drive\.google\.com/uc\?export=view&id=([^&]+)",
+    r"https://drive\.google\.com/uc\?id=([^&]+)",
+]
+
+def drive_file_id(url_or_id: Optional[str]) -> Optional[str]:
+    """Extrae el file_id de un link de Drive (webViewLink, uc?id=...) o lo devuelve si ya es un ID."""
+    if not url_or_id:
+        return None
+    for pattern in DRIVE_URL_PATTERNS:
+        match = re.search(pattern, url_or_id)
+        if match:
+            return match.group(1)
+    return None if "://" in url_or_id or "/" in url_or_id else url_or_id
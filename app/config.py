@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -10,6 +11,36 @@ class Config:
     # SQLite configuration (local development)
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///club.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Un solo pool de conexiones (el del engine de Flask-SQLAlchemy).
+    # pre_ping y recycle evitan usar conexiones que Cloud SQL ya cerró.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+    # Réplicas de lectura (URLs separadas por comas): reciben las consultas de los GET.
+    # Tras escribir, el usuario lee del primario durante DB_REPLICA_PIN_SECONDS.
+    SQLALCHEMY_BINDS = {
+        f'replica_{i}': url.strip()
+        for i, url in enumerate(os.environ.get('DATABASE_REPLICA_URLS', '').split(','))
+        if url.strip()
+    }
+    DB_REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 5))
+
+    # Perfil SQLite para despliegues de un solo nodo: WAL para que las escrituras no
+    # bloqueen las lecturas y busy_timeout para esperar el lock en vez de fallar.
+    # Solo se aplica si la base es SQLite; SQLITE_PRAGMAS vacío = valores por defecto.
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # ms
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', 64 * 1024)),  # negativo = KiB
+        'temp_store': 'MEMORY',
+    } if os.environ.get('SQLITE_TUNING', 'true').lower() == 'true' else {}
+    SQLITE_OPTIMIZE_INTERVAL = int(os.environ.get('SQLITE_OPTIMIZE_INTERVAL', 3600))  # 0 = sin PRAGMA optimize
 
     # JWT settings
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt_secret_key')
@@ -18,8 +49,53 @@ class Config:
 
     # Google Cloud Storage settings
     GCS_BUCKET_NAME = os.environ.get('GCS_BUCKET_NAME', 'club_api_files')
+    # URLs firmadas: expiración alineada a bloques de N segundos y LRU en memoria
+    GCS_SIGNED_URL_BUCKET = int(os.environ.get('GCS_SIGNED_URL_BUCKET', 900))
+    GCS_SIGNED_URL_CACHE_SIZE = int(os.environ.get('GCS_SIGNED_URL_CACHE_SIZE', 1024))
     GOOGLE_APPLICATION_CREDENTIALS = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS', 'gcp-credentials.json')
 
+    # Almacenamiento de archivos: 'drive', 'gcs' o 'local'
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'drive')
+    STORAGE_DEDUP = os.environ.get('STORAGE_DEDUP', 'true').lower() == 'true'  # un archivo por contenido (SHA-256)
+    LOCAL_STORAGE_ROOT = os.environ.get('LOCAL_STORAGE_ROOT', os.path.join(os.getcwd(), 'storage'))
+    LOCAL_STORAGE_URL_PREFIX = '/api/files'
+    LOCAL_STORAGE_MAX_AGE = int(os.environ.get('LOCAL_STORAGE_MAX_AGE', 3600))  # Cache-Control de los archivos servidos
+
+    # Reconciliación almacenamiento/BD (flask storage-reconcile)
+    STORAGE_RECONCILE_FOLDERS = ('Vehicles', 'vehicle_images', 'insurance_policies')  # carpetas raíz que se revisan
+    STORAGE_RECONCILE_MIN_AGE = int(os.environ.get('STORAGE_RECONCILE_MIN_AGE', 3600))  # no tocar archivos más recientes (s)
+    STORAGE_RECONCILE_BATCH_SIZE = int(os.environ.get('STORAGE_RECONCILE_BATCH_SIZE', 100))
+    STORAGE_RECONCILE_RATE_LIMIT = float(os.environ.get('STORAGE_RECONCILE_RATE_LIMIT', 10))  # archivos/s (0 = sin límite)
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'  # delegar la lectura al proxy (nginx/apache)
+
+    # Proxy de imágenes (/api/vehicle-images/<id>/content?w=)
+    IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'club_image_cache'))
+    IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    IMAGE_CACHE_MAX_AGE = int(os.environ.get('IMAGE_CACHE_MAX_AGE', 7 * 24 * 3600))  # Cache-Control del navegador
+    IMAGE_PROXY_WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)  # ?w= se redondea hacia arriba a uno de estos
+    # Formatos que el proxy sirve si el cliente los declara en Accept, por orden de preferencia
+    # (image/avif comprime más pero codificarlo cuesta varias veces más CPU que WebP)
+    IMAGE_PROXY_FORMATS = tuple(
+        f.strip() for f in os.environ.get('IMAGE_PROXY_FORMATS', 'image/webp').split(',') if f.strip()
+    )
+    # Calidad adaptativa: tamaño máximo (bytes) de cada imagen generada; 0 = calidad fija
+    IMAGE_TARGET_BYTES = int(os.environ.get('IMAGE_TARGET_BYTES', 0))
+
+    # Conectar los clientes de Google en segundo plano al arrancar (si no, en el primer uso)
+    CLIENT_WARMUP = os.environ.get('CLIENT_WARMUP', 'true').lower() == 'true'
+
+    # Pool de servicios de Drive (conexiones keep-alive)
+    DRIVE_POOL_SIZE = int(os.environ.get('DRIVE_POOL_SIZE', 8))
+    DRIVE_HTTP_TIMEOUT = int(os.environ.get('DRIVE_HTTP_TIMEOUT', 60))  # segundos
+    DRIVE_POOL_WAIT_TIMEOUT = int(os.environ.get('DRIVE_POOL_WAIT_TIMEOUT', 30))  # espera por un servicio libre
+    DRIVE_UPLOAD_CHUNK_SIZE = int(os.environ.get('DRIVE_UPLOAD_CHUNK_SIZE', 1024 * 1024))  # múltiplo de 256 KB; archivos menores van en una petición
+    # Una sesión reanudable guardada hace menos de N segundos es de una subida en curso (de cualquier worker)
+    DRIVE_UPLOAD_SESSION_LEASE = int(os.environ.get('DRIVE_UPLOAD_SESSION_LEASE', 300))
+
+    # Google Drive folder cache (ensure_folder_path)
+    DRIVE_FOLDER_CACHE_TTL = int(os.environ.get('DRIVE_FOLDER_CACHE_TTL', 24 * 3600))  # segundos
+    DRIVE_FOLDER_CACHE_SIZE = int(os.environ.get('DRIVE_FOLDER_CACHE_SIZE', 1024))
+
     # Cloud SQL configuration (production)
     DB_USER = os.environ.get('DB_USER', 'postgres')
     DB_PASS = os.environ.get('DB_PASS', 'password')
@@ -32,7 +108,32 @@ class Config:
 
     # File upload settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload size
+    UPLOAD_MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB por archivo, se corta con 413 mientras llega
+    UPLOAD_SPOOL_MEMORY_SIZE = int(os.environ.get('UPLOAD_SPOOL_MEMORY_SIZE', 512 * 1024))  # luego pasa a disco
+    UPLOAD_MEMORY_PROFILE = os.environ.get('UPLOAD_MEMORY_PROFILE', 'false').lower() == 'true'  # cabecera X-Peak-Memory
+
+    # Paginación por cursor (?limit=&cursor=) de los listados
+    PAGINATION_DEFAULT_LIMIT = int(os.environ.get('PAGINATION_DEFAULT_LIMIT', 50))
+    PAGINATION_MAX_LIMIT = int(os.environ.get('PAGINATION_MAX_LIMIT', 200))
+
+    # Máximo de elementos por petición en los endpoints /bulk
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 500))
+
+    # Número de consultas SQL por request (cabecera X-Query-Count) y aviso en el log por encima de N (0 = sin aviso)
+    SQL_QUERY_COUNT_HEADER = os.environ.get('SQL_QUERY_COUNT_HEADER', 'true').lower() == 'true'
+    SQL_QUERY_COUNT_WARN = int(os.environ.get('SQL_QUERY_COUNT_WARN', 20))
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
+    UPLOAD_MAX_CONCURRENCY = int(os.environ.get('UPLOAD_MAX_CONCURRENCY', 4))  # subidas simultáneas por request
+    UPLOAD_PROCESS_POOL_SIZE = int(os.environ.get('UPLOAD_PROCESS_POOL_SIZE', 2))  # 0 = comprimir en el mismo hilo
+
+    # Subidas asíncronas (202 + trabajo en segundo plano)
+    ASYNC_UPLOADS = os.environ.get('ASYNC_UPLOADS', 'false').lower() == 'true'  # se puede forzar con ?async=1
+    UPLOAD_WORKER_ENABLED = os.environ.get('UPLOAD_WORKER_ENABLED', 'true').lower() == 'true'
+    UPLOAD_WORKER_POLL_INTERVAL = float(os.environ.get('UPLOAD_WORKER_POLL_INTERVAL', 2))
+    UPLOAD_JOB_MAX_ATTEMPTS = int(os.environ.get('UPLOAD_JOB_MAX_ATTEMPTS', 3))
+    UPLOAD_JOB_STALE_SECONDS = int(os.environ.get('UPLOAD_JOB_STALE_SECONDS', 15 * 60))
+    UPLOAD_JOB_RETRY_DELAY = int(os.environ.get('UPLOAD_JOB_RETRY_DELAY', 30))  # segundos, se duplica en cada intento
+    UPLOAD_SPOOL_DIR = os.environ.get('UPLOAD_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'club_uploads'))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -42,6 +143,7 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')  # sin llamadas a Google en tests
 
 class ProductionConfig(Config):
     driver = "ODBC Driver 17 for SQL Server"
@@ -5,3 +5,7 @@ from app.models.personal_info import PersonalInfo
 from app.models.emergency_contact import EmergencyContact
 from app.models.insurance_policy import InsurancePolicy
 from app.models.vehicle_image import VehicleImage
+from app.models.drive_folder import DriveFolder
+from app.models.upload_job import UploadJob
+from app.models.stored_blob import StoredBlob
+from app.models.drive_upload_session import DriveUploadSession
@@ -0,0 +1,31 @@
+from datetime import datetime
+from app import db
+
+class DriveFolder(db.Model):
+    """Cached Google Drive folder IDs resolved by ensure_folder_path"""
+    __tablename__ = 'drive_folders'
+
+    id = db.Column(db.Integer, primary_key=True)
+    parent_id = db.Column(db.String(128), nullable=False, default='')  # '' = raíz de Drive
+    name = db.Column(db.String(255), nullable=False)
+    folder_id = db.Column(db.String(128), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('parent_id', 'name', name='uq_drive_folders_parent_name'),
+    )
+
+    def to_dict(self):
+        """Convert cached folder to dictionary"""
+        return {
+            'id': self.id,
+            'parent_id': self.parent_id or None,
+            'name': self.name,
+            'folder_id': self.folder_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<DriveFolder {self.name} ({self.folder_id})>'
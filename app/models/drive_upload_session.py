@@ -0,0 +1,26 @@
+from datetime import datetime
+from app import db
+
+class DriveUploadSession(db.Model):
+    """Resumable Drive upload in progress (session URI + last acknowledged byte offset)"""
+    __tablename__ = 'drive_upload_sessions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), nullable=False, unique=True)  # carpeta:hash:variante
+    upload_uri = db.Column(db.Text, nullable=False)
+    offset = db.Column(db.BigInteger, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert upload session to dictionary"""
+        return {
+            'id': self.id,
+            'key': self.key,
+            'offset': self.offset,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<DriveUploadSession {self.key} @{self.offset}>'
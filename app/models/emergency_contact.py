@@ -6,7 +6,7 @@ class EmergencyContact(db.Model):
     __tablename__ = 'emergency_contacts'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     relationship = db.Column(db.String(50), nullable=False)
     phone_number = db.Column(db.String(20), nullable=False)
@@ -1,4 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from sqlalchemy import Integer, and_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.sql import expression
 from app import db
 
 class InsurancePolicy(db.Model):
@@ -6,12 +10,12 @@ class InsurancePolicy(db.Model):
     __tablename__ = 'insurance_policies'
 
     id = db.Column(db.Integer, primary_key=True)
-    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=False)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     policy_number = db.Column(db.String(50), nullable=False)
     company = db.Column(db.String(100), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
-    end_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False, index=True)
     coverage_type = db.Column(db.String(50), nullable=True)
     pdf_file_path = db.Column(db.String(255), nullable=True)
     notes = db.Column(db.Text, nullable=True)
@@ -19,6 +23,12 @@ class InsurancePolicy(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     file_url = db.Column(db.String(500), nullable=True)  # URL del archivo en Google Drive
     file_path = db.Column(db.String(300), nullable=True)  # Ruta del archivo en Google Drive
+    upload_status = db.Column(db.String(20), nullable=True)  # 'pending', 'ready', 'failed' (None = sin archivo)
+
+    # También sirve las búsquedas solo por user_id (prefijo del índice)
+    __table_args__ = (
+        db.Index('ix_insurance_policies_user_id_end_date', 'user_id', 'end_date'),
+    )
     
 
     def to_dict(self):
@@ -45,17 +55,63 @@ class InsurancePolicy(db.Model):
         """Verificar si la póliza tiene un archivo asociado"""
         return bool(self.file_url and self.file_path)
     
-    @property
+    @hybrid_property
     def is_expired(self):
         """Verificar si la póliza está vencida"""
-        from datetime import date
         return self.end_date < date.today() if self.end_date else False
-    
-    @property
+
+    @is_expired.inplace.expression
+    @classmethod
+    def _is_expired_expression(cls):
+        # La fecha de hoy va como parámetro (la del servidor de la app, igual que en Python)
+        return and_(cls.end_date.is_not(None), cls.end_date < date.today())
+
+    @hybrid_property
     def days_to_expire(self):
         """Calcular días hasta el vencimiento"""
-        from datetime import date
         if self.end_date:
             delta = self.end_date - date.today()
             return delta.days
-        return None
\ No newline at end of file
+        return None
+
+    @days_to_expire.inplace.expression
+    @classmethod
+    def _days_to_expire_expression(cls):
+        return days_between(date.today(), cls.end_date)
+
+    @classmethod
+    def expiring_within(cls, days):
+        """Filter for policies ending between today and ``days`` from now (range scan on end_date)"""
+        today = date.today()
+        return cls.end_date.between(today, today + timedelta(days=days))
+
+
+class days_between(expression.FunctionElement):
+    """Whole days from ``start`` to ``end`` (two dates), compiled per dialect"""
+    type = Integer()
+    inherit_cache = True
+    name = 'days_between'
+
+
+@compiles(days_between)
+def _days_between_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"({compiler.process(end, **kw)} - {compiler.process(start, **kw)})"
+
+
+@compiles(days_between, 'sqlite')
+def _days_between_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"CAST(julianday({compiler.process(end, **kw)}) - julianday({compiler.process(start, **kw)}) AS INTEGER)"
+
+
+@compiles(days_between, 'mysql')
+def _days_between_mysql(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"DATEDIFF({compiler.process(end, **kw)}, {compiler.process(start, **kw)})"
+
+
+@compiles(days_between, 'mssql')
+def _days_between_mssql(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"DATEDIFF(day, {compiler.process(start, **kw)}, {compiler.process(end, **kw)})"
@@ -0,0 +1,39 @@
+from datetime import datetime
+from app import db
+
+class StoredBlob(db.Model):
+    """Content-addressed index of stored files, shared by every row that points to them"""
+    __tablename__ = 'stored_blobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    backend = db.Column(db.String(20), nullable=False)  # 'drive', 'gcs', 'local'
+    content_hash = db.Column(db.String(64), nullable=False)  # SHA-256 del archivo original
+    variant = db.Column(db.String(20), nullable=False, default='original')  # 'original', 'full', 'medium', 'thumbnail'
+    file_id = db.Column(db.String(300), nullable=False, index=True)
+    url = db.Column(db.String(500), nullable=True)
+    name = db.Column(db.String(255), nullable=True)
+    ref_count = db.Column(db.Integer, nullable=False, default=1)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('backend', 'content_hash', 'variant', name='uq_stored_blobs_content'),
+    )
+
+    def to_dict(self):
+        """Convert stored blob to dictionary"""
+        return {
+            'id': self.id,
+            'backend': self.backend,
+            'content_hash': self.content_hash,
+            'variant': self.variant,
+            'file_id': self.file_id,
+            'url': self.url,
+            'name': self.name,
+            'ref_count': self.ref_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<StoredBlob {self.content_hash[:12]}/{self.variant} x{self.ref_count}>'
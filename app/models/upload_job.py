@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+from app import db
+
+class UploadJob(db.Model):
+    """Background upload of spooled files to Google Drive"""
+    __tablename__ = 'upload_jobs'
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    KIND_VEHICLE_IMAGES = 'vehicle_images'
+    KIND_INSURANCE_POLICY = 'insurance_policy'
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PENDING)
+    folder = db.Column(db.Text, nullable=False)  # JSON: partes de la ruta en Drive
+    payload = db.Column(db.Text, nullable=False)  # JSON: archivos en spool
+    total_items = db.Column(db.Integer, nullable=False, default=0)
+    completed_items = db.Column(db.Integer, nullable=False, default=0)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)  # reintento con espera tras un fallo
+
+    @property
+    def items(self):
+        return json.loads(self.payload or '[]')
+
+    @items.setter
+    def items(self, value):
+        self.payload = json.dumps(value)
+        self.total_items = len(value)
+
+    @property
+    def folder_parts(self):
+        return json.loads(self.folder or '[]')
+
+    @folder_parts.setter
+    def folder_parts(self, value):
+        self.folder = json.dumps(list(value))
+
+    @property
+    def progress(self):
+        """Fracción de archivos ya subidos (0.0 - 1.0)"""
+        if not self.total_items:
+            return 1.0 if self.status == self.STATUS_DONE else 0.0
+        return round(self.completed_items / self.total_items, 2)
+
+    def to_dict(self):
+        """Convert upload job to dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'user_id': self.user_id,
+            'status': self.status,
+            'total_items': self.total_items,
+            'completed_items': self.completed_items,
+            'progress': self.progress,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<UploadJob {self.id} {self.kind} ({self.status})>'
@@ -6,10 +6,13 @@ class VehicleImage(db.Model):
     __tablename__ = 'vehicle_images'
 
     id = db.Column(db.Integer, primary_key=True)
-    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=False)
-    image_path = db.Column(db.String(255), nullable=False)  # Path in Google Cloud Storage
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=False, index=True)
+    image_path = db.Column(db.String(255), nullable=False)  # Path in Google Cloud Storage (full, 1920px)
+    medium_path = db.Column(db.String(255), nullable=True)  # 960px variant
+    thumbnail_path = db.Column(db.String(255), nullable=True)  # 320px variant
     description = db.Column(db.String(255), nullable=True)
     is_primary = db.Column(db.Boolean, default=False)
+    upload_status = db.Column(db.String(20), nullable=False, default='ready')  # 'pending', 'ready', 'failed'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -19,11 +22,42 @@ class VehicleImage(db.Model):
             'id': self.id,
             'vehicle_id': self.vehicle_id,
             'image_path': self.image_path,
+            'medium_path': self.medium_path,
+            'thumbnail_path': self.thumbnail_path,
             'description': self.description,
             'is_primary': self.is_primary,
+            'upload_status': self.upload_status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    @classmethod
+    def primary_by_vehicle(cls, vehicle_ids):
+        """
+        {vehicle_id: image} with the image to show for each vehicle, in one
+        query: the primary one, else the first ready one, else the first.
+        """
+        if not vehicle_ids:
+            return {}
+        rank = db.func.row_number().over(
+            partition_by=cls.vehicle_id,
+            order_by=(
+                db.case((cls.is_primary.is_(True), 0), else_=1),
+                db.case((cls.upload_status == 'ready', 0), else_=1),
+                cls.id
+            )
+        ).label('rank')
+        ranked = db.select(cls.id, rank).where(cls.vehicle_id.in_(vehicle_ids)).subquery()
+        images = cls.query.join(ranked, ranked.c.id == cls.id).filter(ranked.c.rank == 1).all()
+        return {image.vehicle_id: image for image in images}
+
+    def variant_path(self, size='thumbnail'):
+        """Path of the requested variant, falling back to the next larger one"""
+        if size == 'thumbnail':
+            return self.thumbnail_path or self.medium_path or self.image_path
+        if size == 'medium':
+            return self.medium_path or self.image_path
+        return self.image_path
+
     def __repr__(self):
         return f'<VehicleImage {self.id} for vehicle {self.vehicle_id}>'
@@ -7,6 +7,8 @@ from app.routes.personal_info import personal_info_bp
 from app.routes.emergency_contacts import contacts_bp
 from app.routes.insurance_policies import policies_bp
 from app.routes.vehicle_images import images_bp
+from app.routes.upload_jobs import jobs_bp
+from app.routes.files import files_bp
 
 api_bp = Blueprint('api', __name__)
 
@@ -19,5 +21,7 @@ def register_routes(app):
     app.register_blueprint(contacts_bp)
     app.register_blueprint(policies_bp)
     app.register_blueprint(images_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(files_bp)
 
     return app
@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
 from app.models.emergency_contact import EmergencyContact
 from app.utils.auth import token_required, admin_required, monitor_required
-from app.schemas.emergency_contact import EmergencyContactSchema, EmergencyContactsSchema
+from app.schemas.emergency_contact import EmergencyContactSchema, EmergencyContactsSchema, EmergencyContactUpdateSchema
 from app.services.db_client import db
+from app.utils.bulk import bulk_items, bulk_write, bulk_status
+from app.utils.sparse_fields import sparse_fieldset
 from flask_jwt_extended import get_jwt_identity
 
 contacts_bp = Blueprint('emergency_contacts', __name__, url_prefix='/api/emergency-contacts')
@@ -16,11 +18,11 @@ def get_user_contacts(user_id):
     if current_user['role'] == 'user' and current_user['id'] != user_id:
         return jsonify({'success': False, 'message': 'No autorizado'}), 403
 
-    contacts = EmergencyContact.query.filter_by(user_id=user_id).all()
-    print(contacts)
+    schema, options = sparse_fieldset(EmergencyContactsSchema, EmergencyContact)
+    contacts = EmergencyContact.query.options(*options).filter_by(user_id=user_id).all()
     return jsonify({
         'success': True,
-        'contacts': EmergencyContactsSchema.dump(contacts)
+        'contacts': schema.dump(contacts)
     }), 200
 
 @contacts_bp.route('/', methods=['POST'])
@@ -60,6 +62,21 @@ def create_contact():
         'contact': emergency_contact_schema.dump(new_contact)
     }), 201
 
+@contacts_bp.route('/bulk', methods=['POST'])
+@token_required
+def bulk_contacts():
+    """Crear (sin id) o actualizar (con id) varios contactos en una sola transacción"""
+    current_user = get_jwt_identity()
+    results = bulk_write(
+        EmergencyContact, bulk_items(), EmergencyContactSchema(), EmergencyContactUpdateSchema(), current_user
+    )
+    status = bulk_status(results)
+    return jsonify({
+        'success': status == 201,
+        'message': f"{sum(r['success'] for r in results)} de {len(results)} contactos guardados",
+        'results': results
+    }), status
+
 @contacts_bp.route('/<int:contact_id>', methods=['PUT'])
 @token_required
 def update_contact(contact_id):
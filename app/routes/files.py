@@ -0,0 +1,20 @@
+from flask import Blueprint, jsonify
+from app import storage
+
+files_bp = Blueprint('files', __name__, url_prefix='/api/files')
+
+@files_bp.route('/<token>', methods=['GET'])
+def get_file(token):
+    """Servir un archivo del almacenamiento local a partir de su link firmado"""
+    if storage.name != 'local':
+        return jsonify({'success': False, 'message': 'Archivo no encontrado'}), 404
+
+    file_id = storage.load_token(token)
+    if not file_id:
+        return jsonify({'success': False, 'message': 'Link inválido o expirado'}), 403
+
+    if not storage.exists(file_id):
+        return jsonify({'success': False, 'message': 'Archivo no encontrado'}), 404
+
+    # send_file con ruta: el servidor WSGI usa sendfile (o X-Sendfile con USE_X_SENDFILE)
+    return storage.send(file_id)
@@ -5,14 +5,20 @@ from app.models.user import User
 from app.utils.auth import token_required, admin_required, monitor_required
 from app.schemas.insurance_policy import InsurancePolicySchema, InsurancePolicysSchema
 from app.services.db_client import db
-from app import cloud_storage_client  # importa la instancia inicializada en __init__.py
+from app import storage  # importa la instancia inicializada en __init__.py
+from app.services.file_cleanup import policy_file_ids, delete_stored_files
 from flask_jwt_extended import get_jwt_identity
 import uuid
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import os
 from flask import current_app
-from app.clients.drive import ensure_folder_path, upload_file_to_folder,delete_file
+from app.utils.uploads import upload_size, upload_hash
+from app import upload_jobs
+from app.models.upload_job import UploadJob
+from app.utils.pagination import keyset_page, PaginationError
+from app.utils.sparse_fields import sparse_fieldset, FieldsError
+from sqlalchemy.orm import contains_eager
 
 policies_bp = Blueprint('policies', __name__, url_prefix='/api/policies')
 
@@ -20,6 +26,10 @@ policies_bp = Blueprint('policies', __name__, url_prefix='/api/policies')
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Ventana de ?within_days= en /expiring
+EXPIRING_DEFAULT_DAYS = 30
+EXPIRING_MAX_DAYS = 365
+
 def allowed_file(filename):
     """Verificar si el archivo tiene una extensión permitida"""
     return '.' in filename and \
@@ -33,10 +43,8 @@ def validate_file(file):
     if not allowed_file(file.filename):
         return False, "Tipo de archivo no permitido. Solo se aceptan: PDF, PNG, JPG, JPEG"
     
-    # Verificar tamaño (esto es aproximado, el tamaño real se verifica en el frontend)
-    file.seek(0, os.SEEK_END)
-    file_size = file.tell()
-    file.seek(0)  # Regresar al inicio del archivo
+    # Verificar tamaño (el spool ya cuenta los bytes mientras llega el archivo)
+    file_size = upload_size(file)
     
     if file_size > MAX_FILE_SIZE:
         return False, "El archivo excede el tamaño máximo permitido (10MB)"
@@ -55,17 +63,17 @@ def get_user_policys(user_id):
     if current_user['role'] == 'user' and user.id != current_user['id']:
         return jsonify({'success': False, 'message': 'No autorizado'}), 403
 
-    policies = InsurancePolicy.query.filter_by(user_id=user_id).all()
+    schema, options = sparse_fieldset(InsurancePolicysSchema, InsurancePolicy)
+    policies = InsurancePolicy.query.options(*options).filter_by(user_id=user_id).all()
 
     if not policies:
         return jsonify({'success': True, 'policies': []}), 200
 
-    print(policies)
     print("Get user policys Done", user_id)
 
     return jsonify({
         'success': True,
-        'policies': InsurancePolicysSchema.dump(policies)
+        'policies': schema.dump(policies)
     }), 200
 
 @policies_bp.route('/vehicle/<int:vehicle_id>', methods=['GET'])
@@ -125,8 +133,8 @@ def create_policy():
 
                 # Variables para el archivo
         file_url = None
-        file_path = None  # aquí guardaremos el file_id de Drive
-        drive_file_id = None
+        file_path = None  # aquí guardaremos el ID del archivo en el almacenamiento
+        async_item = None
 
         if 'policy_file' in request.files:
             policy_file = request.files['policy_file']
@@ -137,28 +145,36 @@ def create_policy():
                 if not is_valid:
                     return jsonify({'success': False, 'message': message}), 400
 
-                try:
-                    # Generar nombre único
-                    original_filename = secure_filename(policy_file.filename)
-                    file_extension = original_filename.rsplit('.', 1)[1].lower()
-                    unique_filename = f"policy_{user_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
-
-                    # Crear/obtener carpeta en Drive
-                    service = current_app.config["GDRIVE_SERVICE"]
-                    folder_id = ensure_folder_path(service, ["insurance_policies", f"user_{user_id}"])
-                    uploaded = upload_file_to_folder(service, policy_file.stream, unique_filename, policy_file.mimetype, folder_id)
-                    drive_file_id = uploaded["id"]
-                    file_url = uploaded.get("webViewLink") or uploaded.get("webContentLink")
-                    file_path = drive_file_id  # guarda el ID en tu campo file_path (o crea un campo dedicated)
-
-                    print(f"Archivo subido a Drive: id={drive_file_id}, url={file_url}")
-
-                except Exception as e:
-                    print(f"Error subiendo archivo a Drive: {str(e)}")
-                    return jsonify({
-                        'success': False,
-                        'message': f'Error subiendo archivo a Drive: {str(e)}'
-                    }), 500
+                # Generar nombre único
+                original_filename = secure_filename(policy_file.filename)
+                file_extension = original_filename.rsplit('.', 1)[1].lower()
+                unique_filename = f"policy_{user_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
+
+                if upload_jobs.wants_async(request):
+                    # Se sube en segundo plano; la póliza queda 'pending'
+                    async_item = {
+                        'spool_path': upload_jobs.spool(policy_file),
+                        'sha256': upload_hash(policy_file),
+                        'filename': unique_filename,
+                        'mimetype': policy_file.mimetype
+                    }
+                else:
+                    try:
+                        uploaded = storage.upload(
+                            policy_file.stream, unique_filename, policy_file.mimetype,
+                            ["insurance_policies", f"user_{user_id}"], content_hash=upload_hash(policy_file)
+                        )
+                        file_url = uploaded["url"]
+                        file_path = uploaded["id"]  # ID del archivo en el backend de almacenamiento
+
+                        print(f"Archivo subido ({storage.name}): id={file_path}, url={file_url}")
+
+                    except Exception as e:
+                        print(f"Error subiendo archivo: {str(e)}")
+                        return jsonify({
+                            'success': False,
+                            'message': f'Error subiendo archivo: {str(e)}'
+                        }), 500
 
 
 
@@ -174,10 +190,29 @@ def create_policy():
                 vehicle_id=int(vehicle_id),
                 user_id=int(user_id),
                 file_url=file_url,
-                file_path=file_path
+                file_path=file_path,
+                upload_status='pending' if async_item else ('ready' if file_path else None)
             )
 
             db.session.add(new_policy)
+
+            if async_item:
+                db.session.flush()
+                async_item['target_id'] = new_policy.id
+                job = upload_jobs.enqueue(
+                    UploadJob.KIND_INSURANCE_POLICY, current_user['id'],
+                    ["insurance_policies", f"user_{user_id}"], [async_item]
+                )
+                db.session.commit()
+
+                return jsonify({
+                    'success': True,
+                    'message': 'Póliza de seguro creada correctamente, el archivo se está subiendo',
+                    'policy': InsurancePolicySchema().dump(new_policy),
+                    'job_id': job.id,
+                    'status_url': f"/api/upload-jobs/{job.id}"
+                }), 202
+
             db.session.commit()
 
             return jsonify({
@@ -190,8 +225,8 @@ def create_policy():
             # Si hay error al guardar en BD, eliminar archivo subido
             if file_path:
                 try:
-                    cloud_storage_client.delete_file(file_path)
-                except:
+                    storage.delete(file_path)
+                except Exception:
                     pass
             
             db.session.rollback()
@@ -223,6 +258,7 @@ def update_policy(policy_id):
     if current_user['role'] == 'user' and vehicle.user_id != current_user['id']:
         return jsonify({'success': False, 'message': 'No autorizado'}), 403
 
+    replaced_id = None
     try:
         # Obtener datos del formulario
         if request.form:
@@ -265,34 +301,53 @@ def update_policy(policy_id):
                 if not is_valid:
                     return jsonify({'success': False, 'message': message}), 400
 
+                if upload_jobs.wants_async(request):
+                    # El archivo antiguo se elimina cuando el nuevo ya está subido
+                    original_filename = secure_filename(policy_file.filename)
+                    file_extension = original_filename.rsplit('.', 1)[1].lower()
+                    unique_filename = f"policy_{vehicle.user_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
+
+                    policy.upload_status = 'pending'
+                    job = upload_jobs.enqueue(
+                        UploadJob.KIND_INSURANCE_POLICY, current_user['id'],
+                        ["insurance_policies", f"user_{vehicle.user_id}"],
+                        [{
+                            'target_id': policy.id,
+                            'spool_path': upload_jobs.spool(policy_file),
+                            'sha256': upload_hash(policy_file),
+                            'filename': unique_filename,
+                            'mimetype': policy_file.mimetype,
+                            'replaces': policy.file_path
+                        }]
+                    )
+                    db.session.commit()
+
+                    return jsonify({
+                        'success': True,
+                        'message': 'Póliza actualizada correctamente, el archivo se está subiendo',
+                        'policy': InsurancePolicySchema().dump(policy),
+                        'job_id': job.id,
+                        'status_url': f"/api/upload-jobs/{job.id}"
+                    }), 202
+
                 try:
-                    # Eliminar archivo antiguo si existe
-                    if policy.file_path:  # aquí guardamos drive_file_id
-                        try:
-                            service = current_app.config["GDRIVE_SERVICE"]
-                            delete_file(service, policy.file_path)
-                            print(f"Archivo antiguo eliminado de Drive: {policy.file_path}")
-                        except Exception as e:
-                            print(f"Error eliminando archivo antiguo en Drive: {str(e)}")
+                    # El archivo antiguo se elimina tras el commit
+                    replaced_id = policy.file_path  # aquí guardamos el ID del archivo
                     # Generar nombre único para el nuevo archivo
                     original_filename = secure_filename(policy_file.filename)
                     file_extension = original_filename.rsplit('.', 1)[1].lower()
                     unique_filename = f"policy_{vehicle.user_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
                     
-                    # Crear la ruta completa para el archivo en Google Drive
-                    folder_path = f"insurance_policies/user_{vehicle.user_id}"
-                    file_path = f"{folder_path}/{unique_filename}"
-                    
-                    service = current_app.config["GDRIVE_SERVICE"]
-                    folder_id = ensure_folder_path(service, ["insurance_policies", f"user_{vehicle.user_id}"])
-                    uploaded = upload_file_to_folder(service, policy_file.stream, unique_filename, policy_file.mimetype, folder_id)
-                    drive_file_id = uploaded["id"]
-                    file_url = uploaded.get("webViewLink") or uploaded.get("webContentLink")
-                    file_path = drive_file_id  # guarda el ID en tu campo file_path (o crea un campo dedicated)
+                    uploaded = storage.upload(
+                        policy_file.stream, unique_filename, policy_file.mimetype,
+                        ["insurance_policies", f"user_{vehicle.user_id}"], content_hash=upload_hash(policy_file)
+                    )
+                    file_url = uploaded["url"]
 
                     # Actualizar campos en la póliza
                     policy.file_url = file_url
-                    policy.file_path = drive_file_id
+                    policy.file_path = uploaded["id"]
+                    policy.upload_status = 'ready'
                     
                     print(f"Nuevo archivo subido: {file_url}")
                     
@@ -306,6 +361,10 @@ def update_policy(policy_id):
         # Guardar cambios en la base de datos
         db.session.commit()
 
+        # Eliminar archivo antiguo si existe
+        if replaced_id:
+            delete_stored_files([replaced_id])
+
         return jsonify({
             'success': True,
             'message': 'Póliza actualizada correctamente',
@@ -338,19 +397,14 @@ def delete_policy(policy_id):
         return jsonify({'success': False, 'message': 'No autorizado'}), 403
 
     try:
-        # Eliminar archivo de Google Drive si existe
-        if policy.file_path:
-            try:
-                service = current_app.config["GDRIVE_SERVICE"]
-                delete_file(service, policy.file_path)
-                print(f"Archivo eliminado de Drive: {policy.file_path}")
-            except Exception as e:
-                print(f"Error eliminando archivo de Drive: {str(e)}")
-
         # Eliminar póliza de la base de datos
+        file_ids = policy_file_ids([policy])
         db.session.delete(policy)
         db.session.commit()
 
+        # Eliminar archivo del almacenamiento si existe (tras el commit)
+        delete_stored_files(file_ids)
+
         return jsonify({
             'success': True,
             'message': 'Póliza eliminada correctamente'
@@ -364,6 +418,43 @@ def delete_policy(policy_id):
             'message': f'Error eliminando póliza: {str(e)}'
         }), 500
 
+# Pólizas que vencen pronto (los monitores la revisan antes de cada salida)
+@policies_bp.route('/expiring', methods=['GET'])
+@token_required
+def get_expiring_policies():
+    """Pólizas que vencen entre hoy y ?within_days=N (por defecto 30), ordenadas por fecha"""
+    current_user = get_jwt_identity()
+    try:
+        within_days = int(request.args.get('within_days', EXPIRING_DEFAULT_DAYS))
+    except ValueError:
+        within_days = -1
+    if not 0 <= within_days <= EXPIRING_MAX_DAYS:
+        return jsonify({
+            'success': False,
+            'message': f'within_days debe ser un entero entre 0 y {EXPIRING_MAX_DAYS}'
+        }), 400
+
+    # Rango sobre el índice de end_date (user_id + end_date para un usuario normal)
+    query = InsurancePolicy.query.filter(InsurancePolicy.expiring_within(within_days))
+    if current_user['role'] == 'user':
+        query = query.filter(InsurancePolicy.user_id == current_user['id'])
+
+    schema, options = sparse_fieldset(InsurancePolicySchema(), InsurancePolicy)
+    policies, page = keyset_page(
+        query.join(Vehicle).options(contains_eager(InsurancePolicy.vehicle), *options),
+        InsurancePolicy.end_date, InsurancePolicy.id
+    )
+
+    policies_data = []
+    for policy in policies:
+        policy_dict = schema.dump(policy)
+        policy_dict['vehicle_info'] = f"{policy.vehicle.make} {policy.vehicle.model} ({policy.vehicle.year})"
+        policies_data.append(policy_dict)
+
+    response = {'success': True, 'within_days': within_days, 'policies': policies_data}
+    response.update(page or {'total': len(policies_data)})
+    return jsonify(response), 200
+
 # Ruta adicional para obtener todas las pólizas (admin)
 @policies_bp.route('/admin/all', methods=['GET'])
 @token_required
@@ -371,24 +462,29 @@ def delete_policy(policy_id):
 def get_all_policies():
     """Obtener todas las pólizas (solo para administradores)"""
     try:
-        policies = InsurancePolicy.query.join(Vehicle).join(User).all()
+        # Paginado con ?limit=&cursor= (sin ellos, todas); el vehículo llega en el mismo JOIN
+        schema, options = sparse_fieldset(InsurancePolicySchema(), InsurancePolicy)
+        policies, page = keyset_page(
+            InsurancePolicy.query.join(Vehicle).join(User).options(contains_eager(InsurancePolicy.vehicle), *options),
+            InsurancePolicy.id
+        )
         
         # Serializar con información adicional
         policies_data = []
         for policy in policies:
-            policy_dict = InsurancePolicySchema().dump(policy)
+            policy_dict = schema.dump(policy)
             # Agregar información del usuario y vehículo
             policy_dict['user_name'] = policy.user.name if hasattr(policy, 'user') else 'N/A'
             policy_dict['user_email'] = policy.user.email if hasattr(policy, 'user') else 'N/A'
             policy_dict['vehicle_info'] = f"{policy.vehicle.make} {policy.vehicle.model} ({policy.vehicle.year})" if hasattr(policy, 'vehicle') else 'N/A'
             policies_data.append(policy_dict)
         
-        return jsonify({
-            'success': True,
-            'policies': policies_data,
-            'total': len(policies_data)
-        }), 200
+        response = {'success': True, 'policies': policies_data}
+        response.update(page or {'total': len(policies_data)})
+        return jsonify(response), 200
 
+    except (PaginationError, FieldsError):
+        raise
     except Exception as e:
         print(f"Error obteniendo todas las pólizas: {str(e)}")
         return jsonify({
@@ -417,9 +513,9 @@ def download_policy_file(policy_id):
 
     try:
         # Generar URL de descarga temporal (válida por 1 hora)
-        download_url = cloud_storage_client.generate_download_url(
-            policy.file_path, 
-            expiration_time=3600  # 1 hora
+        download_url = storage.signed_url(
+            policy.file_path,
+            expiration=3600  # 1 hora
         )
         
         return jsonify({
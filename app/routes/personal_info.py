@@ -4,6 +4,8 @@ from app.models.user import User
 from app.utils.auth import token_required, admin_required, monitor_required
 from app.schemas.personal_info import PersonalInfoSchema, PersonalInfosSchema
 from app.services.db_client import db
+from app.utils.pagination import keyset_page
+from app.utils.sparse_fields import sparse_fieldset
 from flask_jwt_extended import get_jwt_identity
 
 personal_info_bp = Blueprint('personal_info', __name__, url_prefix='/api/personal-info')
@@ -11,10 +13,13 @@ personal_info_bp = Blueprint('personal_info', __name__, url_prefix='/api/persona
 @personal_info_bp.route('/', methods=['GET'])
 @monitor_required
 def get_all_personal_info():
-    personal_infos = PersonalInfo.query.all()
+    # Paginado con ?limit=&cursor= (sin ellos, la lista completa); ?fields= limita las columnas
+    schema, options = sparse_fieldset(PersonalInfosSchema, PersonalInfo)
+    personal_infos, page = keyset_page(PersonalInfo.query.options(*options), PersonalInfo.id)
     return jsonify({
         'success': True,
-        'personal_info': PersonalInfosSchema.dump(personal_infos)
+        'personal_info': schema.dump(personal_infos),
+        **page
     }), 200
 
 @personal_info_bp.route('/user/<int:user_id>', methods=['GET'])
@@ -0,0 +1,27 @@
+from flask import Blueprint, jsonify
+from app.models.upload_job import UploadJob
+from app.utils.auth import token_required
+from app.schemas.upload_job import UploadJobSchema
+from app.services.db_client import db
+from flask_jwt_extended import get_jwt_identity
+
+jobs_bp = Blueprint('upload_jobs', __name__, url_prefix='/api/upload-jobs')
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@token_required
+def get_upload_job(job_id):
+    """Estado y progreso de una subida asíncrona"""
+    current_user = get_jwt_identity()
+    job = db.session.get(UploadJob, job_id)
+
+    if not job:
+        return jsonify({'success': False, 'message': 'Trabajo de subida no encontrado'}), 404
+
+    # Verificar permisos
+    if current_user['role'] == 'user' and job.user_id != current_user['id']:
+        return jsonify({'success': False, 'message': 'No autorizado'}), 403
+
+    return jsonify({
+        'success': True,
+        'job': UploadJobSchema().dump(job)
+    }), 200
@@ -1,9 +1,19 @@
 from flask import Blueprint, request, jsonify
 from app.models.user import User
+from app.models.insurance_policy import InsurancePolicy
+from app.services.file_cleanup import vehicle_file_ids, policy_file_ids, delete_stored_files
 from app.utils.auth import token_required, admin_required
 from app.schemas.user import UserSchema, UsersSchema, UserCreateSchema, UserUpdateSchema
+from app.schemas.personal_info import PersonalInfoSchema
+from app.schemas.vehicle import VehiclesSchema
+from app.schemas.insurance_policy import InsurancePolicysSchema
+from app.schemas.emergency_contact import EmergencyContactsSchema
+from app.routes.vehicles import attach_primary_images
+from sqlalchemy.orm import selectinload
 from werkzeug.security import generate_password_hash
 from app.services.db_client import db
+from app.utils.pagination import keyset_page
+from app.utils.sparse_fields import sparse_fieldset
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 users_bp = Blueprint('users', __name__, url_prefix='/api/users')
@@ -11,10 +21,44 @@ users_bp = Blueprint('users', __name__, url_prefix='/api/users')
 @users_bp.route('/', methods=['GET'])
 @admin_required
 def get_users():
-    users = User.query.all()
+    # Paginado con ?limit=&cursor= (sin ellos, la lista completa); ?fields= limita las columnas
+    schema, options = sparse_fieldset(UsersSchema, User)
+    users, page = keyset_page(User.query.options(*options), User.id)
     return jsonify({
         'success': True,
-        'users': UsersSchema.dump(users)
+        'users': schema.dump(users),
+        **page
+    }), 200
+
+@users_bp.route('/<int:user_id>/profile', methods=['GET'])
+@token_required
+def get_user_profile(user_id):
+    """Perfil completo del socio (datos, información personal, vehículos, pólizas y contactos) en una llamada"""
+    current_user = get_jwt_identity()
+    if current_user['role'] == 'user' and current_user['id'] != user_id:
+        return jsonify({'success': False, 'message': 'No autorizado'}), 403
+
+    # filter_by en vez de get(): el usuario del token puede estar ya en la sesión sin sus relaciones
+    user = User.query.options(
+        selectinload(User.personal_info),
+        selectinload(User.vehicles),
+        selectinload(User.emergency_contacts)
+    ).filter_by(id=user_id).first()
+    if not user:
+        return jsonify({'success': False, 'message': 'Usuario no encontrado'}), 404
+
+    # Un socio puede tener varias pólizas (User.insurance_policy solo expone una)
+    policies = InsurancePolicy.query.filter_by(user_id=user_id).order_by(InsurancePolicy.id).all()
+    vehicles = attach_primary_images(sorted(user.vehicles, key=lambda vehicle: vehicle.id),
+                                     request.args.get('size', 'thumbnail'))
+
+    return jsonify({
+        'success': True,
+        'user': UserSchema().dump(user),
+        'personal_info': PersonalInfoSchema().dump(user.personal_info) if user.personal_info else None,
+        'vehicles': VehiclesSchema.dump(vehicles),
+        'policies': InsurancePolicysSchema.dump(policies),
+        'contacts': EmergencyContactsSchema.dump(sorted(user.emergency_contacts, key=lambda contact: contact.id))
     }), 200
 
 @users_bp.route('/<int:user_id>', methods=['GET'])
@@ -105,9 +149,14 @@ def delete_user(user_id):
     if not user:
         return jsonify({'success': False, 'message': 'Usuario no encontrado'}), 404
 
+    policies = InsurancePolicy.query.filter_by(user_id=user_id).all()
+    file_ids = vehicle_file_ids(user.vehicles) + policy_file_ids(policies)
     db.session.delete(user)
     db.session.commit()
 
+    # Eliminar del almacenamiento las imágenes y pólizas del usuario (en lote), tras el commit
+    delete_stored_files(file_ids)
+
     return jsonify({
         'success': True,
         'message': f'Usuario {user.email} eliminado correctamente'
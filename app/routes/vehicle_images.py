@@ -1,15 +1,130 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, send_file
 from app.models.vehicle_image import VehicleImage
 from app.models.vehicle import Vehicle
 from app.utils.auth import token_required, admin_required, monitor_required
 from app.schemas.vehicle_image import VehicleImageSchema, VehiclesImageSchema
 from app.services.db_client import db
-from app import cloud_storage_client  # importa la instancia inicializada en __init__.py
+from app import storage, image_cache  # importa las instancias inicializadas en __init__.py
+from app.services.upload_pipeline import UploadPipeline, UploadItem
+from app.services.file_cleanup import delete_stored_files
+from app.utils.uploads import upload_hash
+from app.utils.sparse_fields import sparse_fieldset
+from app.utils.images import IMAGE_VARIANTS, render_image, supported_output_mimes
+from flask import current_app
 from flask_jwt_extended import get_jwt_identity
+from werkzeug.utils import secure_filename
 import uuid
 
 images_bp = Blueprint('vehicle_images', __name__, url_prefix='/api/vehicle-images')
 
+def image_file_ids(image):
+    """IDs en el almacenamiento de todas las variantes de una imagen"""
+    paths = (image.image_path, image.medium_path, image.thumbnail_path)
+    return [file_id for file_id in (storage.file_id(path) for path in paths) if file_id]
+
+
+def upload_image_variants(image_file, vehicle):
+    """Comprimir y subir una imagen; devuelve {variante: {'id', 'url', 'name'}}"""
+    filename = f"{uuid.uuid4().hex[:8]}_{secure_filename(image_file.filename) or 'image.jpg'}"
+    item = UploadItem(image_file.stream, filename, image_file.mimetype, compress=True,
+                      content_hash=upload_hash(image_file))
+    pipeline = UploadPipeline.from_app(current_app, storage)
+    return pipeline.run([item], ["vehicle_images", f"user_{vehicle.user_id}", f"vehicle_{vehicle.id}"])[0]
+
+
+def proxy_width(value):
+    """Ancho pedido (?w=) redondeado hacia arriba a IMAGE_PROXY_WIDTHS (None = original)"""
+    if not value:
+        return None
+    width = int(value)
+    if width <= 0:
+        raise ValueError(value)
+    widths = current_app.config['IMAGE_PROXY_WIDTHS']
+    return next((w for w in widths if w >= width), widths[-1])
+
+
+def proxy_format():
+    """Formato preferido (IMAGE_PROXY_FORMATS) que el cliente declara en Accept; None = el de la imagen"""
+    # */* no cuenta: solo se cambia de formato si el cliente lo pide explícitamente
+    accepted = {mime for mime, quality in request.accept_mimetypes if quality > 0}
+    supported = supported_output_mimes()
+    return next(
+        (mime for mime in current_app.config.get('IMAGE_PROXY_FORMATS', ()) if mime in accepted and mime in supported),
+        None
+    )
+
+
+def variant_for_width(width):
+    """Variante almacenada más pequeña que cubre el ancho pedido"""
+    if width:
+        for name, (max_width, _) in sorted(IMAGE_VARIANTS, key=lambda v: v[1][0]):
+            if max_width >= width:
+                return name
+    return 'full'
+
+
+@images_bp.route('/<int:image_id>/content', methods=['GET'])
+@token_required
+def get_vehicle_image_content(image_id):
+    """Servir la imagen (redimensionada con ?w=) desde la caché en disco"""
+    current_user = get_jwt_identity()
+    image = VehicleImage.query.get(image_id)
+
+    if not image:
+        return jsonify({'success': False, 'message': 'Imagen no encontrada'}), 404
+
+    # Verificar permisos mediante el vehículo asociado
+    vehicle = Vehicle.query.get(image.vehicle_id)
+    if not vehicle:
+        return jsonify({'success': False, 'message': 'Vehículo asociado no encontrado'}), 404
+
+    if current_user['role'] == 'user' and vehicle.user_id != current_user['id']:
+        return jsonify({'success': False, 'message': 'No autorizado'}), 403
+
+    if image.upload_status != 'ready' or not image.image_path:
+        return jsonify({'success': False, 'message': 'La imagen aún no está disponible'}), 404
+
+    try:
+        width = proxy_width(request.args.get('w'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'El parámetro w debe ser un entero positivo'}), 400
+
+    output_mime = proxy_format()
+    file_id = storage.file_id(image.variant_path(variant_for_width(width)))
+    # Un archivo almacenado no cambia (una imagen nueva tiene otro ID): la clave sirve de ETag fuerte
+    etag = image_cache.key(storage.name, file_id, width or 'original', output_mime or 'original')
+    max_age = current_app.config.get('IMAGE_CACHE_MAX_AGE', 0)
+
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+    else:
+        def render():
+            with storage.stream(file_id) as source:
+                return render_image(
+                    source, width, output_mime=output_mime,
+                    target_bytes=current_app.config.get('IMAGE_TARGET_BYTES') or None
+                )
+
+        try:
+            path, mimetype = image_cache.get_or_create(etag, render)
+        except Exception as e:
+            print(f"Error obteniendo imagen {image_id}: {str(e)}")
+            return jsonify({'success': False, 'message': f'Error obteniendo imagen: {str(e)}'}), 502
+
+        # conditional=True: If-None-Match/If-Modified-Since y Range (206)
+        response = send_file(path, mimetype=mimetype, conditional=True, etag=etag, max_age=max_age)
+
+    # Requiere token: solo la caché del navegador, nunca una compartida
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    response.cache_control.immutable = True
+    # La respuesta depende del formato negociado
+    response.vary.add('Accept')
+    return response
+
+
 @images_bp.route('/vehicle/<int:vehicle_id>', methods=['GET'])
 @token_required
 def get_vehicle_images(vehicle_id):
@@ -24,11 +139,12 @@ def get_vehicle_images(vehicle_id):
     if current_user['role'] == 'user' and vehicle.user_id != current_user['id']:
         return jsonify({'success': False, 'message': 'No autorizado'}), 403
 
-    images = VehicleImage.query.filter_by(vehicle_id=vehicle_id).all()
+    schema, options = sparse_fieldset(VehiclesImageSchema, VehicleImage)
+    images = VehicleImage.query.options(*options).filter_by(vehicle_id=vehicle_id).all()
 
     return jsonify({
         'success': True,
-        'images': VehiclesImageSchema.dump(images)
+        'images': schema.dump(images)
     }), 200
 
 @images_bp.route('/', methods=['POST'])
@@ -63,15 +179,19 @@ def upload_vehicle_image():
     if not image_file.content_type.startswith('image/'):
         return jsonify({'success': False, 'message': 'El archivo debe ser una imagen'}), 400
 
-    # Subir archivo a Google Cloud Storage
-    unique_filename = f"vehicle_images/{vehicle.user_id}/{vehicle_id}/{uuid.uuid4()}_{image_file.filename}"
-    image_url = cloud_storage_client.upload_file(image_file, folder=f"vehicle_images/{unique_filename}")
+    # Comprimir y subir la imagen (full/medium/thumbnail)
+    try:
+        variants = upload_image_variants(image_file, vehicle)
+    except Exception as e:
+        print(f"Error subiendo imagen: {str(e)}")
+        return jsonify({'success': False, 'message': f'Error subiendo imagen: {str(e)}'}), 500
 
     # Crear registro en la base de datos
     new_image = VehicleImage(
         vehicle_id=vehicle_id,
-        image_url=image_url,
-        image_path=unique_filename,
+        image_path=variants['full']['url'],
+        medium_path=variants['medium']['url'],
+        thumbnail_path=variants['thumbnail']['url'],
         description=description
     )
 
@@ -106,6 +226,7 @@ def update_vehicle_image(image_id):
         image.description = request.form.get('description')
 
     # Actualizar imagen si se proporcionó una nueva
+    replaced_ids = []
     if 'image' in request.files and request.files['image'].filename != '':
         image_file = request.files['image']
 
@@ -113,20 +234,24 @@ def update_vehicle_image(image_id):
         if not image_file.content_type.startswith('image/'):
             return jsonify({'success': False, 'message': 'El archivo debe ser una imagen'}), 400
 
-        # Eliminar imagen antigua
-        if image.image_path:
-            cloud_storage_client.delete_file(image.image_path)
-
         # Subir nueva imagen
-        unique_filename = f"vehicle_images/{vehicle.user_id}/{vehicle.id}/{uuid.uuid4()}_{image_file.filename}"
-
-        image_url = cloud_storage_client.upload_file(image_file, folder=f"vehicle_images/{unique_filename}")
-
-        image.image_url = image_url
-        image.image_path = unique_filename
+        try:
+            variants = upload_image_variants(image_file, vehicle)
+        except Exception as e:
+            print(f"Error subiendo imagen: {str(e)}")
+            return jsonify({'success': False, 'message': f'Error subiendo imagen: {str(e)}'}), 500
+
+        replaced_ids = image_file_ids(image)
+        image.image_path = variants['full']['url']
+        image.medium_path = variants['medium']['url']
+        image.thumbnail_path = variants['thumbnail']['url']
+        image.upload_status = 'ready'
 
     db.session.commit()
 
+    # Eliminar imagen antigua (cuando la nueva ya está guardada)
+    delete_stored_files(replaced_ids)
+
     return jsonify({
         'success': True,
         'message': 'Imagen actualizada correctamente',
@@ -150,13 +275,13 @@ def delete_vehicle_image(image_id):
     if current_user['role'] == 'user' and vehicle.user_id != current_user['id']:
         return jsonify({'success': False, 'message': 'No autorizado'}), 403
 
-    # Eliminar archivo de Google Cloud Storage
-    if image.image_path:
-        cloud_storage_client.delete_file(image.image_path)
-
+    file_ids = image_file_ids(image)
     db.session.delete(image)
     db.session.commit()
 
+    # Eliminar archivos del almacenamiento (tras el commit)
+    delete_stored_files(file_ids)
+
     return jsonify({
         'success': True,
         'message': 'Imagen eliminada correctamente'
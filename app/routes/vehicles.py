@@ -2,46 +2,27 @@ from flask import Blueprint, request, jsonify
 from app.models import user
 from app.models.vehicle import Vehicle
 from app.utils.auth import token_required, admin_required, monitor_required
-from app.schemas.vehicle import VehiclesSchema,VehicleSchema
+from app.schemas.vehicle import VehiclesSchema,VehicleSchema, VehicleUpdateSchema
 from app.services.db_client import db
+from app.utils.bulk import bulk_items, bulk_write, bulk_status
+from app.utils.pagination import keyset_page
+from app.utils.sparse_fields import sparse_fieldset
 from flask_jwt_extended import get_jwt_identity
 from werkzeug.utils import secure_filename
 from flask import current_app
-from app.clients.drive import ensure_folder_path, upload_file_to_folder,delete_file
+from app.utils.uploads import upload_size, upload_hash
+from app.clients.drive import drive_file_id
+from app.services.file_cleanup import vehicle_file_ids, policy_file_ids, delete_stored_files
+from app.services.upload_pipeline import UploadPipeline, UploadItem
+from app import storage, upload_jobs
+from app.models.upload_job import UploadJob
 import uuid
 import os
+from functools import lru_cache
 from app.models.vehicle_image import VehicleImage
 from app.schemas.vehicle_image import VehicleImageSchema, VehiclesImageSchema
 
-
-from PIL import Image
-from io import BytesIO
-
-def compress_image(file_stream, mime_type, max_size=(1920, 1920), quality=80):
-    image = Image.open(file_stream)
-
-    # Convertir a RGB si es necesario (PNG con alpha, etc.)
-    if image.mode in ("RGBA", "P"):
-        image = image.convert("RGB")
-
-    # Redimensionar manteniendo proporción
-    image.thumbnail(max_size)
-
-    output = BytesIO()
-
-    if mime_type in ("image/jpeg", "image/jpg"):
-        image.save(output, format="JPEG", quality=quality, optimize=True)
-        new_mime = "image/jpeg"
-        ext = ".jpg"
-    else:
-        # PNG optimizado
-        image.save(output, format="PNG", optimize=True)
-        new_mime = "image/png"
-        ext = ".png"
-
-    output.seek(0)
-    return output, new_mime, ext
-
+from app.utils.images import compress_image, IMAGE_VARIANTS
 
 vehicles_bp = Blueprint('vehicles', __name__, url_prefix='/api/vehicles')
 
@@ -63,10 +44,8 @@ def validate_file(file):
     if not allowed_file(file.filename):
         return False, "Tipo de archivo no permitido. Solo se aceptan: PNG, JPG, JPEG"
     
-    # Verificar tamaño (esto es aproximado, el tamaño real se verifica en el frontend)
-    file.seek(0, os.SEEK_END)
-    file_size = file.tell()
-    file.seek(0)  # Regresar al inicio del archivo
+    # Verificar tamaño (el spool ya cuenta los bytes mientras llega el archivo)
+    file_size = upload_size(file)
     
     if file_size > MAX_FILE_SIZE:
         return False, "El archivo excede el tamaño máximo permitido (10MB)"
@@ -74,34 +53,44 @@ def validate_file(file):
     return True, "Archivo válido"
 
 
-import re
-
+@lru_cache(maxsize=4096)
 def convert_drive_url_to_direct(url: str) -> str:
-    if not url:
+    if not url or "drive.google.com" not in url:
         return url
 
-    patterns = [
-        r"https://drive\.google\.com/file/d/([^/]+)",
-        r"https://drive\.google\.com/open\?id=([^&]+)",
-        r"https://drive\.google\.com/uc\?export=view&id=([^&]+)",
-        r"https://drive\.google\.com/uc\?id=([^&]+)"
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            file_id = match.group(1)
-            return f"https://lh3.googleusercontent.com/d/{file_id}"
+    file_id = drive_file_id(url)
+    if file_id:
+        return f"https://lh3.googleusercontent.com/d/{file_id}"
 
     return url
 
+
+def attach_primary_images(vehicles, size='thumbnail', schema=None):
+    """Asigna image e image_content_url a cada vehículo con una sola consulta de imágenes"""
+    if schema is not None and not {'image', 'image_content_url'} & set(schema.fields):
+        # ?fields= no pide la imagen: no hace falta consultarla
+        return vehicles
+    width = dict(IMAGE_VARIANTS).get(size, (320, 320))[0]
+    images = VehicleImage.primary_by_vehicle([vehicle.id for vehicle in vehicles])
+    for vehicle in vehicles:
+        img = images.get(vehicle.id)
+        if img:
+            vehicle.image = convert_drive_url_to_direct(img.variant_path(size))
+            vehicle.image_content_url = f"/api/vehicle-images/{img.id}/content?w={width}"
+    return vehicles
+
+
 @vehicles_bp.route('/', methods=['GET'])
 @monitor_required
 def get_all_vehicles():
-    vehicles = Vehicle.query.all()
+    # Paginado con ?limit=&cursor= (sin ellos, la lista completa); ?fields= limita las columnas
+    schema, options = sparse_fieldset(VehiclesSchema, Vehicle)
+    vehicles, page = keyset_page(Vehicle.query.options(*options), Vehicle.id)
+    attach_primary_images(vehicles, request.args.get('size', 'thumbnail'), schema)
     return jsonify({
         'success': True,
-        'vehicles': VehiclesSchema.dump(vehicles)
+        'vehicles': schema.dump(vehicles),
+        **page
     }), 200
 
 @vehicles_bp.route('/user/<int:user_id>', methods=['GET'])
@@ -113,16 +102,14 @@ def get_user_vehicles(user_id):
     if current_user['role'] == 'user' and current_user['id'] != user_id:
         return jsonify({'success': False, 'message': 'No autorizado'}), 403
 
-    vehicles = Vehicle.query.filter_by(user_id=user_id).all()
-    print("Vehicles: ", vehicles)
+    schema, options = sparse_fieldset(VehiclesSchema, Vehicle)
+    vehicles = Vehicle.query.options(*options).filter_by(user_id=user_id).all()
 
-    for vehicle in vehicles:
-        img = VehicleImage.query.filter_by(vehicle_id=vehicle.id).all()
-        if(img):
-            vehicle.image = convert_drive_url_to_direct(img[0].image_path)
+    # Las tarjetas del listado usan la variante más pequeña (?size=thumbnail|medium|full)
+    attach_primary_images(vehicles, request.args.get('size', 'thumbnail'), schema)
     return jsonify({
         'success': True,
-        'vehicles': VehiclesSchema.dump(vehicles)
+        'vehicles': schema.dump(vehicles)
     }), 200
 
 @vehicles_bp.route('/<int:vehicle_id>', methods=['GET'])
@@ -165,52 +152,46 @@ def create_vehicle():
     else:
         user_id = data.get('user_id', current_user['id'])
 
+    files = []
     if 'vehicle_files' in request.files:
-        #policy_file = request.files['vehicle_file']
-        files = request.files.getlist('vehicle_files')
-        paths = []
-        for policy_file in files:
-            if policy_file and policy_file.filename != '':
-                # Validar archivo
-                is_valid, message = validate_file(policy_file)
-                if not is_valid:
-                    return jsonify({'success': False, 'message': message}), 400
-
-                try:
-                    # Generar nombre único
-                    original_filename = secure_filename(policy_file.filename)
-                    file_extension = original_filename.rsplit('.', 1)[1].lower()
-                    unique_filename = f"vehicle_{data['model']}_{user_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
-
-                    compressed_stream, new_mime, ext = compress_image(
-                        policy_file.stream,
-                        policy_file.mimetype
-                    )
-
-
-                    # Crear/obtener carpeta en Drive
-                    service = current_app.config["GDRIVE_SERVICE"]
-                    folder_id = ensure_folder_path(service, ["Vehicles", f"user_{user_id}"])
-                    uploaded = upload_file_to_folder(
-                        service,
-                        compressed_stream,
-                        unique_filename,
-                        new_mime,
-                        folder_id
-                    )
-                    #uploaded = upload_file_to_folder(service, policy_file.stream, unique_filename, policy_file.mimetype, folder_id)
-                    drive_file_id = uploaded["id"]
-                    file_url = uploaded.get("webViewLink") or uploaded.get("webContentLink")
-                    paths.append(file_url)  # guarda el ID en tu campo file_path (o crea un campo dedicated)
-
-                    print(f"Archivo subido a Drive: id={drive_file_id}, url={file_url}")
-
-                except Exception as e:
-                    print(f"Error subiendo archivo a Drive: {str(e)}")
-                    return jsonify({
-                        'success': False,
-                        'message': f'Error subiendo archivo a Drive: {str(e)}'
-                    }), 500
+        files = [f for f in request.files.getlist('vehicle_files') if f and f.filename != '']
+
+    # Validar todos los archivos antes de subir cualquiera
+    filenames = []
+    for vehicle_file in files:
+        is_valid, message = validate_file(vehicle_file)
+        if not is_valid:
+            return jsonify({'success': False, 'message': message}), 400
+
+        # Generar nombre único
+        original_filename = secure_filename(vehicle_file.filename)
+        file_extension = original_filename.rsplit('.', 1)[1].lower()
+        filenames.append(f"vehicle_{data['model']}_{user_id}_{uuid.uuid4().hex[:8]}.{file_extension}")
+
+    folder_parts = ["Vehicles", f"user_{user_id}"]
+    async_upload = bool(files) and upload_jobs.wants_async(request)
+
+    paths = []
+    if files and not async_upload:
+        items = [
+            UploadItem(vehicle_file.stream, filename, vehicle_file.mimetype, compress=True,
+                       content_hash=upload_hash(vehicle_file))
+            for vehicle_file, filename in zip(files, filenames)
+        ]
+        try:
+            # Comprimir y subir en paralelo (todo o nada)
+            pipeline = UploadPipeline.from_app(current_app, storage)
+            for variants in pipeline.run(items, folder_parts):
+                urls = {name: uploaded['url'] for name, uploaded in variants.items()}
+                paths.append(urls)
+                print(f"Archivo subido ({storage.name}): id={variants['full']['id']}, url={urls['full']}")
+
+        except Exception as e:
+            print(f"Error subiendo archivo: {str(e)}")
+            return jsonify({
+                'success': False,
+                'message': f'Error subiendo archivo: {str(e)}'
+            }), 500
 
     new_vehicle = Vehicle(
         description=data.get('description', ''),
@@ -228,10 +209,43 @@ def create_vehicle():
     db.session.add(new_vehicle)
     db.session.commit()
 
-    for file in paths:
+    if async_upload:
+        # Las imágenes quedan 'pending' hasta que el worker las sube al almacenamiento
+        job_items = []
+        for vehicle_file, filename in zip(files, filenames):
+            new_image = VehicleImage(
+                vehicle_id=new_vehicle.id,
+                image_path='',
+                description="",
+                upload_status='pending'
+            )
+            db.session.add(new_image)
+            db.session.flush()
+            job_items.append({
+                'target_id': new_image.id,
+                'spool_path': upload_jobs.spool(vehicle_file),
+                'sha256': upload_hash(vehicle_file),
+                'filename': filename,
+                'mimetype': vehicle_file.mimetype,
+                'compress': True
+            })
+        job = upload_jobs.enqueue(UploadJob.KIND_VEHICLE_IMAGES, current_user['id'], folder_parts, job_items)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': 'Vehículo creado correctamente, las imágenes se están subiendo',
+            'vehicle': vehicle_schema.dump(new_vehicle),
+            'job_id': job.id,
+            'status_url': f"/api/upload-jobs/{job.id}"
+        }), 202
+
+    for urls in paths:
         new_image = VehicleImage(
             vehicle_id=new_vehicle.id,
-            image_path=file,
+            image_path=urls['full'],
+            medium_path=urls.get('medium'),
+            thumbnail_path=urls.get('thumbnail'),
             description=""
         )
 
@@ -246,6 +260,19 @@ def create_vehicle():
         'vehicle': vehicle_schema.dump(new_vehicle)
     }), 201
 
+@vehicles_bp.route('/bulk', methods=['POST'])
+@token_required
+def bulk_vehicles():
+    """Crear (sin id) o actualizar (con id) varios vehículos en una sola transacción"""
+    current_user = get_jwt_identity()
+    results = bulk_write(Vehicle, bulk_items(), VehicleSchema(), VehicleUpdateSchema(), current_user)
+    status = bulk_status(results)
+    return jsonify({
+        'success': status == 201,
+        'message': f"{sum(r['success'] for r in results)} de {len(results)} vehículos guardados",
+        'results': results
+    }), status
+
 @vehicles_bp.route('/<int:vehicle_id>', methods=['PUT'])
 @token_required
 def update_vehicle(vehicle_id):
@@ -309,9 +336,14 @@ def delete_vehicle(vehicle_id):
     if current_user['role'] != 'admin' and vehicle.user_id != current_user['id']:
         return jsonify({'success': False, 'message': 'No autorizado'}), 403
 
+    file_ids = vehicle_file_ids([vehicle]) + policy_file_ids([vehicle.insurance_policy])
     db.session.delete(vehicle)
     db.session.commit()
 
+    # Eliminar del almacenamiento las imágenes y la póliza del vehículo (en lote),
+    # solo cuando las filas ya no existen: si el commit falla los archivos siguen
+    delete_stored_files(file_ids)
+
     return jsonify({
         'success': True,
         'message': 'Vehículo eliminado correctamente'
@@ -5,3 +5,4 @@ from app.schemas.personal_info import PersonalInfoSchema, PersonalInfoUpdateSche
 from app.schemas.emergency_contact import EmergencyContactSchema, EmergencyContactUpdateSchema
 from app.schemas.insurance_policy import InsurancePolicySchema, InsurancePolicyUpdateSchema
 from app.schemas.vehicle_image import VehicleImageSchema, VehicleImageUpdateSchema
+from app.schemas.upload_job import UploadJobSchema
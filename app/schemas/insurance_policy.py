@@ -17,11 +17,19 @@ class InsurancePolicySchema(Schema):
     updated_at = fields.DateTime(dump_only=True)
     file_url = fields.String(allow_none=True, dump_only=True)
     file_path = fields.String(allow_none=True, dump_only=True)
+    upload_status = fields.String(allow_none=True, dump_only=True)
     
     has_file = fields.Method("get_has_file", dump_only=True)
     is_expired = fields.Method("get_is_expired", dump_only=True)
     days_to_expire = fields.Method("get_days_to_expire", dump_only=True)
     
+    # Columnas que leen los campos calculados (?fields= con load_only)
+    field_columns = {
+        'has_file': ('file_url', 'file_path'),
+        'is_expired': ('end_date',),
+        'days_to_expire': ('end_date',),
+    }
+
     def get_has_file(self, obj):
         """Verificar si tiene archivo asociado"""
         return obj.has_file
@@ -0,0 +1,15 @@
+from marshmallow import Schema, fields
+
+class UploadJobSchema(Schema):
+    """Schema for UploadJob model"""
+    id = fields.String(dump_only=True)
+    kind = fields.String(dump_only=True)
+    user_id = fields.Integer(dump_only=True)
+    status = fields.String(dump_only=True)
+    total_items = fields.Integer(dump_only=True)
+    completed_items = fields.Integer(dump_only=True)
+    progress = fields.Float(dump_only=True)
+    error = fields.String(allow_none=True, dump_only=True)
+    created_at = fields.DateTime(dump_only=True)
+    updated_at = fields.DateTime(dump_only=True)
+    finished_at = fields.DateTime(allow_none=True, dump_only=True)
@@ -16,6 +16,7 @@ class VehicleSchema(Schema):
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
     image = fields.String()
+    image_content_url = fields.String(dump_only=True)  # proxy con caché: /api/vehicle-images/<id>/content?w=
     @validates('year')
     def validate_year(self, value):
         current_year = datetime.datetime.now().year
@@ -5,8 +5,12 @@ class VehicleImageSchema(Schema):
     id = fields.Integer(dump_only=True)
     vehicle_id = fields.Integer(required=True)
     image_path = fields.String(required=True, validate=validate.Length(min=1, max=255))
+    medium_path = fields.String(allow_none=True, dump_only=True)
+    thumbnail_path = fields.String(allow_none=True, dump_only=True)
     description = fields.String(validate=validate.Length(max=255))
     is_primary = fields.Boolean(default=False)
+    upload_status = fields.String(dump_only=True)
+    content_url = fields.Function(lambda image: f"/api/vehicle-images/{image.id}/content", dump_only=True)
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
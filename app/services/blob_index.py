@@ -0,0 +1,84 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.stored_blob import StoredBlob
+
+
+class BlobIndex:
+    """Reference-counted index from content hash (SHA-256) to stored file
+
+    Every row pointing at a stored file holds one reference. Uploads whose
+    hash is already indexed reuse the stored file (``acquire``) and deletes
+    only reach the backend when the last reference is released. Writes use
+    their own connection, like DriveFolderCache, so they never commit the
+    request session.
+    """
+
+    @property
+    def _table(self):
+        return StoredBlob.__table__
+
+    def acquire(self, backend, content_hash, variant='original'):
+        """Add a reference to an indexed file and return {'id', 'url', 'name'}, or None"""
+        table = self._table
+        key = (
+            table.c.backend == backend,
+            table.c.content_hash == content_hash,
+            table.c.variant == variant
+        )
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(*key, table.c.ref_count > 0)
+                .values(ref_count=table.c.ref_count + 1, updated_at=datetime.utcnow())
+            )
+            if result.rowcount != 1:
+                return None
+            row = conn.execute(select(table.c.file_id, table.c.url, table.c.name).where(*key)).one()
+        return {'id': row.file_id, 'url': row.url, 'name': row.name}
+
+    def register(self, backend, content_hash, variant, uploaded):
+        """
+        Index a fresh upload with one reference. Returns None, or the file
+        indexed by a concurrent upload of the same content (already
+        acquired); the caller then removes its own copy.
+        """
+        table = self._table
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(table.insert().values(
+                    backend=backend, content_hash=content_hash, variant=variant,
+                    file_id=uploaded['id'], url=uploaded.get('url'), name=uploaded.get('name'),
+                    ref_count=1, created_at=now, updated_at=now
+                ))
+            return None
+        except IntegrityError:
+            return self.acquire(backend, content_hash, variant)
+
+    def release(self, backend, file_ids):
+        """
+        Drop one reference per occurrence of each ID. Returns the IDs that
+        are no longer referenced (or were never indexed) and can be deleted
+        from storage.
+        """
+        table = self._table
+        removable = []
+        with db.engine.begin() as conn:
+            for file_id, count in Counter(f for f in file_ids if f).items():
+                key = (table.c.backend == backend, table.c.file_id == file_id)
+                result = conn.execute(
+                    update(table)
+                    .where(*key)
+                    .values(ref_count=table.c.ref_count - count, updated_at=datetime.utcnow())
+                )
+                if result.rowcount == 0:
+                    # Archivo subido antes de la deduplicación: no tiene entrada
+                    removable.append(file_id)
+                    continue
+                deleted = conn.execute(delete(table).where(*key, table.c.ref_count <= 0))
+                if deleted.rowcount:
+                    removable.append(file_id)
+        return removable
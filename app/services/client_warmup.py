@@ -0,0 +1,29 @@
+import threading
+import time
+
+
+class ClientWarmup(threading.Thread):
+    """Connects the Google clients in the background after startup
+
+    Every client exposes ``connect()``; failures are retried with backoff
+    and otherwise left to the first request that needs the client.
+    """
+
+    def __init__(self, clients, retries=3, delay=2.0):
+        super().__init__(name='client-warmup', daemon=True)
+        self.clients = clients
+        self.retries = retries
+        self.delay = delay
+
+    def run(self):
+        for name, client in self.clients.items():
+            for attempt in range(1, self.retries + 1):
+                started = time.monotonic()
+                try:
+                    client.connect()
+                    print(f"Cliente {name} conectado en {time.monotonic() - started:.2f}s")
+                    break
+                except Exception as e:
+                    print(f"Error conectando cliente {name} (intento {attempt}/{self.retries}): {str(e)}")
+                    if attempt < self.retries:
+                        time.sleep(self.delay * attempt)
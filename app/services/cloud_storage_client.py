@@ -1,37 +1,91 @@
+import math
 import os
+import threading
+import time
 import uuid
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timezone
 from google.cloud import storage
 from werkzeug.utils import secure_filename
 
 class CloudStorageClient:
-    """Client for Google Cloud Storage operations"""
+    """Client for Google Cloud Storage operations
+
+    ``init_app`` only records the configuration; the storage client and
+    bucket are created on first use (or by ``connect()`` from a warm-up
+    thread), so a slow Google API never blocks app startup.
+
+    Signed URLs are kept in a bounded LRU keyed by (blob, method, lifetime).
+    Their expiry is rounded up to a multiple of ``GCS_SIGNED_URL_BUCKET``
+    seconds, so every request inside the same bucket gets the identical URL
+    (cacheable by browsers and CDNs) and still at least the lifetime it asked for.
+    """
+
+    # Límite de Google para URLs firmadas V4
+    MAX_SIGNED_URL_LIFETIME = 7 * 24 * 3600
 
     def __init__(self, app=None):
         self.client = None
         self.bucket = None
         self.bucket_name = None
+        self.credentials_path = None
+        self.connected_at = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self.signed_url_bucket = 900
+        self.signed_url_cache_size = 1024
+        self._signed_urls = OrderedDict()
+        self._signed_urls_lock = threading.Lock()
 
         if app:
             self.init_app(app)
 
     def init_app(self, app):
-        """Initialize with Flask app"""
-        # Set credentials file path from app config
-        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = app.config['GOOGLE_APPLICATION_CREDENTIALS']
-
-        # Initialize storage client
-        self.client = storage.Client()
-
-        # Get bucket name from app config
+        """Initialize with Flask app (no network calls)"""
+        self.credentials_path = app.config['GOOGLE_APPLICATION_CREDENTIALS']
         self.bucket_name = app.config['GCS_BUCKET_NAME']
+        self.signed_url_bucket = app.config.get('GCS_SIGNED_URL_BUCKET', self.signed_url_bucket)
+        self.signed_url_cache_size = app.config.get('GCS_SIGNED_URL_CACHE_SIZE', self.signed_url_cache_size)
+
+    def connect(self):
+        """Create the storage client and bucket if not done yet"""
+        if self.bucket is not None:
+            return self.bucket
+        if not self.bucket_name:
+            raise RuntimeError("Cloud Storage client not initialized")
 
-        # Get or create bucket
-        try:
-            self.bucket = self.client.get_bucket(self.bucket_name)
-        except Exception:
-            # Create bucket if it doesn't exist
-            self.bucket = self.client.create_bucket(self.bucket_name)
+        with self._lock:
+            if self.bucket is not None:
+                return self.bucket
+            try:
+                # Set credentials file path from app config
+                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = self.credentials_path
+
+                # Initialize storage client
+                client = storage.Client()
+
+                # Get or create bucket
+                try:
+                    bucket = client.get_bucket(self.bucket_name)
+                except Exception:
+                    # Create bucket if it doesn't exist
+                    bucket = client.create_bucket(self.bucket_name)
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+
+            self.client, self.bucket = client, bucket
+            self.connected_at = datetime.utcnow()
+            self.last_error = None
+            return bucket
+
+    def status(self):
+        """Connection state for readiness checks"""
+        return {
+            'connected': self.bucket is not None,
+            'connected_at': self.connected_at.isoformat() if self.connected_at else None,
+            'error': self.last_error
+        }
 
     def upload_file(self, file_obj, folder='', allowed_extensions=None):
         """
@@ -45,8 +99,7 @@ class CloudStorageClient:
         Returns:
             Cloud Storage path of the uploaded file
         """
-        if not self.client or not self.bucket:
-            raise RuntimeError("Cloud Storage client not initialized")
+        self.connect()
 
         # Check if file is allowed
         if allowed_extensions:
@@ -67,14 +120,31 @@ class CloudStorageClient:
         else:
             path = filename
 
-        # Upload file
+        return self.upload_stream(file_obj, path, getattr(file_obj, 'content_type', None)).public_url
+
+    def upload_stream(self, stream, path, content_type=None, public=True):
+        """
+        Upload a binary stream to ``path`` in the bucket
+
+        Args:
+            stream: Readable binary file object
+            path: Blob name
+            content_type: MIME type of the file (optional)
+            public: Make the blob publicly readable (default: True)
+
+        Returns:
+            The uploaded blob
+        """
+        self.connect()
+
         blob = self.bucket.blob(path)
-        blob.upload_from_file(file_obj)
+        blob.upload_from_file(stream, content_type=content_type)
 
         # Make the file publicly accessible
-        blob.make_public()
+        if public:
+            blob.make_public()
 
-        return blob.public_url
+        return blob
 
     def delete_file(self, file_path):
         """
@@ -83,49 +153,93 @@ class CloudStorageClient:
         Args:
             file_path: Path of the file to delete
         """
-        if not self.client or not self.bucket:
-            raise RuntimeError("Cloud Storage client not initialized")
+        self.connect()
 
-        # Extract blob name from full path or URL
-        if 'https://' in file_path:
-            # Extract the path from the URL
-            blob_name = file_path.split(f"{self.bucket_name}/")[1]
-        else:
-            # Use the path directly
-            blob_name = file_path
+        blob_name = self.blob_name(file_path)
 
         # Delete file
         blob = self.bucket.blob(blob_name)
         blob.delete()
+        self.forget_signed_urls(blob_name)
 
-    def generate_signed_url(self, file_path, expiration=3600):
+    def generate_signed_url(self, file_path, expiration=3600, method="GET"):
         """
         Generate a signed URL for a file
 
         Args:
             file_path: Path of the file
-            expiration: Expiration time in seconds (default: 1 hour)
+            expiration: Minimum lifetime of the URL in seconds (default: 1 hour)
+            method: HTTP method the URL is valid for (default: GET)
 
         Returns:
-            Signed URL for the file
+            Signed URL for the file, reused from the cache while it still
+            covers ``expiration`` seconds
         """
-        if not self.client or not self.bucket:
-            raise RuntimeError("Cloud Storage client not initialized")
+        blob_name = self.blob_name(file_path)
+        key = (blob_name, method, expiration)
+        now = time.time()
 
-        # Extract blob name from full path or URL
-        if 'https://' in file_path:
-            # Extract the path from the URL
-            blob_name = file_path.split(f"{self.bucket_name}/")[1]
-        else:
-            # Use the path directly
-            blob_name = file_path
+        with self._signed_urls_lock:
+            cached = self._signed_urls.get(key)
+            if cached and cached[1] >= now + expiration:
+                self._signed_urls.move_to_end(key)
+                return cached[0]
+
+        self.connect()
+
+        # Expiración redondeada al siguiente múltiplo del bucket
+        bucket = max(int(self.signed_url_bucket), 1)
+        expires_at = math.ceil((now + expiration) / bucket) * bucket
+        expires_at = min(expires_at, int(now) + self.MAX_SIGNED_URL_LIFETIME)
 
-        # Generate signed URL
         blob = self.bucket.blob(blob_name)
         url = blob.generate_signed_url(
             version="v4",
-            expiration=datetime.timedelta(seconds=expiration),
-            method="GET"
+            expiration=datetime.fromtimestamp(expires_at, tz=timezone.utc),
+            method=method
         )
 
+        with self._signed_urls_lock:
+            self._signed_urls[key] = (url, expires_at)
+            self._signed_urls.move_to_end(key)
+            while len(self._signed_urls) > self.signed_url_cache_size:
+                self._signed_urls.popitem(last=False)
+
         return url
+
+    def forget_signed_urls(self, file_path=None):
+        """Drop cached signed URLs for one blob, or all of them"""
+        with self._signed_urls_lock:
+            if file_path is None:
+                self._signed_urls.clear()
+                return
+            blob_name = self.blob_name(file_path)
+            for key in [key for key in self._signed_urls if key[0] == blob_name]:
+                del self._signed_urls[key]
+
+    def blob_name(self, file_path):
+        """Blob name from a public URL or a plain path"""
+        if 'https://' in file_path:
+            # Extract the path from the URL
+            return file_path.split(f"{self.bucket_name}/", 1)[1]
+        # Use the path directly
+        return file_path
+
+    def iter_blob_pages(self, prefix='', page_size=1000):
+        """Yield pages of blobs whose name starts with ``prefix`` (one API call per page)"""
+        self.connect()
+
+        for page in self.client.list_blobs(self.bucket, prefix=prefix, page_size=page_size).pages:
+            yield list(page)
+
+    def open_file(self, file_path):
+        """Open a blob for streaming reads"""
+        self.connect()
+
+        return self.bucket.blob(self.blob_name(file_path)).open('rb')
+
+    def file_exists(self, file_path):
+        """Check whether a blob exists"""
+        self.connect()
+
+        return self.bucket.blob(self.blob_name(file_path)).exists()
@@ -1,38 +1,118 @@
-import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 from app import db
-from app.config import get_config
+from app.services.sqlite_tuning import apply_sqlite_pragmas
+
+# Opciones de tamaño del pool que no aplican a SQLite en memoria (usa StaticPool)
+POOL_SIZING_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.timeouts += timed_out
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
 
 class DatabaseClient:
-    """Client for database operations"""
+    """Owns the app's single SQLAlchemy engine (Flask-SQLAlchemy's ``db``)
+
+    Pool settings come from ``SQLALCHEMY_ENGINE_OPTIONS`` in the config and
+    also apply to the read replicas in ``SQLALCHEMY_BINDS``. Server
+    databases get a TimedQueuePool so ``pool_status`` can report checkout
+    wait times next to the pool counters. Stats are per process. SQLite
+    engines get ``SQLITE_PRAGMAS`` on every connection.
+    """
 
     def __init__(self, app=None):
-        self.engine = None
-        self.session_factory = None
-        self.Session = None
+        self.sqlite_engines = []
 
         if app:
             self.init_app(app)
 
     def init_app(self, app):
         """Initialize with Flask app"""
-        config = get_config()
+        base = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = self._engine_options(app.config['SQLALCHEMY_DATABASE_URI'], base)
 
-        # Use the database URI from the app's config
-        database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+        # Flask-SQLAlchemy no aplica SQLALCHEMY_ENGINE_OPTIONS a los binds (réplicas)
+        binds = {}
+        for key, value in (app.config.get('SQLALCHEMY_BINDS') or {}).items():
+            bind = dict(value) if isinstance(value, dict) else {'url': value}
+            binds[key] = {**self._engine_options(bind['url'], base), **bind}
+        app.config['SQLALCHEMY_BINDS'] = binds
+        db.init_app(app)
 
-        # Create engine
-        self.engine = create_engine(database_uri)
+        # Perfil SQLite (WAL, busy_timeout...) en cada conexión nueva
+        with app.app_context():
+            self.sqlite_engines = [engine for engine in db.engines.values() if engine.dialect.name == 'sqlite']
+        pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+        if pragmas:
+            for engine in self.sqlite_engines:
+                apply_sqlite_pragmas(engine, pragmas)
 
-        # Create session factory
-        self.session_factory = sessionmaker(bind=self.engine)
+    @staticmethod
+    def _engine_options(uri, base):
+        options = dict(base)
+        url = make_url(uri)
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            for name in POOL_SIZING_OPTIONS:
+                options.pop(name, None)
+        else:
+            options.setdefault('poolclass', TimedQueuePool)
+        return options
 
-        # Create scoped session
-        self.Session = scoped_session(self.session_factory)
+    @property
+    def engine(self):
+        """The engine of the current app"""
+        return db.engine
 
     def get_session(self):
-        """Get a database session"""
-        if not self.Session:
-            raise RuntimeError("Database client not initialized")
-        return self.Session()
+        """Get the request-scoped database session"""
+        return db.session
+
+    def pool_status(self, bind_key=None):
+        """Counters of the connection pool of the engine (or bind), for monitoring"""
+        pool = db.engines[bind_key].pool
+        status = {'class': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            status.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+            )
+        if isinstance(pool, TimedQueuePool):
+            with pool._stats_lock:
+                status.update(
+                    checkouts=pool.checkouts,
+                    timeouts=pool.timeouts,
+                    wait_avg_ms=round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+                    wait_max_ms=round(pool.wait_max * 1000, 3),
+                )
+        return status
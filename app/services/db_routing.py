@@ -0,0 +1,102 @@
+import random
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+
+# Métodos que solo leen: sus consultas pueden ir a una réplica
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICA_BIND_PREFIX = 'replica'
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends reads of read-only requests to a replica
+
+    Queries go to one of the ``replica*`` binds only when the request is a
+    GET/HEAD that has not written anything yet and the user is not pinned
+    to the primary by the ReplicaRouter. Everything else (writes, flushes,
+    work outside a request such as the upload worker) uses the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or getattr(clause, 'is_dml', False):
+                # Lo que queda del request lee del primario, que ya tiene la escritura
+                g.use_primary = True
+            router = current_app.extensions.get('db_router')
+            if router and router.use_replica():
+                return router.replica_engine(self._db)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Read-replica routing with a read-your-writes window
+
+    Replicas are the ``replica*`` entries of ``SQLALCHEMY_BINDS``; without
+    them every query uses the primary. After a successful write request
+    the user is pinned to the primary for ``DB_REPLICA_PIN_SECONDS`` so
+    they read their own changes while the replicas catch up. Pins live
+    in process memory, like the other caches, so each worker keeps its own.
+    """
+
+    def __init__(self, app=None):
+        self.replicas = []
+        self.pin_seconds = 5
+        self._pins = {}
+        self._lock = threading.Lock()
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize with Flask app"""
+        self.replicas = sorted(
+            key for key in (app.config.get('SQLALCHEMY_BINDS') or {})
+            if key.startswith(REPLICA_BIND_PREFIX)
+        )
+        self.pin_seconds = app.config.get('DB_REPLICA_PIN_SECONDS', self.pin_seconds)
+        app.extensions['db_router'] = self
+        app.after_request(self._pin_after_write)
+
+    def use_replica(self):
+        """True if the current request may read from a replica"""
+        if not self.replicas or request.method not in READ_ONLY_METHODS or g.get('use_primary'):
+            return False
+        return not self.is_pinned(self._user_key())
+
+    def replica_engine(self, db):
+        # La réplica se elige una vez por request y se mantiene en toda la sesión
+        if 'replica_bind' not in g:
+            g.replica_bind = random.choice(self.replicas)
+        return db.engines[g.replica_bind]
+
+    def pin(self, key):
+        """Send ``key``'s reads to the primary for the next ``pin_seconds``"""
+        if key is None or not self.pin_seconds:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._pins[key] = now + self.pin_seconds
+            if len(self._pins) > 1000:
+                self._pins = {k: until for k, until in self._pins.items() if until > now}
+
+    def is_pinned(self, key):
+        if key is None:
+            return False
+        with self._lock:
+            until = self._pins.get(key)
+        return until is not None and until > time.monotonic()
+
+    def _user_key(self):
+        try:
+            identity = get_jwt_identity()
+        except RuntimeError:
+            # Request sin JWT verificado
+            return None
+        return identity.get('id') if isinstance(identity, dict) else identity
+
+    def _pin_after_write(self, response):
+        if self.replicas and request.method not in READ_ONLY_METHODS and response.status_code < 400:
+            self.pin(self._user_key())
+        return response
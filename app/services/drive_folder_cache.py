@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.drive_folder import DriveFolder
+
+class DriveFolderCache:
+    """Cache of Drive folder IDs keyed by (parent_id, name)
+
+    Lookups hit an in-process LRU first and then the ``drive_folders`` table,
+    so resolved folders survive restarts and are shared between workers.
+    Entries older than ``DRIVE_FOLDER_CACHE_TTL`` seconds are treated as misses.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 24 * 3600
+        self.max_entries = 1024
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize with Flask app"""
+        self.ttl = app.config.get('DRIVE_FOLDER_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('DRIVE_FOLDER_CACHE_SIZE', self.max_entries)
+
+    @property
+    def _table(self):
+        return DriveFolder.__table__
+
+    def get(self, parent_id, name):
+        """Return the cached folder ID for ``name`` under ``parent_id`` or None"""
+        key = (parent_id or '', name)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                folder_id, stored_at = entry
+                if time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    return folder_id
+                del self._entries[key]
+
+        table = self._table
+        fresh_since = datetime.utcnow() - timedelta(seconds=self.ttl)
+        with db.engine.connect() as conn:
+            folder_id = conn.execute(
+                select(table.c.folder_id).where(
+                    table.c.parent_id == key[0],
+                    table.c.name == name,
+                    table.c.updated_at >= fresh_since
+                )
+            ).scalar()
+
+        if folder_id:
+            self._remember(key, folder_id)
+        return folder_id
+
+    def set(self, parent_id, name, folder_id):
+        """Store a resolved folder ID in memory and in the database"""
+        key = (parent_id or '', name)
+        self._remember(key, folder_id)
+
+        # Conexión propia: no debe hacer commit de la sesión del request
+        table = self._table
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as conn:
+                result = conn.execute(
+                    update(table)
+                    .where(table.c.parent_id == key[0], table.c.name == name)
+                    .values(folder_id=folder_id, updated_at=now)
+                )
+                if result.rowcount == 0:
+                    conn.execute(table.insert().values(
+                        parent_id=key[0], name=name, folder_id=folder_id,
+                        created_at=now, updated_at=now
+                    ))
+        except IntegrityError:
+            # Otro worker insertó la misma carpeta al mismo tiempo
+            pass
+
+    def invalidate(self, *folder_ids):
+        """Drop entries that point to (or live under) the given folder IDs"""
+        folder_ids = {f for f in folder_ids if f}
+        if not folder_ids:
+            return
+
+        with self._lock:
+            stale = [
+                key for key, (folder_id, _) in self._entries.items()
+                if folder_id in folder_ids or key[0] in folder_ids
+            ]
+            for key in stale:
+                del self._entries[key]
+
+        table = self._table
+        with db.engine.begin() as conn:
+            conn.execute(delete(table).where(or_(
+                table.c.folder_id.in_(folder_ids),
+                table.c.parent_id.in_(folder_ids)
+            )))
+
+    def clear(self):
+        """Forget everything kept in memory (the table is left untouched)"""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, folder_id):
+        with self._lock:
+            self._entries[key] = (folder_id, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
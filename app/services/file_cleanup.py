@@ -0,0 +1,35 @@
+from app import storage
+
+
+def vehicle_file_ids(vehicles):
+    """Storage file IDs of every image variant of the given vehicles"""
+    ids = []
+    for vehicle in vehicles:
+        for image in vehicle.images:
+            for url in (image.image_path, image.medium_path, image.thumbnail_path):
+                file_id = storage.file_id(url)
+                if file_id:
+                    ids.append(file_id)
+    return ids
+
+
+def policy_file_ids(policies):
+    """Storage file IDs of the given insurance policies"""
+    return [policy.file_path for policy in policies if policy and policy.file_path]
+
+
+def delete_stored_files(file_ids):
+    """
+    Delete files from the storage backend in bulk (Drive: batched requests
+    of up to 100 per round trip). Returns {file_id: None | error}; failures
+    are logged but never raised, so DB cleanup can go on.
+    """
+    if not file_ids:
+        return {}
+    report = storage.delete_many(file_ids)
+
+    for file_id, error in report.items():
+        if error:
+            print(f"Error eliminando archivo {file_id}: {str(error)}")
+    print(f"Archivos eliminados ({storage.name}): {sum(1 for e in report.values() if not e)}/{len(report)}")
+    return report
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+# Formatos que puede guardar la caché (mime -> extensión del archivo)
+CACHE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+    'image/avif': '.avif',
+}
+
+
+class ImageCache:
+    """Size-bounded on-disk LRU cache of rendered images
+
+    Entries are files named after a hash of their key in ``IMAGE_CACHE_DIR``.
+    Every hit refreshes the file's mtime, and once the directory grows past
+    ``IMAGE_CACHE_MAX_BYTES`` the least recently used files are removed.
+    The cache lives on disk, so it is shared by every worker process on the
+    host and survives restarts.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.max_bytes = 512 * 1024 * 1024
+        self._size = 0
+        self._size_lock = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize with Flask app"""
+        self.directory = app.config['IMAGE_CACHE_DIR']
+        self.max_bytes = app.config.get('IMAGE_CACHE_MAX_BYTES', self.max_bytes)
+        os.makedirs(self.directory, exist_ok=True)
+        # El tamaño actual se calcula en la primera escritura, no al arrancar
+        self._size = None
+
+    @staticmethod
+    def key(*parts):
+        """Stable cache key (also usable as a strong ETag) for the given parts"""
+        return hashlib.sha256('\0'.join(str(p) for p in parts).encode()).hexdigest()
+
+    def get(self, key):
+        """Return (path, mimetype) of a cached entry, or None"""
+        for mimetype, ext in CACHE_EXTENSIONS.items():
+            path = os.path.join(self.directory, key + ext)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            return path, mimetype
+        return None
+
+    def put(self, key, data, mimetype):
+        """Store rendered bytes and return (path, mimetype)"""
+        path = os.path.join(self.directory, key + CACHE_EXTENSIONS[mimetype])
+        fd, partial = tempfile.mkstemp(prefix='.partial_', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(data)
+            os.replace(partial, path)
+        except OSError:
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+            raise
+
+        with self._size_lock:
+            if self._size is None:
+                self._size = sum(size for _, _, size in self._entries())
+            else:
+                self._size += len(data)
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+        return path, mimetype
+
+    def get_or_create(self, key, producer):
+        """
+        Return the cached (path, mimetype) for ``key``, calling
+        ``producer() -> (bytes, mimetype)`` on a miss. Concurrent misses for
+        the same key wait for the first one instead of rendering twice.
+        """
+        cached = self.get(key)
+        if cached:
+            return cached
+        with self._locks[int(key[:8], 16) % self.LOCK_STRIPES]:
+            cached = self.get(key)
+            if cached:
+                return cached
+            data, mimetype = producer()
+            return self.put(key, data, mimetype)
+
+    def evict(self, target_ratio=0.9):
+        """Remove least recently used entries until the cache fits in ``target_ratio`` of its budget"""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * target_ratio
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._size_lock:
+            self._size = total
+
+    def clear(self):
+        """Remove every cached entry"""
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._size_lock:
+            self._size = 0
+
+    def _entries(self):
+        try:
+            scanner = os.scandir(self.directory)
+        except FileNotFoundError:
+            return []
+        entries = []
+        with scanner:
+            for entry in scanner:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
@@ -0,0 +1,42 @@
+import threading
+from sqlalchemy import event
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run ``PRAGMA name = value`` for every entry of ``pragmas`` on each new connection of ``engine``"""
+    statements = [f"PRAGMA {name} = {value}" for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+class SqliteOptimizer(threading.Thread):
+    """Runs ``PRAGMA optimize`` on the SQLite engines every ``interval`` seconds
+
+    Pooled connections stay open for the life of the process, so the
+    statistics the query planner uses would otherwise never be refreshed.
+    """
+
+    def __init__(self, engines, interval=3600):
+        super().__init__(name='sqlite-optimizer', daemon=True)
+        self.engines = list(engines)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            for engine in self.engines:
+                try:
+                    with engine.connect() as conn:
+                        conn.exec_driver_sql("PRAGMA optimize")
+                except Exception as e:
+                    print(f"Error en PRAGMA optimize ({engine.url.database}): {str(e)}")
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,128 @@
+import json
+import click
+from app.services.blob_index import BlobIndex
+from app.services.storage.base import StorageBackend, StorageError
+from app.services.storage.local import LocalStorageBackend
+from app.services.storage.gcs import GCSStorageBackend
+from app.services.storage.drive import DriveStorageBackend
+
+BACKENDS = {
+    LocalStorageBackend.name: LocalStorageBackend,
+    GCSStorageBackend.name: GCSStorageBackend,
+    DriveStorageBackend.name: DriveStorageBackend,
+}
+
+
+class Storage:
+    """Application-wide file storage, delegating to the backend chosen by ``STORAGE_BACKEND``
+
+    Routes and services only talk to this object (``from app import storage``):
+    ``upload``, ``delete``, ``delete_many``, ``stream``, ``send``,
+    ``signed_url`` and ``exists`` behave the same for every backend.
+
+    With ``STORAGE_DEDUP`` enabled, uploads that pass a ``content_hash``
+    are deduplicated through the BlobIndex: identical content is stored
+    once and deletes only reach the backend when no row references the
+    file anymore.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.index = BlobIndex()
+        self.dedup = False
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize with Flask app"""
+        name = app.config.get('STORAGE_BACKEND', DriveStorageBackend.name)
+        backend_class = BACKENDS.get(name)
+        if backend_class is None:
+            raise RuntimeError(f"STORAGE_BACKEND desconocido: {name} (opciones: {', '.join(BACKENDS)})")
+        self.backend = backend_class.from_app(app)
+        self.dedup = app.config.get('STORAGE_DEDUP', True)
+        app.extensions['storage'] = self
+
+        @app.cli.command('storage-reconcile')
+        @click.option('--delete', 'delete_orphans', is_flag=True, help='Eliminar los huérfanos (por defecto solo informa).')
+        @click.option('--limit', type=int, default=None, help='Máximo de archivos a eliminar en esta ejecución.')
+        def storage_reconcile_command(delete_orphans, limit):
+            """Busca archivos del almacenamiento que ninguna fila referencia."""
+            from app.services.storage_reconciler import StorageReconciler
+
+            report = StorageReconciler.from_app(app, self).run(dry_run=not delete_orphans, limit=limit)
+            click.echo(json.dumps(report, indent=2, default=str))
+
+    def upload(self, file_stream, filename, mimetype, folder_parts, content_hash=None, variant='original'):
+        """Store a file (or reuse an identical one) and return {'id', 'url', 'name'}
+
+        ``content_hash`` is the SHA-256 of the original upload and
+        ``variant`` tells derived files apart ('full', 'thumbnail', ...).
+        """
+        dedup = self.dedup and content_hash
+        if dedup:
+            existing = self.index.acquire(self.backend.name, content_hash, variant)
+            if existing:
+                return existing
+
+        # El mismo contenido y variante reanuda la misma subida si se interrumpió
+        resume_key = f"{content_hash}:{variant}" if content_hash else None
+        uploaded = self.backend.upload(file_stream, filename, mimetype, folder_parts, resume_key=resume_key)
+        if dedup:
+            winner = self.index.register(self.backend.name, content_hash, variant, uploaded)
+            if winner:
+                # Otra subida del mismo contenido terminó antes: se usa la suya. Si
+                # ambas acabaron en el mismo archivo (misma sesión reanudable) no se borra
+                if winner['id'] != uploaded['id']:
+                    self.backend.delete(uploaded['id'])
+                return winner
+        return uploaded
+
+    def reuse(self, content_hash, variants):
+        """
+        Acquire every variant of already stored content, or None if any is
+        missing (nothing stays acquired in that case). Lets callers skip
+        compressing and uploading a file that is already stored.
+        """
+        if not (self.dedup and content_hash):
+            return None
+        found = {}
+        for variant in variants:
+            blob = self.index.acquire(self.backend.name, content_hash, variant)
+            if blob is None:
+                self.delete_many([meta['id'] for meta in found.values()])
+                return None
+            found[variant] = blob
+        return found
+
+    def delete(self, file_id):
+        """Release one reference to the file and delete it when none are left"""
+        if self.dedup and not self.index.release(self.backend.name, [file_id]):
+            return
+        self.backend.delete(file_id)
+
+    def delete_many(self, file_ids):
+        """Release one reference per ID; returns {file_id: None | error} and never raises"""
+        file_ids = [f for f in file_ids if f]
+        if not self.dedup:
+            return self.backend.delete_many(file_ids)
+        try:
+            removable = self.index.release(self.backend.name, file_ids)
+        except Exception as e:
+            return {file_id: e for file_id in file_ids}
+        report = {file_id: None for file_id in file_ids}
+        report.update(self.backend.delete_many(removable))
+        return report
+
+    def __getattr__(self, name):
+        backend = self.__dict__.get('backend')
+        if backend is None:
+            raise RuntimeError("Storage backend not initialized")
+        return getattr(backend, name)
+
+
+__all__ = [
+    'Storage', 'StorageBackend', 'StorageError', 'BACKENDS',
+    'LocalStorageBackend', 'GCSStorageBackend', 'DriveStorageBackend',
+]
@@ -0,0 +1,77 @@
+from flask import send_file
+
+
+class StorageError(Exception):
+    """Raised by a backend when a file cannot be stored, read or removed"""
+
+
+class StorageBackend:
+    """Interface shared by every storage backend
+
+    Files are addressed by an opaque ``file_id`` chosen by the backend
+    (Drive file ID, GCS blob name, path relative to the local root).
+    ``upload`` returns ``{'id', 'url', 'name'}``: ``id`` is what the
+    other operations take and ``url`` is the link stored for clients.
+    """
+
+    name = None
+
+    @classmethod
+    def from_app(cls, app):
+        raise NotImplementedError
+
+    def upload(self, file_stream, filename, mimetype, folder_parts, resume_key=None):
+        """Store ``file_stream`` under ``folder_parts`` and return {'id', 'url', 'name'}
+
+        ``resume_key`` identifies the upload across retries so backends
+        with resumable uploads can continue an interrupted one.
+        """
+        raise NotImplementedError
+
+    def delete(self, file_id):
+        """Remove one file"""
+        raise NotImplementedError
+
+    def delete_many(self, file_ids):
+        """Remove several files; returns {file_id: None | error} and never raises"""
+        report = {}
+        for file_id in dict.fromkeys(f for f in file_ids if f):
+            try:
+                self.delete(file_id)
+                report[file_id] = None
+            except Exception as e:
+                report[file_id] = e
+        return report
+
+    def stream(self, file_id):
+        """Binary file object with the file contents (the caller closes it)"""
+        raise NotImplementedError
+
+    def send(self, file_id, mimetype=None, download_name=None, max_age=None):
+        """Flask response with the file contents"""
+        return send_file(
+            self.stream(file_id), mimetype=mimetype or 'application/octet-stream',
+            download_name=download_name, max_age=max_age
+        )
+
+    def signed_url(self, file_id, expiration=3600):
+        """URL that grants read access to the file for ``expiration`` seconds"""
+        raise NotImplementedError
+
+    def exists(self, file_id):
+        """True if the file is still stored"""
+        raise NotImplementedError
+
+    def iter_files(self, folder_parts, page_size=1000):
+        """Yield pages (lists) of {'id', 'modified'} for every file stored under ``folder_parts``
+
+        ``modified`` is an aware UTC datetime, or None when unknown.
+        """
+        raise NotImplementedError
+
+    def prepare_folder(self, folder_parts):
+        """Create/resolve ``folder_parts`` ahead of concurrent uploads (optional)"""
+
+    def file_id(self, path_or_url):
+        """Backend file ID for a value stored in the DB (ID or URL returned by upload)"""
+        return path_or_url or None
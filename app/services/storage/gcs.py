@@ -0,0 +1,61 @@
+import uuid
+from werkzeug.utils import secure_filename
+from app.services.storage.base import StorageBackend
+
+
+class GCSStorageBackend(StorageBackend):
+    """Google Cloud Storage bucket, through the shared CloudStorageClient
+
+    ``file_id`` is the blob name; ``url`` is the blob's public URL.
+    """
+
+    name = 'gcs'
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_app(cls, app):
+        from app import cloud_storage_client
+
+        return cls(cloud_storage_client)
+
+    def upload(self, file_stream, filename, mimetype, folder_parts, resume_key=None):
+        name = f"{uuid.uuid4().hex[:8]}_{secure_filename(filename) or 'file'}"
+        path = '/'.join(list(folder_parts) + [name])
+        blob = self.client.upload_stream(file_stream, path, mimetype)
+        return {'id': blob.name, 'url': blob.public_url, 'name': name}
+
+    def delete(self, file_id):
+        self.client.delete_file(file_id)
+
+    def delete_many(self, file_ids):
+        from google.api_core.exceptions import NotFound
+
+        report = {}
+        for file_id in dict.fromkeys(f for f in file_ids if f):
+            try:
+                self.client.delete_file(file_id)
+                report[file_id] = None
+            except NotFound:
+                report[file_id] = None
+            except Exception as e:
+                report[file_id] = e
+        return report
+
+    def stream(self, file_id):
+        return self.client.open_file(file_id)
+
+    def signed_url(self, file_id, expiration=3600):
+        return self.client.generate_signed_url(file_id, expiration=expiration)
+
+    def exists(self, file_id):
+        return self.client.file_exists(file_id)
+
+    def iter_files(self, folder_parts, page_size=1000):
+        prefix = '/'.join(folder_parts) + '/'
+        for page in self.client.iter_blob_pages(prefix, page_size=page_size):
+            yield [{'id': blob.name, 'modified': blob.updated} for blob in page]
+
+    def file_id(self, path_or_url):
+        return self.client.blob_name(path_or_url) if path_or_url else None
@@ -0,0 +1,141 @@
+import mimetypes
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from flask import send_file
+from itsdangerous import BadSignature, URLSafeSerializer
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
+from app.services.storage.base import StorageBackend, StorageError
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files kept under ``LOCAL_STORAGE_ROOT`` and served by this app
+
+    Reads go through ``send()``, which hands the open file to the WSGI
+    server (``wsgi.file_wrapper`` / ``sendfile``) or, with
+    ``USE_X_SENDFILE``, to the front proxy, so contents never pass
+    through Python. Links are signed tokens under ``url_prefix``:
+    ``url`` tokens never expire (like a Drive link), ``signed_url``
+    tokens carry an expiry.
+    """
+
+    name = 'local'
+
+    def __init__(self, root, secret_key, url_prefix='/api/files', max_age=3600):
+        self.root = os.path.abspath(root)
+        self.url_prefix = url_prefix.rstrip('/')
+        self.max_age = max_age
+        self._serializer = URLSafeSerializer(secret_key, salt='local-storage')
+        os.makedirs(self.root, exist_ok=True)
+
+    @classmethod
+    def from_app(cls, app):
+        return cls(
+            app.config['LOCAL_STORAGE_ROOT'],
+            app.config['SECRET_KEY'],
+            url_prefix=app.config.get('LOCAL_STORAGE_URL_PREFIX', '/api/files'),
+            max_age=app.config.get('LOCAL_STORAGE_MAX_AGE', 3600)
+        )
+
+    def path(self, file_id):
+        """Absolute path of ``file_id``, refusing anything outside the root"""
+        path = safe_join(self.root, file_id) if file_id else None
+        if path is None:
+            raise StorageError(f"Ruta de archivo no válida: {file_id}")
+        return path
+
+    def upload(self, file_stream, filename, mimetype, folder_parts, resume_key=None):
+        parts = [secure_filename(part) or '_' for part in folder_parts]
+        name = f"{uuid.uuid4().hex[:8]}_{secure_filename(filename) or 'file'}"
+        file_id = '/'.join(parts + [name])
+        path = self.path(file_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Se escribe a un temporal y se renombra: un lector nunca ve el archivo a medias
+        partial = f"{path}.part"
+        try:
+            with open(partial, 'wb') as out:
+                shutil.copyfileobj(file_stream, out, 1024 * 1024)
+            os.replace(partial, path)
+        except OSError as e:
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+            raise StorageError(f"Error guardando {file_id}: {e}") from e
+
+        return {'id': file_id, 'url': self.url(file_id), 'name': name}
+
+    def delete(self, file_id):
+        try:
+            os.remove(self.path(file_id))
+        except FileNotFoundError:
+            pass
+
+    def stream(self, file_id):
+        return open(self.path(file_id), 'rb')
+
+    def send(self, file_id, mimetype=None, download_name=None, max_age=None):
+        path = self.path(file_id)
+        return send_file(
+            path,
+            mimetype=mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            download_name=download_name,
+            as_attachment=download_name is not None,
+            conditional=True,
+            max_age=self.max_age if max_age is None else max_age
+        )
+
+    def url(self, file_id):
+        """Permanent link to the file (stored in the DB)"""
+        return f"{self.url_prefix}/{self._serializer.dumps([file_id, None])}"
+
+    def signed_url(self, file_id, expiration=3600):
+        expires = int(time.time()) + int(expiration)
+        return f"{self.url_prefix}/{self._serializer.dumps([file_id, expires])}"
+
+    def load_token(self, token):
+        """file_id of a valid, unexpired token, or None"""
+        try:
+            file_id, expires = self._serializer.loads(token)
+        except (BadSignature, ValueError, TypeError):
+            return None
+        if expires is not None and expires < time.time():
+            return None
+        return file_id
+
+    def exists(self, file_id):
+        try:
+            return os.path.isfile(self.path(file_id))
+        except StorageError:
+            return False
+
+    def iter_files(self, folder_parts, page_size=1000):
+        top = self.path('/'.join(secure_filename(part) or '_' for part in folder_parts))
+        page = []
+        for dirpath, _, filenames in os.walk(top):
+            for filename in filenames:
+                if filename.endswith('.part'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    modified = datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc)
+                except OSError:
+                    continue
+                page.append({'id': os.path.relpath(path, self.root).replace(os.sep, '/'), 'modified': modified})
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+        if page:
+            yield page
+
+    def file_id(self, path_or_url):
+        if not path_or_url:
+            return None
+        prefix = f"{self.url_prefix}/"
+        if path_or_url.startswith(prefix):
+            return self.load_token(path_or_url[len(prefix):].split('?', 1)[0])
+        return path_or_url
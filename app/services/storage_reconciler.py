@@ -0,0 +1,177 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+from app import db
+from app.models.insurance_policy import InsurancePolicy
+from app.models.stored_blob import StoredBlob
+from app.models.upload_job import UploadJob
+from app.models.vehicle_image import VehicleImage
+
+# Cuántos IDs de huérfanos se incluyen en el informe
+REPORT_SAMPLE = 100
+
+
+class StorageReconciler:
+    """Finds (and optionally deletes) stored files that no DB row references
+
+    The backend listing of ``folders`` is paged and diffed page by page
+    against the set of file IDs referenced by vehicle images, insurance
+    policies and unfinished upload jobs, all read in bulk. Files modified
+    in the last ``min_age`` seconds are left alone so uploads whose row is
+    not committed yet are never touched; StoredBlob rows of the deleted
+    files are removed too, unless a concurrent upload just acquired them.
+    Deletes go through ``delete_many`` in batches of ``batch_size``,
+    paced to ``rate_limit`` files per second.
+    """
+
+    def __init__(self, storage, folders, min_age=3600, batch_size=100, rate_limit=10, page_size=1000):
+        self.storage = storage
+        self.folders = [list(folder) for folder in folders]
+        self.min_age = min_age
+        self.batch_size = max(1, batch_size)
+        self.rate_limit = rate_limit
+        self.page_size = page_size
+        self._last_batch_at = 0.0
+
+    @classmethod
+    def from_app(cls, app, storage):
+        return cls(
+            storage,
+            [folder.split('/') for folder in app.config.get('STORAGE_RECONCILE_FOLDERS', ())],
+            min_age=app.config.get('STORAGE_RECONCILE_MIN_AGE', 3600),
+            batch_size=app.config.get('STORAGE_RECONCILE_BATCH_SIZE', 100),
+            rate_limit=app.config.get('STORAGE_RECONCILE_RATE_LIMIT', 10)
+        )
+
+    def referenced_file_ids(self):
+        """Every file ID some row (or an unfinished upload job) points to"""
+        file_ids = set()
+        statements = (
+            select(VehicleImage.image_path, VehicleImage.medium_path, VehicleImage.thumbnail_path),
+            select(InsurancePolicy.file_path, InsurancePolicy.file_url),
+        )
+        with db.engine.connect() as conn:
+            for statement in statements:
+                for row in conn.execution_options(yield_per=1000).execute(statement):
+                    file_ids.update(self.storage.file_id(value) for value in row if value)
+
+            jobs = conn.execute(
+                select(UploadJob.payload).where(
+                    UploadJob.status.in_([UploadJob.STATUS_PENDING, UploadJob.STATUS_RUNNING])
+                )
+            )
+            for (payload,) in jobs:
+                for item in json.loads(payload or '[]'):
+                    file_ids.add(item.get('file_id'))
+                    file_ids.add(self.storage.file_id(item.get('replaces')))
+                    file_ids.update(meta.get('id') for meta in (item.get('variants') or {}).values())
+        file_ids.discard(None)
+        return file_ids
+
+    def run(self, dry_run=True, limit=None):
+        """
+        Reconcile the configured folders and return a report. With
+        ``dry_run`` nothing is deleted; ``limit`` caps the files deleted
+        in one run.
+        """
+        started = time.monotonic()
+        backend = self.storage.name
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.min_age)
+        referenced = self.referenced_file_ids()
+        recent_blobs = self._recent_blob_ids(cutoff)
+
+        report = {
+            'backend': backend,
+            'dry_run': dry_run,
+            'folders': ['/'.join(folder) for folder in self.folders],
+            'referenced': len(referenced),
+            'listed': 0,
+            'recent': 0,
+            'orphaned': 0,
+            'deleted': 0,
+            'failed': 0,
+            'orphans': [],
+            'errors': {},
+        }
+        listed = set()
+        pending = []
+
+        for folder in self.folders:
+            for page in self.storage.iter_files(folder, page_size=self.page_size):
+                ids = {item['id'] for item in page}
+                listed |= ids
+                report['listed'] += len(ids)
+
+                orphans = ids - referenced
+                recent = {
+                    item['id'] for item in page
+                    if item['id'] in orphans and (item['modified'] is None or item['modified'] > cutoff)
+                }
+                orphans -= recent | recent_blobs
+                report['recent'] += len(recent)
+                report['orphaned'] += len(orphans)
+                report['orphans'].extend(sorted(orphans)[:REPORT_SAMPLE - len(report['orphans'])])
+
+                if dry_run:
+                    continue
+                pending.extend(sorted(orphans))
+                while len(pending) >= self.batch_size:
+                    self._delete_next(pending, cutoff, report, limit)
+
+        while pending:
+            self._delete_next(pending, cutoff, report, limit)
+
+        # Solo informativo: referencias a archivos que no aparecen en las carpetas revisadas
+        report['missing'] = len(referenced - listed)
+        report['elapsed'] = round(time.monotonic() - started, 2)
+        return report
+
+    def _recent_blob_ids(self, cutoff):
+        # Un acquire() reciente puede tener todavía la fila pendiente de commit
+        table = StoredBlob.__table__
+        with db.engine.connect() as conn:
+            return set(conn.execute(
+                select(table.c.file_id).where(
+                    table.c.backend == self.storage.name,
+                    table.c.updated_at > cutoff.replace(tzinfo=None)
+                )
+            ).scalars())
+
+    def _delete_next(self, pending, cutoff, report, limit):
+        size = self.batch_size
+        if limit is not None:
+            size = min(size, limit - report['deleted'] - report['failed'])
+        if size <= 0:
+            pending.clear()
+            return
+        batch = pending[:size]
+        del pending[:size]
+
+        if self.rate_limit:
+            # Ritmo máximo: rate_limit archivos por segundo
+            wait = self._last_batch_at + len(batch) / self.rate_limit - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_batch_at = time.monotonic()
+        self._delete_batch(batch, cutoff, report)
+
+    def _delete_batch(self, file_ids, cutoff, report):
+        file_ids = self._release_blobs(file_ids, cutoff)
+        if not file_ids:
+            return
+        for file_id, error in self.storage.backend.delete_many(file_ids).items():
+            if error:
+                report['failed'] += 1
+                report['errors'][file_id] = str(error)
+            else:
+                report['deleted'] += 1
+
+    def _release_blobs(self, file_ids, cutoff):
+        """Drop StoredBlob rows of the batch; IDs acquired meanwhile are kept"""
+        table = StoredBlob.__table__
+        key = (table.c.backend == self.storage.name, table.c.file_id.in_(file_ids))
+        with db.engine.begin() as conn:
+            conn.execute(delete(table).where(*key, table.c.updated_at <= cutoff.replace(tzinfo=None)))
+            kept = set(conn.execute(select(table.c.file_id).where(*key)).scalars())
+        return [file_id for file_id in file_ids if file_id not in kept]
@@ -0,0 +1,274 @@
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_, select, update
+from werkzeug.utils import secure_filename
+from app import db
+from app.models.upload_job import UploadJob
+from app.models.vehicle_image import VehicleImage
+from app.models.insurance_policy import InsurancePolicy
+from app.services.upload_pipeline import prepare_files, discard_files, open_source, variant_names
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+class UploadJobQueue:
+    """DB-backed queue of background uploads to the storage backend
+
+    Requests spool the files to ``UPLOAD_SPOOL_DIR``, create the target rows
+    in a ``pending`` state and enqueue an UploadJob. Workers (a local thread
+    started by the first request, or ``flask upload-worker``) claim jobs atomically
+    through the ``upload_jobs`` table, push the files to storage and update
+    ``VehicleImage.image_path`` / ``InsurancePolicy.file_url``. A failed
+    job waits ``UPLOAD_JOB_RETRY_DELAY`` seconds, doubled on every attempt,
+    before it can be claimed again.
+    """
+
+    def __init__(self, app=None):
+        self.spool_dir = None
+        self.target_bytes = None
+        self.max_attempts = 3
+        self.stale_after = 15 * 60
+        self.retry_delay = 30
+        self.poll_interval = 2.0
+        self.worker = None
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize with Flask app"""
+        self.spool_dir = app.config['UPLOAD_SPOOL_DIR']
+        self.target_bytes = app.config.get('IMAGE_TARGET_BYTES') or None
+        self.max_attempts = app.config.get('UPLOAD_JOB_MAX_ATTEMPTS', self.max_attempts)
+        self.stale_after = app.config.get('UPLOAD_JOB_STALE_SECONDS', self.stale_after)
+        self.retry_delay = app.config.get('UPLOAD_JOB_RETRY_DELAY', self.retry_delay)
+        self.poll_interval = app.config.get('UPLOAD_WORKER_POLL_INTERVAL', self.poll_interval)
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+        @app.cli.command('upload-worker')
+        def upload_worker_command():
+            """Procesa trabajos de subida pendientes en primer plano."""
+            UploadJobWorker(app, self, self.poll_interval).run()
+
+        if app.config.get('UPLOAD_WORKER_ENABLED') and not app.config.get('TESTING'):
+            # El hilo arranca con el primer request: así solo corre en procesos que sirven
+            # la API (no en `flask db upgrade` ni junto al worker de `flask upload-worker`),
+            # y con gunicorn se crea en cada worker después del fork
+            @app.before_request
+            def ensure_upload_worker():
+                self.start_worker(app)
+
+    def start_worker(self, app):
+        """Start the in-process background worker thread"""
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = UploadJobWorker(app, self, self.poll_interval)
+            self.worker.start()
+        return self.worker
+
+    def wants_async(self, req):
+        """True if the request asked for (or the deployment defaults to) async uploads"""
+        value = req.args.get('async') or req.form.get('async')
+        if value is not None:
+            return value.lower() in TRUE_VALUES
+        return bool(current_app.config.get('ASYNC_UPLOADS'))
+
+    def spool(self, file_storage):
+        """Write an uploaded file to the local spool directory and return its path"""
+        filename = secure_filename(file_storage.filename) or 'upload'
+        path = os.path.join(self.spool_dir, f"{uuid.uuid4().hex}_{filename}")
+        file_storage.save(path)
+        return path
+
+    def enqueue(self, kind, user_id, folder_parts, items):
+        """Add a pending job to the session (the caller commits)"""
+        job = UploadJob(id=uuid.uuid4().hex, kind=kind, user_id=user_id, status=UploadJob.STATUS_PENDING)
+        job.folder_parts = folder_parts
+        job.items = items
+        db.session.add(job)
+        return job
+
+    def claim_next(self):
+        """Atomically move one pending job to running and return it (or None)"""
+        table = UploadJob.__table__
+        now = datetime.utcnow()
+
+        # Trabajos de un worker que murió a mitad de la subida vuelven a la cola
+        db.session.execute(
+            update(table)
+            .where(table.c.status == UploadJob.STATUS_RUNNING,
+                   table.c.updated_at < now - timedelta(seconds=self.stale_after))
+            .values(status=UploadJob.STATUS_PENDING, updated_at=now)
+        )
+        db.session.commit()
+
+        candidates = db.session.execute(
+            select(table.c.id)
+            .where(table.c.status == UploadJob.STATUS_PENDING,
+                   or_(table.c.next_attempt_at.is_(None), table.c.next_attempt_at <= now))
+            .order_by(table.c.created_at)
+            .limit(5)
+        ).scalars().all()
+
+        for job_id in candidates:
+            result = db.session.execute(
+                update(table)
+                .where(table.c.id == job_id, table.c.status == UploadJob.STATUS_PENDING)
+                .values(status=UploadJob.STATUS_RUNNING, attempts=table.c.attempts + 1, updated_at=now)
+            )
+            db.session.commit()
+            if result.rowcount == 1:
+                return db.session.get(UploadJob, job_id)
+        return None
+
+    def run_pending(self, limit=None):
+        """Process pending jobs until the queue is empty (or ``limit`` is reached)"""
+        processed = 0
+        while limit is None or processed < limit:
+            job = self.claim_next()
+            if job is None:
+                break
+            self.process(job)
+            processed += 1
+        return processed
+
+    def process(self, job):
+        """Upload every remaining file of a claimed job"""
+        from app import storage
+
+        try:
+            items = job.items
+            for item in items:
+                if item.get('file_id'):
+                    continue
+
+                content_hash = item.get('sha256')
+                variants = storage.reuse(content_hash, variant_names(item.get('compress')))
+                if variants is None:
+                    files = prepare_files(
+                        item['spool_path'], item['mimetype'], item['filename'], item.get('compress'),
+                        spool_dir=self.spool_dir, target_bytes=self.target_bytes
+                    )
+
+                    variants = {}
+                    try:
+                        for name, (source, mimetype, filename, _) in files.items():
+                            with open_source(source) as fh:
+                                variants[name] = storage.upload(
+                                    fh, filename, mimetype, job.folder_parts,
+                                    content_hash=content_hash, variant=name
+                                )
+                    except Exception:
+                        # Variantes ya subidas de este archivo: se liberan antes de reintentar
+                        storage.delete_many([meta['id'] for meta in variants.values()])
+                        raise
+                    finally:
+                        discard_files(files)
+
+                variants = {name: {'id': meta['id'], 'url': meta['url']} for name, meta in variants.items()}
+
+                main = variants.get('full') or variants['original']
+                item['file_id'] = main['id']
+                item['file_url'] = main['url']
+                item['variants'] = variants
+                self._apply(job.kind, item)
+
+                job.items = items
+                job.completed_items = sum(1 for i in items if i.get('file_id'))
+                db.session.commit()
+                self._discard_spool(item)
+
+                # Archivo anterior (update_policy): se elimina solo cuando el nuevo ya está guardado
+                if item.get('replaces'):
+                    try:
+                        storage.delete(item['replaces'])
+                    except Exception as e:
+                        print(f"Error eliminando archivo antiguo: {str(e)}")
+
+            job.status = UploadJob.STATUS_DONE
+            job.error = None
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error procesando trabajo de subida {job.id}: {str(e)}")
+            job = db.session.get(UploadJob, job.id)
+            job.error = str(e)
+            if job.attempts >= self.max_attempts:
+                job.status = UploadJob.STATUS_FAILED
+                job.finished_at = datetime.utcnow()
+                self._fail(job)
+            else:
+                # Espera creciente entre intentos para no insistir durante una caída del backend
+                job.status = UploadJob.STATUS_PENDING
+                job.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.retry_delay_for(job.attempts))
+            db.session.commit()
+
+    def retry_delay_for(self, attempts):
+        """Seconds to wait before retrying a job that has failed ``attempts`` times"""
+        return self.retry_delay * 2 ** max(attempts - 1, 0)
+
+    def _apply(self, kind, item):
+        if kind == UploadJob.KIND_VEHICLE_IMAGES:
+            image = db.session.get(VehicleImage, item['target_id'])
+            if image:
+                variants = item.get('variants', {})
+                image.image_path = item['file_url']
+                image.medium_path = variants.get('medium', {}).get('url')
+                image.thumbnail_path = variants.get('thumbnail', {}).get('url')
+                image.upload_status = 'ready'
+
+        elif kind == UploadJob.KIND_INSURANCE_POLICY:
+            policy = db.session.get(InsurancePolicy, item['target_id'])
+            if policy:
+                policy.file_url = item['file_url']
+                policy.file_path = item['file_id']
+                policy.upload_status = 'ready'
+
+    def _fail(self, job):
+        for item in job.items:
+            if item.get('file_id'):
+                continue
+            if job.kind == UploadJob.KIND_VEHICLE_IMAGES:
+                target = db.session.get(VehicleImage, item['target_id'])
+            else:
+                target = db.session.get(InsurancePolicy, item['target_id'])
+            if target:
+                target.upload_status = 'failed'
+            self._discard_spool(item)
+
+    def _discard_spool(self, item):
+        try:
+            os.remove(item['spool_path'])
+        except OSError:
+            pass
+
+
+class UploadJobWorker(threading.Thread):
+    """Polls the upload_jobs table and processes jobs inside an app context"""
+
+    def __init__(self, app, queue, poll_interval=2.0):
+        super().__init__(name='upload-job-worker', daemon=True)
+        self.app = app
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            processed = 0
+            with self.app.app_context():
+                try:
+                    processed = self.queue.run_pending(limit=10)
+                except Exception as e:
+                    print(f"Error en el worker de subidas: {str(e)}")
+                finally:
+                    db.session.remove()
+            if not processed:
+                self._stop_event.wait(self.poll_interval)
@@ -0,0 +1,216 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from contextlib import contextmanager
+from flask import current_app
+from app.utils.images import IMAGE_VARIANTS, generate_image_derivative_files, variant_filename
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+# Sin process pool, un solo decode a la vez: los hilos del request solo suben en paralelo
+_inline_compress_lock = threading.Lock()
+
+
+class UploadPipelineError(Exception):
+    """Raised when a file of the batch fails; uploads already done are rolled back"""
+
+    def __init__(self, filename, error):
+        super().__init__(f"{filename}: {error}")
+        self.filename = filename
+        self.error = error
+
+
+def get_process_pool(max_workers):
+    """Shared process pool for CPU-bound image compression (None = compress in-thread)"""
+    global _process_pool
+    if not max_workers:
+        return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+        return _process_pool
+
+
+def prepare_files(source, mimetype, filename, compress, pool=None, spool_dir=None, target_bytes=None):
+    """Return {variant: (source, mimetype, filename, temporary)} ready to upload for one file
+
+    ``source`` is a file path or a binary stream (e.g. a SpooledUpload).
+    Image variants are written to temporary files in ``spool_dir``;
+    release them with discard_files() once uploaded.
+    """
+    if not compress:
+        return {'original': (source, mimetype, filename, False)}
+
+    if pool is not None:
+        variants = pool.submit(
+            generate_image_derivative_files, _picklable(source), mimetype, spool_dir, target_bytes=target_bytes
+        ).result()
+    else:
+        with _inline_compress_lock:
+            if not isinstance(source, str):
+                source.seek(0)
+            variants = generate_image_derivative_files(source, mimetype, spool_dir, target_bytes=target_bytes)
+    return {
+        name: (path, variant_mime, variant_filename(filename, name, ext), True)
+        for name, (path, variant_mime, ext) in variants.items()
+    }
+
+
+def variant_names(compress):
+    """Variant names prepare_files() produces for a file"""
+    return [name for name, _ in IMAGE_VARIANTS] if compress else ['original']
+
+
+def discard_files(files):
+    """Delete the temporary variant files created by prepare_files"""
+    for source, _, _, temporary in files.values():
+        if temporary:
+            try:
+                os.remove(source)
+            except OSError:
+                pass
+
+
+@contextmanager
+def open_source(source):
+    """Open a path for reading, or rewind an already open stream"""
+    if isinstance(source, str):
+        with open(source, 'rb') as fh:
+            yield fh
+    else:
+        source.seek(0)
+        yield source
+
+
+def _picklable(source):
+    # Un proceso hijo no puede recibir el stream: se le pasa la ruta del spool
+    # en disco o, si el archivo todavía está en memoria (pequeño), sus bytes
+    if isinstance(source, str):
+        return source
+    path = getattr(source, 'path', None)
+    if path:
+        source.flush()
+        return path
+    source.seek(0)
+    return source.read()
+
+
+class UploadItem:
+    """A file waiting to be pushed to storage
+
+    ``source`` is a file path or a binary stream. With ``compress=True``
+    the file is an image: the full, medium and thumbnail variants are
+    generated and uploaded together. ``content_hash`` (SHA-256 of the
+    original) lets storage reuse files that are already stored.
+    """
+
+    def __init__(self, source, filename, mimetype, compress=False, content_hash=None):
+        self.source = source
+        self.filename = filename
+        self.mimetype = mimetype
+        self.compress = compress
+        self.content_hash = content_hash
+
+
+class UploadPipeline:
+    """Bounded-concurrency compress + upload pipeline for one request
+
+    Compression runs in a shared process pool and uploads to the storage
+    backend in a per-request thread pool limited to ``max_concurrency``
+    workers. The batch is all-or-nothing: if one file fails, every file
+    already uploaded is deleted before UploadPipelineError is raised.
+    """
+
+    def __init__(self, storage, max_concurrency=4, process_workers=2, spool_dir=None, target_bytes=None):
+        self.storage = storage
+        self.spool_dir = spool_dir
+        self.target_bytes = target_bytes
+        self.max_concurrency = max(1, max_concurrency)
+        self.process_workers = process_workers
+
+    @classmethod
+    def from_app(cls, app, storage):
+        return cls(
+            storage,
+            max_concurrency=app.config.get('UPLOAD_MAX_CONCURRENCY', 4),
+            process_workers=app.config.get('UPLOAD_PROCESS_POOL_SIZE', 2),
+            spool_dir=app.config.get('UPLOAD_SPOOL_DIR'),
+            target_bytes=app.config.get('IMAGE_TARGET_BYTES') or None
+        )
+
+    def run(self, items, folder_parts):
+        """Upload all items into ``folder_parts``
+
+        Returns, in input order, a dict of variant name -> {'id', 'url', 'name'}
+        (``'original'`` for files that are not compressed).
+        """
+        if not items:
+            return []
+
+        # La carpeta se prepara una sola vez en el hilo del request (Drive: caché/BD)
+        self.storage.prepare_folder(folder_parts)
+        return self._run(items, folder_parts)
+
+    def _run(self, items, folder_parts):
+        app = current_app._get_current_object()
+        pool = get_process_pool(self.process_workers)
+        results = [None] * len(items)
+        workers = min(self.max_concurrency, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._process, app, pool, item, folder_parts): index
+                for index, item in enumerate(items)
+            }
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            wait(pending)
+
+            failure = None
+            for future, index in futures.items():
+                if future.cancelled():
+                    continue
+                error = future.exception()
+                if error is not None:
+                    failure = failure or (items[index].filename, error)
+                else:
+                    results[index] = future.result()
+
+        if failure:
+            self._rollback([r for r in results if r])
+            raise UploadPipelineError(*failure)
+        return results
+
+    def _process(self, app, pool, item, folder_parts):
+        with app.app_context():
+            # Contenido ya almacenado: no se comprime ni se sube otra vez
+            reused = self.storage.reuse(item.content_hash, variant_names(item.compress))
+            if reused:
+                return reused
+
+        files = prepare_files(
+            item.source, item.mimetype, item.filename, item.compress,
+            pool=pool, spool_dir=self.spool_dir, target_bytes=self.target_bytes
+        )
+
+        uploaded = {}
+        with app.app_context():
+            try:
+                for name, (source, mimetype, filename, _) in files.items():
+                    with open_source(source) as fh:
+                        uploaded[name] = self.storage.upload(
+                            fh, filename, mimetype, folder_parts,
+                            content_hash=item.content_hash, variant=name
+                        )
+            except Exception:
+                self._rollback([uploaded])
+                raise
+            finally:
+                discard_files(files)
+        return uploaded
+
+    def _rollback(self, uploaded):
+        file_ids = [meta["id"] for variants in uploaded for meta in variants.values()]
+        for file_id, error in self.storage.delete_many(file_ids).items():
+            if error:
+                print(f"Error eliminando archivo {file_id}: {str(error)}")
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.drive_upload_session import DriveUploadSession
+
+
+class UploadSessionStore:
+    """Persisted resumable upload sessions, keyed by folder, content hash and variant
+
+    ``execute_resumable`` saves the session URI and the last acknowledged
+    offset after every chunk, so an upload interrupted by a dropped
+    connection or a worker restart continues where it stopped. Drive
+    forgets sessions after a week; older entries are treated as missing.
+
+    The table is shared by every worker process, so an upload ``claim``s
+    the session first: ``updated_at`` is refreshed on every save and acts
+    as a lease, and a session saved less than ``lease`` seconds ago belongs
+    to an upload still in progress.
+    """
+
+    def __init__(self, max_age=6 * 24 * 3600, lease=300):
+        self.max_age = max_age
+        self.lease = lease
+
+    @property
+    def _table(self):
+        return DriveUploadSession.__table__
+
+    def load(self, key):
+        """Return (upload_uri, offset) of a live session, or None"""
+        table = self._table
+        fresh_since = datetime.utcnow() - timedelta(seconds=self.max_age)
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                select(table.c.upload_uri, table.c.offset)
+                .where(table.c.key == key, table.c.updated_at >= fresh_since)
+            ).first()
+        return (row.upload_uri, row.offset) if row else None
+
+    def claim(self, key):
+        """
+        Take the session for ``key``. Returns (claimed, saved): ``saved`` is
+        the (upload_uri, offset) to resume, or None. ``claimed`` is False when
+        another upload holds the session; the caller must then not persist.
+        """
+        table = self._table
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as conn:
+                row = conn.execute(
+                    select(table.c.upload_uri, table.c.offset, table.c.updated_at).where(table.c.key == key)
+                ).first()
+                if row is None:
+                    # Fila vacía: reserva la clave hasta que se guarde el primer chunk
+                    conn.execute(table.insert().values(
+                        key=key, upload_uri='', offset=0, created_at=now, updated_at=now
+                    ))
+                    return True, None
+                if row.updated_at > now - timedelta(seconds=self.lease):
+                    return False, None
+                # Solo gana quien actualiza la fila tal como la leyó
+                result = conn.execute(
+                    update(table)
+                    .where(table.c.key == key, table.c.updated_at == row.updated_at)
+                    .values(updated_at=now)
+                )
+                if result.rowcount != 1:
+                    return False, None
+        except IntegrityError:
+            return False, None
+        if not row.upload_uri or row.updated_at < now - timedelta(seconds=self.max_age):
+            return True, None
+        return True, (row.upload_uri, row.offset)
+
+    def release(self, key):
+        """Give up the claim of an interrupted upload so the next one can resume it right away"""
+        table = self._table
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(table.c.key == key)
+                .values(updated_at=datetime.utcnow() - timedelta(seconds=self.lease))
+            )
+
+    def save(self, key, upload_uri, offset):
+        """Record the session URI and the acknowledged byte offset"""
+        table = self._table
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as conn:
+                result = conn.execute(
+                    update(table)
+                    .where(table.c.key == key)
+                    .values(upload_uri=upload_uri, offset=offset, updated_at=now)
+                )
+                if result.rowcount == 0:
+                    conn.execute(table.insert().values(
+                        key=key, upload_uri=upload_uri, offset=offset, created_at=now, updated_at=now
+                    ))
+        except IntegrityError:
+            pass
+
+    def discard(self, key):
+        """Forget a finished or expired session"""
+        table = self._table
+        with db.engine.begin() as conn:
+            conn.execute(delete(table).where(table.c.key == key))
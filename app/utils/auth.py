@@ -1,6 +1,7 @@
 from functools import wraps
 from flask import request, jsonify, current_app, g
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from werkzeug.exceptions import HTTPException
 from app.models.user import User
 from app import db
 from datetime import datetime, timedelta
@@ -44,6 +45,9 @@ def token_required(f):
             # Store current user in Flask g object
             g.current_user = current_user
             return f(*args, **kwargs)
+        except HTTPException:
+            # abort()/errores HTTP de la vista (400, 404...) no son fallos de autenticación
+            raise
         except Exception as e:
             print(e)
             return jsonify({'error': 'Token is invalid', 'message': str(e)}), 401
@@ -0,0 +1,148 @@
+from flask import current_app, request
+from marshmallow import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+from werkzeug.exceptions import BadRequest, Conflict, InternalServerError
+from app import db
+from app.models.user import User
+
+
+class BulkError(BadRequest):
+    """Malformed bulk payload (not a list, empty or too many items)"""
+
+
+class BulkConflict(Conflict):
+    """The database rejected the batch (constraint violation); nothing was written"""
+
+
+def bulk_items():
+    """Items of a bulk request: a JSON array or ``{"items": [...]}``"""
+    payload = request.get_json(silent=True)
+    items = payload.get('items') if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        raise BulkError('Se esperaba una lista de elementos (o {"items": [...]})')
+
+    maximum = current_app.config.get('BULK_MAX_ITEMS', 500)
+    if len(items) > maximum:
+        raise BulkError(f'Demasiados elementos: {len(items)} (máximo {maximum})')
+    return items
+
+
+def bulk_write(model, items, schema, update_schema, current_user):
+    """
+    Validate every item with the model's marshmallow schemas and write the
+    valid ones in a single transaction: items without ``id`` are inserted
+    with one executemany INSERT, items with ``id`` are updated with one
+    executemany UPDATE by primary key. Plain users may only write their
+    own rows (``user_id`` is forced to theirs on create); admins may create
+    rows for any existing user.
+
+    If the database rejects the batch it is rolled back and nothing is
+    written: ``BulkConflict`` (409) for constraint violations, ``BulkError``
+    (400) for values the column cannot hold, 500 for anything else.
+
+    Returns the per-item results, in request order:
+    ``{'index', 'success', 'id', 'created'}`` or ``{'index', 'success', 'errors'}``.
+    """
+    columns = set(model.__mapper__.column_attrs.keys()) - {'id', 'created_at', 'updated_at'}
+    results = [None] * len(items)
+    creates, updates = [], []
+
+    # Dueños de las filas a actualizar, en una sola consulta
+    ids = [item['id'] for item in items if isinstance(item, dict) and _is_id(item.get('id'))]
+    owners = dict(db.session.execute(select(model.id, model.user_id).where(model.id.in_(ids))).all()) if ids else {}
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = _failed(index, {'_schema': ['Se esperaba un objeto']})
+            continue
+
+        item = dict(item)
+        row_id = item.pop('id', None)
+        if row_id is not None:
+            if not _is_id(row_id) or row_id not in owners:
+                results[index] = _failed(index, {'id': ['No encontrado']})
+                continue
+            if current_user['role'] == 'user' and owners[row_id] != current_user['id']:
+                results[index] = _failed(index, {'id': ['No autorizado']})
+                continue
+        elif current_user['role'] == 'user':
+            item['user_id'] = current_user['id']
+        else:
+            item.setdefault('user_id', current_user['id'])
+
+        try:
+            values = (update_schema if row_id is not None else schema).load(item)
+        except ValidationError as e:
+            results[index] = _failed(index, e.messages)
+            continue
+
+        values = {key: value for key, value in values.items() if key in columns}
+        if row_id is not None:
+            updates.append((index, dict(values, id=row_id)))
+        else:
+            creates.append((index, values))
+
+    # Los dueños indicados por un admin deben existir: una sola consulta para todo el lote
+    user_ids = {values['user_id'] for _, values in creates}
+    if user_ids:
+        existing = set(db.session.scalars(select(User.id).where(User.id.in_(user_ids))))
+        for index, values in creates:
+            if values['user_id'] not in existing:
+                results[index] = _failed(index, {'user_id': ['Usuario no encontrado']})
+        creates = [(index, values) for index, values in creates if values['user_id'] in existing]
+
+    try:
+        for (index, _), row_id in zip(creates, _insert_many(model, [values for _, values in creates])):
+            results[index] = {'index': index, 'success': True, 'id': row_id, 'created': True}
+        if updates:
+            db.session.execute(update(model), [values for _, values in updates])
+            for index, values in updates:
+                results[index] = {'index': index, 'success': True, 'id': values['id'], 'created': False}
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        print(f"Lote rechazado por la base de datos: {e.orig}")
+        raise BulkConflict('El lote viola una restricción de la base de datos; no se guardó ningún elemento')
+    except DataError as e:
+        db.session.rollback()
+        print(f"Lote rechazado por la base de datos: {e.orig}")
+        raise BulkError('Algún valor no es válido para la base de datos; no se guardó ningún elemento')
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        print(f"Error guardando el lote: {e}")
+        raise InternalServerError()
+    return results
+
+
+def bulk_status(results):
+    """201 if every item was written, 207 if only some were, 400 if none"""
+    written = sum(1 for result in results if result['success'])
+    if written == len(results):
+        return 201
+    return 207 if written else 400
+
+
+def _insert_many(model, rows):
+    if not rows:
+        return []
+    if db.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        # INSERT ... RETURNING por lotes (insertmanyvalues) con los IDs en el orden enviado;
+        # SQLite no garantiza ese orden y SQLAlchemy lo resuelve fila a fila, igual en una transacción
+        return list(db.session.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows
+        ))
+    # MySQL no tiene RETURNING: el ORM inserta fila a fila, dentro de la misma transacción
+    objects = [model(**row) for row in rows]
+    db.session.add_all(objects)
+    db.session.flush()
+    return [obj.id for obj in objects]
+
+
+def _is_id(value):
+    # bool es subclase de int: {"id": true} no es un id
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _failed(index, errors):
+    return {'index': index, 'success': False, 'errors': errors}
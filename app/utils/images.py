@@ -0,0 +1,200 @@
+# app/utils/images.py
+from PIL import Image, features
+from io import BytesIO
+import math
+import tempfile
+
+# Formatos de salida (mime -> formato de Pillow, extensión, feature de Pillow o None)
+OUTPUT_FORMATS = {
+    "image/jpeg": ("JPEG", ".jpg", None),
+    "image/png": ("PNG", ".png", None),
+    "image/webp": ("WEBP", ".webp", "webp"),
+    "image/avif": ("AVIF", ".avif", "avif"),
+}
+
+# Calidad mínima del modo adaptativo (target_bytes)
+MIN_ADAPTIVE_QUALITY = 40
+
+
+def supported_output_mimes():
+    """Formatos de salida que puede codificar el Pillow instalado"""
+    return [
+        mime for mime, (_, _, feature) in OUTPUT_FORMATS.items()
+        if feature is None or features.check(feature)
+    ]
+
+
+def _open_image(file_stream, max_size):
+    """
+    Abre una imagen pidiendo al decodificador JPEG que la reduzca ya al
+    leerla (draft: escala 1/2, 1/4 o 1/8 sin quedar por debajo del tamaño
+    que tendrá tras thumbnail(max_size)). Una foto de 12-50MP se decodifica
+    así a una fracción del coste.
+    """
+    image = Image.open(file_stream)
+    if image.format == "JPEG":
+        scale = min(max_size[0] / image.width, max_size[1] / image.height)
+        if scale < 1:
+            image.draft("RGB", (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+    return image
+
+
+def compress_image(file_stream, mime_type, max_size=(1920, 1920), quality=80, target_bytes=None):
+    image = _open_image(file_stream, max_size)
+
+    # Convertir a RGB si es necesario (PNG con alpha, etc.)
+    if image.mode in ("RGBA", "P"):
+        image = image.convert("RGB")
+
+    # Redimensionar manteniendo proporción
+    image.thumbnail(max_size)
+
+    return _encode(image, mime_type, quality, target_bytes=target_bytes)
+
+
+# Variantes que se generan al subir una foto (nombre, tamaño máximo)
+IMAGE_VARIANTS = (
+    ("full", (1920, 1920)),
+    ("medium", (960, 960)),
+    ("thumbnail", (320, 320)),
+)
+
+
+def _iter_derivatives(file_stream, mime_type, variants):
+    # El decode se reduce hasta la variante más grande
+    largest = max((max_size for _, max_size in variants), key=lambda size: size[0] * size[1])
+    image = _open_image(file_stream, largest)
+
+    # Convertir a RGB si es necesario (PNG con alpha, etc.)
+    if image.mode in ("RGBA", "P"):
+        image = image.convert("RGB")
+
+    # thumbnail() reduce en sitio: cada variante se codifica antes de reducir la siguiente
+    for name, max_size in sorted(variants, key=lambda v: v[1][0] * v[1][1], reverse=True):
+        image.thumbnail(max_size)
+        yield name, image
+
+
+def generate_image_derivatives(file_stream, mime_type, variants=IMAGE_VARIANTS, quality=80, target_bytes=None):
+    """
+    Genera todas las variantes de una imagen con un solo decode.
+    Cada variante se reduce a partir de la anterior (de mayor a menor).
+    Devuelve {nombre: (stream, mime, ext)}.
+    """
+    return {
+        name: _encode(image, mime_type, quality, target_bytes=target_bytes)
+        for name, image in _iter_derivatives(file_stream, mime_type, variants)
+    }
+
+
+def generate_image_derivative_files(source, mime_type, out_dir=None, variants=IMAGE_VARIANTS, quality=80,
+                                    target_bytes=None):
+    """
+    Igual que generate_image_derivatives, pero lee de una ruta (o bytes) y
+    escribe cada variante directamente en un archivo temporal de ``out_dir``.
+    Devuelve {nombre: (ruta, mime, ext)}. Apta para ProcessPoolExecutor.
+    """
+    file_stream = BytesIO(source) if isinstance(source, bytes) else source
+    _, _, ext = _output_format(mime_type)
+
+    files = {}
+    for name, image in _iter_derivatives(file_stream, mime_type, variants):
+        with tempfile.NamedTemporaryFile(prefix=f"{name}_", suffix=ext, dir=out_dir, delete=False) as out:
+            _, new_mime, _ = _encode(image, mime_type, quality, output=out, target_bytes=target_bytes)
+        files[name] = (out.name, new_mime, ext)
+    return files
+
+
+def _output_format(mime_type):
+    if mime_type == "image/jpg":
+        mime_type = "image/jpeg"
+    if mime_type in OUTPUT_FORMATS and mime_type != "image/png":
+        fmt, ext, _ = OUTPUT_FORMATS[mime_type]
+        return fmt, mime_type, ext
+    # PNG optimizado
+    return "PNG", "image/png", ".png"
+
+
+def _save(image, output, fmt, quality):
+    if fmt == "JPEG":
+        image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    elif fmt == "WEBP":
+        image.save(output, format="WEBP", quality=quality, method=4)
+    elif fmt == "AVIF":
+        # speed alto: se codifica al vuelo en el proxy
+        image.save(output, format="AVIF", quality=quality, speed=8)
+    else:
+        image.save(output, format="PNG", optimize=True)
+
+
+def _encode(image, mime_type, quality, output=None, target_bytes=None):
+    """
+    Codifica ``image`` en el formato de ``mime_type``. Con ``target_bytes``
+    (formatos con pérdida) busca la mayor calidad entre MIN_ADAPTIVE_QUALITY
+    y ``quality`` cuyo resultado no pase de ese tamaño.
+    """
+    output = output if output is not None else BytesIO()
+    fmt, new_mime, ext = _output_format(mime_type)
+
+    if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    if target_bytes and fmt != "PNG":
+        # La prueba elegida ya es la salida: no se vuelve a codificar
+        output.write(_adaptive_encode(image, fmt, quality, target_bytes).getbuffer())
+    else:
+        _save(image, output, fmt, quality)
+    output.seek(0)
+    return output, new_mime, ext
+
+
+def _adaptive_encode(image, fmt, quality, target_bytes):
+    # Búsqueda binaria: 1 encode si ya cabe a la calidad pedida, ~5 si no
+    probes = {}
+
+    def encode_at(q):
+        if q not in probes:
+            probes[q] = BytesIO()
+            _save(image, probes[q], fmt, q)
+        return probes[q]
+
+    if encode_at(quality).tell() <= target_bytes:
+        return probes[quality]
+    low, high = MIN_ADAPTIVE_QUALITY, quality - 1
+    best = None
+    while low <= high:
+        mid = (low + high) // 2
+        if encode_at(mid).tell() <= target_bytes:
+            best, low = mid, mid + 1
+        else:
+            high = mid - 1
+    return encode_at(MIN_ADAPTIVE_QUALITY if best is None else best)
+
+
+def render_image(file_stream, width=None, quality=80, output_mime=None, target_bytes=None):
+    """
+    Lee una imagen y la reduce a ``width`` px de ancho como máximo,
+    codificándola como ``output_mime`` (por defecto, su formato original).
+    Sin ancho (o si ya es más pequeña) y sin cambio de formato devuelve
+    los bytes originales. Devuelve (bytes, mime).
+    """
+    data = file_stream.read()
+    image = Image.open(BytesIO(data))
+    mime_type = Image.MIME.get(image.format, "application/octet-stream")
+    output_mime = output_mime or mime_type
+    resize = bool(width) and image.width > width
+    if not resize and output_mime == mime_type:
+        return data, mime_type
+
+    if resize:
+        # Solo se limita el ancho: el alto sigue la proporción
+        image = _open_image(BytesIO(data), (width, image.height))
+        image.thumbnail((width, image.height))
+    output, new_mime, _ = _encode(image, output_mime, quality, target_bytes=target_bytes)
+    return output.getvalue(), new_mime
+
+
+def variant_filename(filename, variant, ext):
+    """vehicle_x.jpg + thumbnail -> vehicle_x_thumbnail.jpg ('full' conserva el nombre base)."""
+    stem = filename.rsplit('.', 1)[0]
+    return f"{stem}{ext}" if variant == "full" else f"{stem}_{variant}{ext}"
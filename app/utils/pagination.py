@@ -0,0 +1,135 @@
+from datetime import date, datetime
+from flask import current_app, request
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import func, select, text, tuple_
+from werkzeug.exceptions import BadRequest
+from app import db
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+class PaginationError(BadRequest):
+    """Invalid limit or cursor in the query string"""
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='pagination')
+
+
+def wants_page():
+    """True if the request asked for a page (?limit= or ?cursor=); otherwise the full list is returned"""
+    return 'limit' in request.args or 'cursor' in request.args
+
+
+def keyset_page(query, *columns):
+    """
+    Paginate ``query`` by keyset on ``columns`` (indexed and unique
+    together, e.g. the primary key) using ``?limit=`` and ``?cursor=``.
+
+    Returns (items, page). ``page`` is the dict to merge into the response:
+    ``limit``, ``next_cursor`` (opaque, None on the last page) and, with
+    ``?total=true``, the ``total`` of rows matching ``query`` (estimated
+    from table statistics only when the query is the whole table). Without
+    limit/cursor the whole list is returned in the same order and ``page``
+    is empty, so existing clients keep working.
+    """
+    if not wants_page():
+        return query.order_by(*columns).all(), {}
+
+    limit = _limit(request.args.get('limit'))
+    page = {'limit': limit}
+    if request.args.get('total', '').lower() in TRUE_VALUES:
+        page['total'] = _total(query, columns[0].class_)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        query = query.filter(_after(columns, _load_cursor(cursor, columns)))
+
+    # Una fila de más indica si hay otra página, sin COUNT
+    items = query.order_by(*columns).limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    page['next_cursor'] = (
+        _serializer().dumps([_dump_value(getattr(items[-1], column.key)) for column in columns]) if has_more else None
+    )
+    return items, page
+
+
+def approximate_count(model):
+    """
+    Row count of ``model``'s table from the engine's statistics where
+    available (MySQL information_schema, PostgreSQL pg_class), else COUNT(*).
+    """
+    table = model.__table__.name
+    dialect = db.engine.dialect.name
+    with db.engine.connect() as conn:
+        if dialect == 'mysql':
+            estimate = conn.execute(text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+            ), {'table': table}).scalar()
+        elif dialect == 'postgresql':
+            estimate = conn.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                {'table': table}
+            ).scalar()
+        else:
+            estimate = None
+        if estimate is None or estimate < 0:
+            estimate = conn.execute(select(func.count()).select_from(model.__table__)).scalar()
+    return int(estimate)
+
+
+def _total(query, model):
+    # La estimación de las estadísticas solo vale para la tabla entera;
+    # con filtros o JOIN se cuentan las filas de la consulta
+    statement = query.statement
+    froms = statement.get_final_froms()
+    if statement.whereclause is None and len(froms) == 1 and froms[0] is model.__table__:
+        return approximate_count(model)
+    return query.order_by(None).count()
+
+
+def _limit(value):
+    default = current_app.config.get('PAGINATION_DEFAULT_LIMIT', 50)
+    maximum = current_app.config.get('PAGINATION_MAX_LIMIT', 200)
+    if not value:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError('El parámetro limit debe ser un entero positivo')
+    if limit <= 0:
+        raise PaginationError('El parámetro limit debe ser un entero positivo')
+    return min(limit, maximum)
+
+
+def _dump_value(value):
+    # Fechas en ISO 8601; el resto de claves (enteros, texto) tal cual en el JSON
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _load_cursor(cursor, columns):
+    try:
+        values = _serializer().loads(cursor)
+    except BadSignature:
+        raise PaginationError('Cursor no válido')
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise PaginationError('Cursor no válido')
+    try:
+        return [_load_value(column, value) for column, value in zip(columns, values)]
+    except (TypeError, ValueError):
+        raise PaginationError('Cursor no válido')
+
+
+def _load_value(column, value):
+    python_type = column.type.python_type
+    if python_type in (date, datetime):
+        return python_type.fromisoformat(value)
+    return value
+
+
+def _after(columns, values):
+    if len(columns) == 1:
+        return columns[0] > values[0]
+    return tuple_(*columns) > tuple_(*values)
@@ -0,0 +1,28 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def init_query_count(app):
+    """Cuenta las consultas SQL de cada request y las expone en la cabecera X-Query-Count"""
+    if not app.config.get('SQL_QUERY_COUNT_HEADER'):
+        return
+
+    # Se registra una sola vez por proceso aunque se creen varias apps
+    if not event.contains(Engine, 'before_cursor_execute', _count_query):
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+
+    warn_at = app.config.get('SQL_QUERY_COUNT_WARN')
+
+    @app.after_request
+    def report_query_count(response):
+        count = g.get('query_count', 0)
+        response.headers['X-Query-Count'] = str(count)
+        if warn_at and count > warn_at:
+            print(f"Demasiadas consultas SQL en {request.method} {request.path}: {count}")
+        return response
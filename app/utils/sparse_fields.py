@@ -0,0 +1,40 @@
+from flask import request
+from sqlalchemy.orm import load_only
+from werkzeug.exceptions import BadRequest
+
+
+class FieldsError(BadRequest):
+    """Unknown field in ?fields="""
+
+
+def sparse_fieldset(schema, model):
+    """
+    Narrow ``schema`` to the fields listed in ``?fields=a,b`` and build the
+    matching ``load_only`` option for ``model``, so only those columns are
+    read from the database.
+
+    Computed fields declare the columns they read in the schema's
+    ``field_columns`` (e.g. ``{'is_expired': ('end_date',)}``). Returns
+    (schema, options); without ?fields= it is the schema itself and no options.
+    """
+    value = request.args.get('fields')
+    if not value:
+        return schema, []
+
+    requested = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    available = [name for name, field in schema.fields.items() if not field.load_only]
+    unknown = [name for name in requested if name not in available]
+    if unknown or not requested:
+        raise FieldsError(
+            f"Campos no válidos: {', '.join(unknown) or value}. Disponibles: {', '.join(available)}"
+        )
+
+    columns = set(model.__mapper__.column_attrs.keys())
+    depends = getattr(schema, 'field_columns', {})
+    needed = {'id'}
+    for name in requested:
+        needed.update(depends.get(name, (name,)))
+    attributes = [getattr(model, name) for name in sorted(needed & columns)]
+
+    narrowed = schema.__class__(only=requested, many=schema.many)
+    return narrowed, [load_only(*attributes)]
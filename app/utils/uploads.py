@@ -0,0 +1,153 @@
+# app/utils/uploads.py
+import hashlib
+import io
+import tempfile
+import tracemalloc
+from flask import Request, current_app, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+
+
+class SpooledUpload:
+    """
+    Archivo temporal para un archivo subido, con límite de tamaño.
+    Se mantiene en memoria hasta ``max_memory`` bytes y después pasa a un
+    archivo con nombre en ``spool_dir`` (``path``), de modo que la compresión
+    y la subida a Drive pueden leerlo sin copiarlo otra vez a memoria.
+    Si se superan ``max_bytes`` mientras llega el archivo se aborta con 413.
+    El SHA-256 (``sha256``) se calcula al vuelo, sin volver a leer el archivo.
+    """
+
+    def __init__(self, max_bytes=None, max_memory=512 * 1024, spool_dir=None):
+        self.max_bytes = max_bytes
+        self.max_memory = max_memory
+        self.spool_dir = spool_dir
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._file = io.BytesIO()
+        self._rolled = False
+
+    @property
+    def path(self):
+        """Ruta en disco (None mientras el archivo sigue en memoria)"""
+        return self._file.name if self._rolled else None
+
+    @property
+    def sha256(self):
+        """SHA-256 (hex) de todo lo recibido"""
+        return self._digest.hexdigest()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise RequestEntityTooLarge(
+                f"El archivo excede el tamaño máximo permitido ({self.max_bytes // (1024 * 1024)}MB)"
+            )
+        if not self._rolled and self._file.tell() + len(data) > self.max_memory:
+            self.rollover()
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def rollover(self):
+        """Mover el contenido de memoria a un archivo temporal en disco"""
+        if self._rolled:
+            return
+        disk = tempfile.NamedTemporaryFile(prefix='upload_', dir=self.spool_dir)
+        disk.write(self._file.getbuffer())
+        disk.seek(self._file.tell())
+        self._file.close()
+        self._file = disk
+        self._rolled = True
+
+    def getvalue(self):
+        if self._rolled:
+            raise io.UnsupportedOperation("getvalue() no disponible: el archivo ya está en disco")
+        return self._file.getvalue()
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+
+class UploadRequest(Request):
+    """Request que recibe cada archivo en un SpooledUpload limitado por UPLOAD_MAX_FILE_SIZE"""
+
+    # Campos de texto del formulario (los archivos no cuentan para este límite)
+    max_form_memory_size = 512 * 1024
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        config = current_app.config
+        return SpooledUpload(
+            max_bytes=config.get('UPLOAD_MAX_FILE_SIZE'),
+            max_memory=config.get('UPLOAD_SPOOL_MEMORY_SIZE', 512 * 1024),
+            spool_dir=config.get('UPLOAD_SPOOL_DIR')
+        )
+
+
+def upload_size(file_storage):
+    """Tamaño de un archivo subido sin recorrer el stream cuando ya se conoce"""
+    size = getattr(file_storage.stream, 'size', None)
+    if size is not None:
+        return size
+    stream = file_storage.stream
+    stream.seek(0, io.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+
+def upload_hash(file_storage):
+    """SHA-256 de un archivo subido (ya calculado si llegó en un SpooledUpload)"""
+    digest = getattr(file_storage.stream, 'sha256', None)
+    if isinstance(digest, str):
+        return digest
+    stream = file_storage.stream
+    stream.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def init_upload_handling(app):
+    """Instala UploadRequest, el manejo de 413 y (opcional) la medición de memoria por request"""
+    app.request_class = UploadRequest
+
+    if app.config.get('UPLOAD_MEMORY_PROFILE'):
+        # Se registra primero para que la medición incluya la recepción del multipart
+        @app.before_request
+        def start_memory_profile():
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+    @app.before_request
+    def parse_multipart_early():
+        # Parsear aquí hace que el 413 salga antes de los try/except de las vistas
+        if request.mimetype == 'multipart/form-data':
+            request.files
+
+    if app.config.get('UPLOAD_MEMORY_PROFILE'):
+        @app.after_request
+        def report_memory_profile(response):
+            if tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                response.headers['X-Peak-Memory'] = str(peak)
+                print(f"Memoria pico {request.method} {request.path}: {peak / 1024:.0f} KB")
+            return response
+
+    @app.errorhandler(413)
+    def request_entity_too_large(error):
+        return jsonify({
+            'success': False,
+            'error': 'Request Entity Too Large',
+            'message': error.description
+        }), 413
@@ -0,0 +1,99 @@
+"""Escritura por lotes (/bulk, un executemany por transacción) contra peticiones sueltas
+
+Guarda ``--items`` vehículos de tres formas, cada una con una base nueva:
+
+  * sueltos:        un POST /api/vehicles por vehículo (un commit por petición)
+  * bulk:           POST /api/vehicles/bulk en lotes de ``--batch`` elementos
+  * bulk (update):  los mismos vehículos actualizados con id en lotes de ``--batch``,
+                    comparado con un PUT /api/vehicles/<id> por vehículo
+
+Informa el tiempo total, elementos/s y peticiones hechas. La app corre en el
+proceso con el cliente de pruebas de Flask: mide la ruta y la base, no la red.
+
+    python benchmarks/bulk_throughput.py [--items 1000] [--batch 200]
+"""
+import argparse
+import time
+
+from common import auth_headers, make_app, quiet, table
+
+VEHICLE = {'make': 'Honda', 'model': 'CB500', 'year': 2020, 'color': 'rojo', 'license_plate': 'ABC123', 'vin': 'VIN'}
+
+
+def single_creates(client, headers, count):
+    for _ in range(count):
+        response = client.post('/api/vehicles/', data=dict(VEHICLE, user_id=1), headers=headers)
+        assert response.status_code == 201, response.get_json()
+    return count
+
+
+def bulk_creates(client, headers, count, batch):
+    requests = 0
+    for start in range(0, count, batch):
+        items = [dict(VEHICLE) for _ in range(min(batch, count - start))]
+        response = client.post('/api/vehicles/bulk', json=items, headers=headers)
+        assert response.status_code == 201, response.get_json()
+        requests += 1
+    return requests
+
+
+def single_updates(client, headers, ids):
+    for row_id in ids:
+        response = client.put(f'/api/vehicles/{row_id}', json={'color': 'azul'}, headers=headers)
+        assert response.status_code == 200, response.get_json()
+    return len(ids)
+
+
+def bulk_updates(client, headers, ids, batch):
+    requests = 0
+    for start in range(0, len(ids), batch):
+        items = [{'id': row_id, 'color': 'azul'} for row_id in ids[start:start + batch]]
+        response = client.post('/api/vehicles/bulk', json=items, headers=headers)
+        assert response.status_code == 201, response.get_json()
+        requests += 1
+    return requests
+
+
+def measure(name, run, count, batch, prepare=False):
+    """
+    Ejecuta ``run(client, headers, ids)`` en una app nueva y devuelve la fila de la
+    tabla; con ``prepare`` crea antes ``count`` vehículos (fuera de la medida)
+    """
+    from app.models.vehicle import Vehicle
+
+    flask_app, _ = make_app(BULK_MAX_ITEMS=max(500, batch))
+    headers = auth_headers(flask_app)
+    client = flask_app.test_client()
+    ids = []
+    with quiet():
+        if prepare:
+            bulk_creates(client, headers, count, batch)
+            with flask_app.app_context():
+                ids = [row_id for (row_id,) in Vehicle.query.with_entities(Vehicle.id).order_by(Vehicle.id)]
+        started = time.perf_counter()
+        requests = run(client, headers, ids)
+        elapsed = time.perf_counter() - started
+    return (name, count, requests, f'{elapsed:.2f}', f'{count / elapsed:.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=200)
+    args = parser.parse_args()
+    count, batch = args.items, args.batch
+
+    rows = [
+        measure('crear sueltos', lambda client, headers, _: single_creates(client, headers, count), count, batch),
+        measure(f'crear bulk ({batch})', lambda client, headers, _: bulk_creates(client, headers, count, batch),
+                count, batch),
+        measure('actualizar sueltos', lambda client, headers, ids: single_updates(client, headers, ids),
+                count, batch, prepare=True),
+        measure(f'actualizar bulk ({batch})', lambda client, headers, ids: bulk_updates(client, headers, ids, batch),
+                count, batch, prepare=True),
+    ]
+    table(rows, ('camino', 'elementos', 'peticiones', 'segundos', 'elementos/s'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Utilidades compartidas por los benchmarks (app aislada en un directorio temporal)"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Antes de importar la app: sin Google ni la base de desarrollo
+os.environ.setdefault('FLASK_ENV', 'testing')
+os.environ.setdefault('STORAGE_BACKEND', 'local')
+
+
+def make_app(workdir=None, **config):
+    """Crea la app con una base SQLite propia en ``workdir`` y devuelve (app, workdir)"""
+    from app import create_app, db
+    from app.config import TestingConfig
+    import app.models  # noqa: F401
+
+    workdir = workdir or tempfile.mkdtemp(prefix='club_bench_')
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'club.db')}"
+    TestingConfig.LOCAL_STORAGE_ROOT = os.path.join(workdir, 'storage')
+    TestingConfig.UPLOAD_SPOOL_DIR = os.path.join(workdir, 'spool')
+    TestingConfig.IMAGE_CACHE_DIR = os.path.join(workdir, 'image_cache')
+    for name, value in config.items():
+        setattr(TestingConfig, name, value)
+
+    with quiet():
+        flask_app = create_app('testing')
+        with flask_app.app_context():
+            db.create_all()
+    return flask_app, workdir
+
+
+def auth_headers(flask_app, user_id=1, role='admin'):
+    """Crea el usuario si no existe y devuelve las cabeceras con su token"""
+    from flask_jwt_extended import create_access_token
+    from app import db
+    from app.models.user import User
+
+    with flask_app.app_context():
+        if not db.session.get(User, user_id):
+            user = User(username=f'user{user_id}', email=f'user{user_id}@club.test', role=role)
+            user.id = user_id
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+        token = create_access_token(identity={'id': user_id, 'email': f'user{user_id}@club.test', 'role': role})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def quiet():
+    """Silencia los print() de las rutas mientras corre el benchmark"""
+    import contextlib
+    import io
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def jpeg_bytes(width, height, quality=90):
+    """
+    JPEG con formas, degradado y algo de ruido de sensor: se comprime y pesa
+    como una foto de móvil (~3MB a 12MP), no como un color plano ni como ruido puro
+    """
+    import io
+    from PIL import Image
+
+    shapes = Image.effect_mandelbrot((width // 8, height // 8), (-2.2, -1.2, 1.0, 1.2), 60)
+    shapes = shapes.resize((width, height), Image.BICUBIC)
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 20)
+    image = Image.merge('RGB', (
+        Image.blend(shapes, noise, 0.3), Image.blend(gradient, noise, 0.3), Image.blend(shapes, gradient, 0.5)
+    ))
+    out = io.BytesIO()
+    image.save(out, 'JPEG', quality=quality)
+    return out.getvalue()
+
+
+def table(rows, headers):
+    """Imprime una tabla simple alineada"""
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers] + list(rows):
+        print('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
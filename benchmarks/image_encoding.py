@@ -0,0 +1,108 @@
+"""Decode/encode de fotos: decode en modo draft y formatos modernos contra compress_image original
+
+Para fotos JPEG de móvil de varios tamaños compara, reduciendo a 1920px:
+
+  * anterior:        compress_image original (Image.open + thumbnail + JPEG optimize)
+  * decode completo: igual pero decodificando a tamaño completo antes de reducir
+  * actual:          _open_image (draft a escala reducida) + _encode, en JPEG
+                     progresivo, WebP y AVIF (si el Pillow instalado los codifica)
+  * adaptativo:      actual con IMAGE_TARGET_BYTES (búsqueda de calidad)
+
+Informa la mediana de ``--repeat`` ejecuciones del decode+resize, del encode
+y el tamaño de salida.
+
+    python benchmarks/image_encoding.py [--sizes 12,24,48] [--repeat 5] [--target-kb 250]
+"""
+import argparse
+import statistics
+import time
+from io import BytesIO
+
+from common import jpeg_bytes, table
+
+from PIL import Image
+from app.utils.images import _encode, _open_image, supported_output_mimes
+
+MAX_SIZE = (1920, 1920)
+DIMENSIONS = {12: (4000, 3000), 24: (6000, 4000), 48: (8000, 6000)}
+
+
+def previous(data):
+    """compress_image como estaba antes del decode en modo draft (Image.open + thumbnail + JPEG optimize)"""
+    started = time.perf_counter()
+    image = Image.open(BytesIO(data))
+    if image.mode in ("RGBA", "P"):
+        image = image.convert("RGB")
+    image.thumbnail(MAX_SIZE)
+    decoded = time.perf_counter()
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=80, optimize=True)
+    return decoded - started, time.perf_counter() - decoded, output.tell()
+
+
+def full_decode(data):
+    """Como el anterior, pero sin ningún draft: el peor caso de decode"""
+    started = time.perf_counter()
+    image = Image.open(BytesIO(data))
+    image.load()
+    image.thumbnail(MAX_SIZE)
+    decoded = time.perf_counter()
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=80, optimize=True)
+    return decoded - started, time.perf_counter() - decoded, output.tell()
+
+
+def current(mime, target_bytes=None):
+    def run(data):
+        started = time.perf_counter()
+        image = _open_image(BytesIO(data), MAX_SIZE)
+        if image.mode in ("RGBA", "P"):
+            image = image.convert("RGB")
+        image.thumbnail(MAX_SIZE)
+        decoded = time.perf_counter()
+        output, _, _ = _encode(image, mime, 80, target_bytes=target_bytes)
+        return decoded - started, time.perf_counter() - decoded, len(output.getvalue())
+    return run
+
+
+def measure(path, data, repeat):
+    runs = [path(data) for _ in range(repeat)]
+    decode, encode, size = (statistics.median(values) for values in zip(*runs))
+    return decode, encode, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='12,24,48', help='megapíxeles de las fotos (12, 24 y/o 48)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--target-kb', type=int, default=250, help='IMAGE_TARGET_BYTES del modo adaptativo')
+    args = parser.parse_args()
+
+    mimes = supported_output_mimes()
+    paths = [('anterior (JPEG)', previous), ('decode completo (JPEG)', full_decode)]
+    for mime in ('image/jpeg', 'image/webp', 'image/avif'):
+        if mime in mimes:
+            paths.append((f'actual ({mime.split("/")[1].upper()})', current(mime)))
+    paths.append((f'adaptativo JPEG {args.target_kb}KB', current('image/jpeg', args.target_kb * 1024)))
+    if 'image/webp' in mimes:
+        paths.append((f'adaptativo WebP {args.target_kb}KB', current('image/webp', args.target_kb * 1024)))
+
+    rows = []
+    for megapixels in (int(size) for size in args.sizes.split(',')):
+        width, height = DIMENSIONS[megapixels]
+        data = jpeg_bytes(width, height)
+        for name, path in paths:
+            decode, encode, size = measure(path, data, args.repeat)
+            rows.append((
+                f'{megapixels}MP', f'{len(data) / 1e6:.1f}', name,
+                f'{decode * 1000:.0f}', f'{encode * 1000:.0f}', f'{(decode + encode) * 1000:.0f}', f'{size / 1e3:.0f}',
+            ))
+
+    table(rows, ('foto', 'MB', 'camino', 'decode_ms', 'encode_ms', 'total_ms', 'salida_KB'))
+    missing = [mime for mime in ('image/webp', 'image/avif') if mime not in mimes]
+    if missing:
+        print(f"\nSin soporte en este Pillow: {', '.join(missing)}")
+
+
+if __name__ == '__main__':
+    main()
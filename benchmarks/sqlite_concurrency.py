@@ -0,0 +1,148 @@
+"""Lecturas y escrituras concurrentes sobre SQLite: perfil ajustado (WAL, busy_timeout) contra el por defecto
+
+Cada escenario crea una base SQLite en disco con ``USERS`` usuarios y
+``VEHICLES_PER_USER`` vehículos cada uno, y lanza N hilos durante ``--seconds``
+segundos. Cada hilo, con su propia sesión, hace:
+
+  * lectura:   los vehículos de un usuario al azar
+  * escritura: inserta un vehículo o cambia el color de uno existente, con commit
+
+con probabilidad ``--write-ratio`` de escribir. Se compara:
+
+  * por defecto: SQLITE_PRAGMAS vacío (journal DELETE, synchronous FULL, sin busy_timeout;
+                 el driver sqlite3 espera el lock ``--driver-timeout`` s por su cuenta,
+                 5 por defecto; con 0 los "database is locked" salen al momento)
+  * ajustado:    SQLITE_PRAGMAS de la configuración (WAL, synchronous NORMAL, busy_timeout...)
+
+Informa lecturas/s, escrituras/s, p95 de latencia y los errores de la base
+(p. ej. "database is locked") agrupados por mensaje. El pool se dimensiona al
+número de hilos para que la espera medida sea la de SQLite y no la del pool.
+
+    python benchmarks/sqlite_concurrency.py [--threads 1,4,16,32] [--seconds 5] [--write-ratio 0.2] [--driver-timeout 5]
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+
+from common import make_app, quiet, table
+
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.config import Config
+from app.models.user import User
+from app.models.vehicle import Vehicle
+
+USERS = 20
+VEHICLES_PER_USER = 50
+PROFILES = {'por defecto': {}, 'ajustado': Config.SQLITE_PRAGMAS}
+
+
+def seed():
+    for n in range(1, USERS + 1):
+        user = User(username=f'user{n}', email=f'user{n}@club.test', role='user')
+        user.id = n
+        user.password_hash = 'x'
+        db.session.add(user)
+    db.session.add_all(
+        Vehicle(user_id=n % USERS + 1, make='Honda', model='CB500', year=2020, color='rojo', license_plate=f'P{n}')
+        for n in range(USERS * VEHICLES_PER_USER)
+    )
+    db.session.commit()
+
+
+def read(rng):
+    Vehicle.query.filter_by(user_id=rng.randint(1, USERS)).all()
+
+
+def write(rng):
+    if rng.random() < 0.5:
+        db.session.add(Vehicle(user_id=rng.randint(1, USERS), make='Yamaha', model='MT07', year=2021,
+                               color='azul', license_plate='NEW1'))
+    else:
+        vehicle = db.session.get(Vehicle, rng.randint(1, USERS * VEHICLES_PER_USER))
+        vehicle.color = rng.choice(('rojo', 'azul', 'negro'))
+    db.session.commit()
+
+
+def worker(flask_app, seed_value, write_ratio, deadline, result):
+    """Bucle de un hilo: acumula en ``result`` operaciones, latencias y errores"""
+    rng = random.Random(seed_value)
+    with flask_app.app_context():
+        while time.perf_counter() < deadline:
+            is_write = rng.random() < write_ratio
+            started = time.perf_counter()
+            try:
+                (write if is_write else read)(rng)
+            except OperationalError as e:
+                db.session.rollback()
+                result['errors'][str(e.orig)] += 1
+                continue
+            result['latencies'].append(time.perf_counter() - started)
+            result['writes' if is_write else 'reads'] += 1
+        db.session.remove()
+
+
+def run(pragmas, threads, seconds, write_ratio, driver_timeout):
+    engine_options = dict(Config.SQLALCHEMY_ENGINE_OPTIONS, pool_size=threads, max_overflow=0,
+                          connect_args={'timeout': driver_timeout})
+    flask_app, _ = make_app(SQLITE_PRAGMAS=dict(pragmas), SQLALCHEMY_ENGINE_OPTIONS=engine_options)
+    with flask_app.app_context():
+        seed()
+
+    results = [{'reads': 0, 'writes': 0, 'latencies': [], 'errors': Counter()} for _ in range(threads)]
+    deadline = time.perf_counter() + seconds
+    workers = [
+        threading.Thread(target=worker, args=(flask_app, n, write_ratio, deadline, result))
+        for n, result in enumerate(results)
+    ]
+    with quiet():
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+    latencies = [latency for result in results for latency in result['latencies']]
+    errors = sum((result['errors'] for result in results), Counter())
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) >= 20 else max(latencies, default=0)
+    return (
+        sum(result['reads'] for result in results) / seconds,
+        sum(result['writes'] for result in results) / seconds,
+        p95,
+        errors,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--threads', default='1,4,16,32')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--driver-timeout', type=float, default=5)
+    args = parser.parse_args()
+
+    if not PROFILES['ajustado']:
+        print('SQLITE_TUNING=false: el perfil "ajustado" es igual al por defecto\n')
+
+    rows, all_errors = [], Counter()
+    for threads in (int(value) for value in args.threads.split(',')):
+        for name, pragmas in PROFILES.items():
+            reads, writes, p95, errors = run(pragmas, threads, args.seconds, args.write_ratio, args.driver_timeout)
+            all_errors.update({(name, threads, message): count for message, count in errors.items()})
+            rows.append((threads, name, f'{reads:.0f}', f'{writes:.0f}', f'{p95 * 1000:.1f}', sum(errors.values())))
+
+    table(rows, ('hilos', 'perfil', 'lecturas/s', 'escrituras/s', 'p95_ms', 'errores'))
+    if all_errors:
+        print('\nErrores de la base:')
+        for (name, threads, message), count in sorted(all_errors.items()):
+            print(f'  {name}, {threads} hilos: {message} x{count}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Memoria pico por request de subida: spool a disco y compresión por streaming
+
+Levanta la API en un proceso aparte por escenario (almacenamiento local,
+compresión en el mismo proceso) y envía el archivo por HTTP real. Para cada
+request informa:
+
+  * heap_peak_mb: pico de memoria Python del request (tracemalloc, cabecera X-Peak-Memory)
+  * rss_peak_mb:  crecimiento del pico de RSS del proceso durante el request
+                  (/proc/<pid>/status VmHWM, incluye los buffers nativos de Pillow)
+
+Como referencia, ``legacy`` mide en otro proceso el camino anterior: todo el
+archivo en un BytesIO y la foto decodificada a tamaño completo.
+
+    python benchmarks/upload_memory.py
+"""
+import argparse
+import io
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import auth_headers, jpeg_bytes, make_app, table
+
+SCRIPT = os.path.abspath(__file__)
+VEHICLE = {'make': 'Honda', 'model': 'CB500', 'year': '2020', 'color': 'rojo', 'license_plate': 'ABC123', 'vin': 'VIN123', 'user_id': '1'}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _proc_status(pid, field):
+    try:
+        with open(f'/proc/{pid}/status') as fh:
+            for line in fh:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak(pid):
+    # "5" reinicia VmHWM al RSS actual (Linux)
+    try:
+        with open(f'/proc/{pid}/clear_refs', 'w') as fh:
+            fh.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def serve(port):
+    """Proceso servidor: imprime READY <token> y atiende requests hasta que lo terminen"""
+    from werkzeug.serving import make_server
+
+    flask_app, _ = make_app(UPLOAD_MEMORY_PROFILE=True, UPLOAD_PROCESS_POOL_SIZE=0, ASYNC_UPLOADS=False)
+    headers = auth_headers(flask_app)
+    server = make_server('127.0.0.1', port, flask_app)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    print('READY', headers['Authorization'], flush=True)
+    sys.stdout = open(os.devnull, 'w')
+    server.serve_forever()
+
+
+def legacy(paths):
+    """Camino anterior: cada archivo completo en memoria y decode a tamaño completo; imprime el pico de RSS"""
+    from PIL import Image
+
+    # El request completo quedaba en memoria mientras se procesaban sus fotos
+    uploads = []
+    for path in paths:
+        with open(path, 'rb') as fh:
+            uploads.append(io.BytesIO(fh.read()))
+    for data in uploads:
+        image = Image.open(data)
+        image = image.convert('RGB')
+        image.thumbnail((1920, 1920))
+        image.save(io.BytesIO(), 'JPEG', quality=80)
+    # VmHWM y no ru_maxrss: este último conserva tras exec el pico del proceso padre
+    print(_proc_status('self', 'VmHWM'))
+
+
+def _legacy_peak(paths):
+    """Pico de RSS del camino anterior menos el de un proceso que solo importa PIL"""
+    def run(*args):
+        out = subprocess.run([sys.executable, SCRIPT, '--legacy', *args], capture_output=True, text=True)
+        return int(out.stdout.split()[-1])
+
+    return run(*paths) - run()
+
+
+def _scenarios(workdir):
+    photo_12mp = os.path.join(workdir, 'photo_12mp.jpg')
+    with open(photo_12mp, 'wb') as fh:
+        fh.write(jpeg_bytes(4000, 3000))
+    photo_5mp = os.path.join(workdir, 'photo_5mp.jpg')
+    with open(photo_5mp, 'wb') as fh:
+        fh.write(jpeg_bytes(2592, 1944))
+    pdf_9mb = os.path.join(workdir, 'policy_9mb.pdf')
+    with open(pdf_9mb, 'wb') as fh:
+        fh.write(b'%PDF-1.4\n' + os.urandom(9 * 1024 * 1024))
+    too_big = os.path.join(workdir, 'photo_12mb.jpg')
+    with open(too_big, 'wb') as fh:
+        fh.write(b'\xff\xd8' + os.urandom(12 * 1024 * 1024))
+
+    vehicle = VEHICLE
+    policy = {'company': 'Seguros', 'policy_number': 'P-1', 'start_date': '2026-01-01',
+              'end_date': '2027-01-01', 'vehicle_id': '1', 'user_id': '1'}
+    return [
+        ('1 foto 12MP', '/api/vehicles/', vehicle, [('vehicle_files', photo_12mp)], True),
+        ('3 fotos 5MP', '/api/vehicles/', vehicle, [('vehicle_files', photo_5mp)] * 3, True),
+        ('póliza PDF 9MB', '/api/insurance-policies', policy, [('policy_file', pdf_9mb)], False),
+        ('foto 12MB (413)', '/api/vehicles/', vehicle, [('vehicle_files', too_big)], False),
+    ]
+
+
+def _post(port, token, path, data, files):
+    import requests
+
+    handles = [(field, (os.path.basename(name), open(name, 'rb'), 'image/jpeg' if name.endswith('.jpg')
+                        else 'application/pdf')) for field, name in files]
+    try:
+        response = requests.post(f'http://127.0.0.1:{port}{path}', data=data, files=handles,
+                                 headers={'Authorization': token}, timeout=300)
+    finally:
+        for _, (_, fh, _) in handles:
+            fh.close()
+    return response
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='club_bench_mem_')
+    rows = []
+    for name, path, data, files, photos in _scenarios(workdir):
+        port = _free_port()
+        server = subprocess.Popen([sys.executable, SCRIPT, '--serve', str(port)], stdout=subprocess.PIPE, text=True)
+        try:
+            token = server.stdout.readline().split(' ', 1)[1].strip()
+            # Calentamiento (imports perezosos) y vehículo 1 para la póliza
+            _post(port, token, '/api/vehicles/', VEHICLE, [])
+            exact = _reset_peak(server.pid)
+            before = _proc_status(server.pid, 'VmRSS' if exact else 'VmHWM')
+            started = time.perf_counter()
+            response = _post(port, token, path, data, files)
+            elapsed = time.perf_counter() - started
+            peak = _proc_status(server.pid, 'VmHWM')
+            heap = response.headers.get('X-Peak-Memory')
+            size = sum(os.path.getsize(file) for _, file in files)
+            rows.append((
+                name, f'{size / 1e6:.1f}', response.status_code,
+                f'{int(heap) / 1e6:.1f}' if heap else '-',
+                f'{(peak - before) / 1e6:.1f}' if peak and before else '-',
+                f'{elapsed:.2f}',
+            ))
+        finally:
+            server.terminate()
+            server.wait()
+
+        if photos:
+            legacy_peak = _legacy_peak([file for _, file in files])
+            rows.append((f'  legacy {name}', f'{size / 1e6:.1f}', '-', '-', f'{legacy_peak / 1e6:.1f}', '-'))
+
+    table(rows, ('escenario', 'MB enviados', 'status', 'heap_peak_mb', 'rss_peak_mb', 'segundos'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--legacy', nargs='*', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+    elif args.legacy is not None:
+        legacy(args.legacy)
+    else:
+        main()
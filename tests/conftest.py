@@ -0,0 +1,50 @@
+import os
+
+# Antes de importar la app: configuración de tests y almacenamiento local (sin Google)
+os.environ['FLASK_ENV'] = 'testing'
+os.environ['STORAGE_BACKEND'] = 'local'
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.config import TestingConfig
+import app.models  # noqa: F401  (registra todas las tablas para create_all)
+from app.models.user import User
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """App de tests con una base SQLite y directorios propios en tmp_path"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'club.db'}")
+    monkeypatch.setattr(TestingConfig, 'LOCAL_STORAGE_ROOT', str(tmp_path / 'storage'))
+    monkeypatch.setattr(TestingConfig, 'UPLOAD_SPOOL_DIR', str(tmp_path / 'spool'))
+    monkeypatch.setattr(TestingConfig, 'IMAGE_CACHE_DIR', str(tmp_path / 'image_cache'))
+    flask_app = create_app('testing')
+    with flask_app.app_context():
+        db.create_all()
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Crea (si hace falta) un usuario y devuelve las cabeceras con su token"""
+    def make(user_id=1, role='admin'):
+        with app.app_context():
+            if not db.session.get(User, user_id):
+                user = User(username=f'user{user_id}', email=f'user{user_id}@club.test', role=role)
+                user.id = user_id
+                user.set_password('secret')
+                db.session.add(user)
+                db.session.commit()
+            token = create_access_token(identity={'id': user_id, 'email': f'user{user_id}@club.test', 'role': role})
+        return {'Authorization': f'Bearer {token}'}
+    return make
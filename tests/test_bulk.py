@@ -0,0 +1,57 @@
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.vehicle import Vehicle
+
+BULK = '/api/vehicles/bulk'
+
+
+def _vehicle(**extra):
+    return dict({'make': 'Honda', 'model': 'CB500', 'year': 2020, 'color': 'rojo', 'license_plate': 'ABC123'}, **extra)
+
+
+def _count(app):
+    with app.app_context():
+        return Vehicle.query.count()
+
+
+def test_boolean_id_is_not_an_id(app, client, auth_headers):
+    headers = auth_headers()
+    client.post(BULK, json=[_vehicle()], headers=headers)  # vehículo 1: True == 1
+
+    response = client.post(BULK, json=[_vehicle(id=True, color='azul')], headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['results'][0]['errors'] == {'id': ['No encontrado']}
+    with app.app_context():
+        assert db.session.get(Vehicle, 1).color == 'rojo'
+
+
+def test_admin_create_for_missing_user_fails_per_item(app, client, auth_headers):
+    headers = auth_headers()
+    auth_headers(user_id=2, role='user')
+
+    response = client.post(BULK, json=[_vehicle(user_id=2), _vehicle(user_id=99)], headers=headers)
+    results = response.get_json()['results']
+
+    assert response.status_code == 207
+    assert results[0]['success'] and results[0]['created']
+    assert results[1] == {'index': 1, 'success': False, 'errors': {'user_id': ['Usuario no encontrado']}}
+    assert _count(app) == 1
+
+
+def test_database_rejection_is_a_conflict_and_writes_nothing(app, client, auth_headers, monkeypatch):
+    headers = auth_headers()
+
+    def failing_commit(session):
+        raise IntegrityError('INSERT', {}, Exception('restricción violada'))
+
+    with app.app_context():
+        session_class = type(db.session())
+    monkeypatch.setattr(session_class, 'commit', failing_commit)
+
+    response = client.post(BULK, json=[_vehicle(), _vehicle()], headers=headers)
+
+    assert response.status_code == 409
+    assert response.get_json()['success'] is False
+    monkeypatch.undo()
+    assert _count(app) == 0
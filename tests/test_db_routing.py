@@ -0,0 +1,105 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.config import TestingConfig
+from app.models.user import User
+from app.models.vehicle import Vehicle
+from app.services import db_routing
+
+
+def _seed(engine, plate, users=(1, 2)):
+    """Los mismos usuarios en cada base y un vehículo del usuario 1 con matrícula distinta"""
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@club.test',
+             'password_hash': 'x', 'role': 'admin'}
+            for user_id in users
+        ])
+        conn.execute(Vehicle.__table__.insert().values(
+            user_id=1, make='Honda', model='CB500', year=2020, color='rojo', license_plate=plate
+        ))
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch, request):
+    """App con una réplica (otro archivo SQLite); primario y réplica tienen datos distintos"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS', {'replica_0': f"sqlite:///{tmp_path / 'replica.db'}"})
+    flask_app = request.getfixturevalue('app')
+    with flask_app.app_context():
+        db.metadata.create_all(db.engines['replica_0'])
+        _seed(db.engine, 'PRIMARIO')
+        _seed(db.engines['replica_0'], 'REPLICA')
+    yield flask_app
+    # init_app registra un MetaData por bind en el db global; las apps siguientes no tienen réplica
+    db.metadatas.pop('replica_0', None)
+
+
+def _headers(flask_app, user_id=1):
+    with flask_app.app_context():
+        token = create_access_token(identity={'id': user_id, 'email': f'user{user_id}@club.test', 'role': 'admin'})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _plates(client, headers, user_id=1):
+    response = client.get(f'/api/vehicles/user/{user_id}', headers=headers)
+    assert response.status_code == 200
+    return sorted(vehicle['license_plate'] for vehicle in response.get_json()['vehicles'])
+
+
+def _create_vehicle(client, headers):
+    response = client.post('/api/vehicles/', headers=headers, data={
+        'make': 'Yamaha', 'model': 'MT07', 'year': 2021, 'color': 'azul', 'license_plate': 'NUEVO', 'vin': 'VIN', 'user_id': 1
+    })
+    assert response.status_code == 201
+
+
+def test_get_reads_from_replica(replica_app):
+    assert _plates(replica_app.test_client(), _headers(replica_app)) == ['REPLICA']
+
+
+def test_write_request_uses_primary(replica_app):
+    _create_vehicle(replica_app.test_client(), _headers(replica_app))
+
+    with replica_app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.execute(Vehicle.__table__.select().where(Vehicle.license_plate == 'NUEVO')).first()
+        with db.engines['replica_0'].connect() as conn:
+            assert not conn.execute(Vehicle.__table__.select().where(Vehicle.license_plate == 'NUEVO')).first()
+
+
+def test_get_reads_primary_after_flushing(replica_app):
+    with replica_app.test_request_context('/api/vehicles/', method='GET'):
+        assert [vehicle.license_plate for vehicle in Vehicle.query.all()] == ['REPLICA']
+
+        db.session.add(Vehicle(user_id=1, make='Yamaha', model='MT07', year=2021, color='azul', license_plate='NUEVO'))
+        db.session.flush()
+
+        # El resto del request ve su propia escritura
+        assert sorted(vehicle.license_plate for vehicle in Vehicle.query.all()) == ['NUEVO', 'PRIMARIO']
+        db.session.rollback()
+
+
+def test_user_is_pinned_to_primary_after_write(replica_app, monkeypatch):
+    client = replica_app.test_client()
+    headers = _headers(replica_app)
+    now = [1000.0]
+    monkeypatch.setattr(db_routing.time, 'monotonic', lambda: now[0])
+
+    _create_vehicle(client, headers)
+
+    assert _plates(client, headers) == ['NUEVO', 'PRIMARIO']
+    # Solo el usuario que escribió; los demás siguen en la réplica
+    assert _plates(client, _headers(replica_app, user_id=2)) == ['REPLICA']
+
+    now[0] += replica_app.config['DB_REPLICA_PIN_SECONDS'] + 1
+    assert _plates(client, headers) == ['REPLICA']
+
+
+def test_without_replicas_everything_uses_primary(app, client):
+    with app.app_context():
+        _seed(db.engine, 'PRIMARIO')
+
+    assert app.extensions['db_router'].replicas == []
+    assert _plates(client, _headers(app)) == ['PRIMARIO']
+    with app.test_request_context('/api/vehicles/', method='GET'):
+        assert db.session.get_bind() is db.engine
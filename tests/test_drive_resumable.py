@@ -0,0 +1,227 @@
+import io
+import json
+import os
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from googleapiclient.discovery import build
+from app.clients.drive import CHUNK_GRANULARITY, build_transport, upload_file_to_folder
+from app.services.upload_sessions import UploadSessionStore
+
+CHUNK = 4 * CHUNK_GRANULARITY
+CONTENT = os.urandom(2 * CHUNK + CHUNK_GRANULARITY // 2)
+
+
+class FakeDrive(ThreadingHTTPServer):
+    """
+    Servidor local con el protocolo de subida reanudable de Drive.
+
+    ``drop`` corta sin responder los PUT con datos que pasan de ``drop_from``:
+    'until_query' hasta que el cliente pregunta el offset, 'always' siempre.
+    El primer corte guarda un bloque de 256 KB del chunk, así que lo que
+    Drive tiene queda por delante de lo último que confirmó al cliente.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeDriveHandler)
+        self.sessions = {}
+        self.drop = None
+        self.drop_from = CHUNK
+        self.log = []  # ('start',) | ('query',) | ('data', inicio) | ('drop', inicio) | ('bad', inicio)
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class FakeDriveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _reply(self, status, headers=None, body=b''):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _progress(self, received):
+        return {'Range': f'bytes=0-{len(received) - 1}'} if received else {}
+
+    def do_POST(self):
+        metadata = json.loads(self._body() or b'{}')
+        upload_id = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.sessions[upload_id] = {'name': metadata.get('name'), 'data': bytearray()}
+            self.server.log.append(('start',))
+        self._reply(200, {'Location': f"{self.server.base_url}upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}"})
+
+    def do_PUT(self):
+        upload_id = re.search(r'upload_id=(\w+)', self.path).group(1)
+        content_range = self.headers['Content-Range']
+        chunk = self._body()
+        server = self.server
+        with server.lock:
+            session = server.sessions.get(upload_id)
+            if session is None:
+                return self._reply(404)
+            received = session['data']
+
+            if content_range.startswith('bytes */'):
+                server.log.append(('query',))
+                if server.drop == 'until_query':
+                    server.drop = None
+                return self._reply(308, self._progress(received))
+
+            start, end, total = map(int, re.match(r'bytes (\d+)-(\d+)/(\d+)', content_range).groups())
+            if start > len(received) or len(chunk) != end - start + 1:
+                server.log.append(('bad', start))
+                return self._reply(400)
+            # Los bytes ya guardados se ignoran, como en Drive
+            chunk = chunk[len(received) - start:]
+
+            if server.drop and start + len(chunk) > server.drop_from:
+                if not any(event[0] == 'drop' for event in server.log):
+                    received.extend(chunk[:CHUNK_GRANULARITY])
+                server.log.append(('drop', start))
+                self.close_connection = True
+                return
+
+            server.log.append(('data', start))
+            received.extend(chunk)
+            if len(received) < total:
+                return self._reply(308, self._progress(received))
+            body = json.dumps({'id': upload_id, 'name': session['name']}).encode()
+            self._reply(200, {'Content-Type': 'application/json'}, body)
+
+
+class LocalHttp:
+    """Transporte del pool que manda a FakeDrive las peticiones dirigidas a la API de Google"""
+
+    def __init__(self, base_url):
+        self.http = build_transport(timeout=5)
+        self.base_url = base_url
+
+    def request(self, uri, *args, **kwargs):
+        return self.http.request(uri.replace('https://www.googleapis.com/', self.base_url), *args, **kwargs)
+
+
+@pytest.fixture
+def fake_drive(monkeypatch):
+    # Los reintentos internos de googleapiclient no esperan entre intentos
+    monkeypatch.setattr('googleapiclient.http.time.sleep', lambda seconds: None)
+    server = FakeDrive()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _service(server):
+    return build('drive', 'v3', http=LocalHttp(server.base_url), static_discovery=True)
+
+
+def _upload(server, **options):
+    options.setdefault('chunksize', CHUNK)
+    return upload_file_to_folder(
+        _service(server), io.BytesIO(CONTENT), 'poliza.pdf', 'application/pdf', 'folder1', **options
+    )
+
+
+def _stored(server, file_id):
+    return bytes(server.sessions[file_id]['data'])
+
+
+def test_resumes_from_queried_offset_after_mid_chunk_drop(fake_drive):
+    # El segundo chunk se corta a medias (y sus reintentos) hasta que el cliente pregunta
+    fake_drive.drop = 'until_query'
+
+    result = _upload(fake_drive)
+
+    assert _stored(fake_drive, result['id']) == CONTENT
+    events = fake_drive.log
+    assert events.count(('start',)) == 1
+    # Tras el corte se pregunta el offset y se sigue desde lo que Drive guardó,
+    # no desde el último chunk confirmado al cliente
+    query = events.index(('query',))
+    assert events[query - 1] == ('drop', CHUNK)
+    resumed = next(event for event in events[query:] if event != ('query',))
+    assert resumed == ('data', CHUNK + CHUNK_GRANULARITY)
+
+
+def test_gives_up_after_max_stalls(fake_drive, app):
+    fake_drive.drop = 'always'
+    sessions = UploadSessionStore()
+
+    with app.app_context():
+        with pytest.raises(Exception):
+            _upload(fake_drive, sessions=sessions, session_key='hash:original')
+        # La sesión queda guardada con el último chunk confirmado
+        assert sessions.load('folder1:hash:original')[1] == CHUNK
+
+
+def test_resumes_saved_session_after_restart(fake_drive, app):
+    sessions = UploadSessionStore()
+    key = 'hash:original'
+
+    with app.app_context():
+        # Primer worker: el primer chunk se confirma y después todo se corta
+        fake_drive.drop = 'always'
+        with pytest.raises(Exception):
+            _upload(fake_drive, sessions=sessions, session_key=key)
+        upload_uri, offset = sessions.load(f'folder1:{key}')
+        assert offset == CHUNK
+
+        # Worker reiniciado: servicio y stream nuevos, misma clave de sesión
+        fake_drive.drop = None
+        fake_drive.log.clear()
+        result = _upload(fake_drive, sessions=sessions, session_key=key)
+
+        assert upload_uri.endswith(f"upload_id={result['id']}")
+        assert _stored(fake_drive, result['id']) == CONTENT
+        assert fake_drive.log[0] == ('query',)
+        assert ('start',) not in fake_drive.log
+        assert fake_drive.log[1] == ('data', CHUNK + CHUNK_GRANULARITY)  # el offset que Drive tenía
+        assert sessions.load(f'folder1:{key}') is None
+
+
+def test_live_session_is_not_taken_over_by_another_worker(fake_drive, app):
+    key = 'folder1:hash:original'
+
+    with app.app_context():
+        # Otro worker tiene la sesión y acaba de guardar un chunk
+        other_worker = UploadSessionStore()
+        assert other_worker.claim(key) == (True, None)
+        other_worker.save(key, 'http://127.0.0.1:1/upload?upload_id=ajena', CHUNK)
+
+        result = _upload(fake_drive, sessions=UploadSessionStore(), session_key='hash:original')
+
+        # Esta subida abre su propia sesión y no toca la guardada
+        assert fake_drive.log[0] == ('start',)
+        assert _stored(fake_drive, result['id']) == CONTENT
+        assert other_worker.load(key) == ('http://127.0.0.1:1/upload?upload_id=ajena', CHUNK)
+
+
+def test_stale_session_can_be_claimed(app):
+    key = 'folder1:hash:original'
+
+    with app.app_context():
+        UploadSessionStore().claim(key)
+        UploadSessionStore().save(key, 'http://drive/upload?upload_id=1', CHUNK)
+        assert UploadSessionStore(lease=300).claim(key) == (False, None)
+
+        # Sin guardar nada durante el lease, la sesión está libre (una sola vez)
+        assert UploadSessionStore(lease=0).claim(key) == (True, ('http://drive/upload?upload_id=1', CHUNK))
+        assert UploadSessionStore(lease=300).claim(key) == (False, None)
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from app.clients.drive import FOLDER_MIME
+from app.services.storage.drive import DriveStorageBackend
+
+
+class FakeFiles:
+    """files() de Drive sobre un dict {id: {'name', 'parents', 'mimeType'}}"""
+
+    def __init__(self, items, page_size):
+        self.items = items
+        self.page_size = page_size
+        self.created = []
+
+    def list(self, q, fields, pageSize, pageToken=None):
+        if 'in parents' in q:
+            parents = set(part.split("'")[1] for part in q.split(' or '))
+            matches = [dict(item, id=item_id) for item_id, item in self.items.items()
+                       if parents & set(item['parents'])]
+        else:
+            matches = [dict(item, id=item_id) for item_id, item in self.items.items()
+                       if item['mimeType'] == FOLDER_MIME and f"name = '{item['name']}'" in q]
+        start = int(pageToken or 0)
+        page = matches[start:start + self.page_size]
+        token = str(start + self.page_size) if start + self.page_size < len(matches) else None
+        return FakeCall({'files': page, 'nextPageToken': token})
+
+    def create(self, body, fields):
+        self.created.append(body)
+        return FakeCall({'id': f"new{len(self.created)}"})
+
+
+class FakeCall:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self, http=None):
+        return self.result
+
+
+class FakePool:
+    def __init__(self, files):
+        self._files = files
+        self.checked_out = 0
+
+    @contextmanager
+    def checkout(self):
+        self.checked_out += 1
+        try:
+            yield self
+        finally:
+            self.checked_out -= 1
+
+    def files(self):
+        return self._files
+
+
+def _folder(name, parent=None):
+    return {'name': name, 'parents': [parent] if parent else [], 'mimeType': FOLDER_MIME}
+
+
+def _file(name, parent):
+    return {'name': name, 'parents': [parent], 'mimeType': 'image/jpeg', 'modifiedTime': '2026-01-01T00:00:00Z'}
+
+
+def test_iter_files_missing_folder_yields_nothing_and_creates_nothing():
+    files = FakeFiles({'v': _folder('Vehicles')}, page_size=10)
+    backend = DriveStorageBackend(FakePool(files))
+
+    assert list(backend.iter_files(['Vehicles', 'user_9'])) == []
+    assert files.created == []
+
+
+def test_iter_files_checks_out_a_service_per_page():
+    items = {'v': _folder('Vehicles'), 'u1': _folder('user_1', 'v')}
+    items.update({f'f{n}': _file(f'{n}.jpg', 'u1') for n in range(5)})
+    pool = FakePool(FakeFiles(items, page_size=2))
+    backend = DriveStorageBackend(pool)
+
+    seen = []
+    for page in backend.iter_files(['Vehicles']):
+        # Mientras se procesa la página no hay ningún servicio prestado
+        assert pool.checked_out == 0
+        seen.extend(item['id'] for item in page)
+
+    assert sorted(seen) == [f'f{n}' for n in range(5)]
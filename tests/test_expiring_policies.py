@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+from app import db
+from app.models.insurance_policy import InsurancePolicy
+from app.models.vehicle import Vehicle
+
+
+def _add_policies(app, user_id, days_left):
+    """Un vehículo del usuario con una póliza por cada vencimiento (días desde hoy)"""
+    with app.app_context():
+        vehicle = Vehicle(user_id=user_id, make='Honda', model='CB500', year=2020, color='rojo', license_plate='ABC123')
+        db.session.add(vehicle)
+        db.session.flush()
+        today = date.today()
+        db.session.add_all(
+            InsurancePolicy(vehicle_id=vehicle.id, user_id=user_id, company='Seguros', policy_number=f'P{n}',
+                            start_date=today - timedelta(days=365), end_date=today + timedelta(days=days))
+            for n, days in enumerate(days_left)
+        )
+        db.session.commit()
+
+
+def test_expiring_total_counts_only_expiring_policies(app, client, auth_headers):
+    headers = auth_headers()
+    auth_headers(user_id=2, role='user')
+    _add_policies(app, 1, [0, 5, 29, 31, 200, -3])
+    _add_policies(app, 2, [10, 400])
+
+    response = client.get('/api/insurance-policies/expiring?limit=2&total=true', headers=headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['total'] == 4
+    assert len(data['policies']) == 2 and data['next_cursor']
+
+    # Las páginas siguientes informan el mismo total y completan la lista
+    seen = [policy['id'] for policy in data['policies']]
+    while data['next_cursor']:
+        data = client.get(
+            f"/api/insurance-policies/expiring?limit=2&total=true&cursor={data['next_cursor']}", headers=headers
+        ).get_json()
+        assert data['total'] == 4
+        seen.extend(policy['id'] for policy in data['policies'])
+    assert len(seen) == 4
+
+
+def test_expiring_total_is_scoped_to_the_user(app, client, auth_headers):
+    auth_headers()
+    headers = auth_headers(user_id=2, role='user')
+    _add_policies(app, 1, [1, 2, 3])
+    _add_policies(app, 2, [4, 90])
+
+    data = client.get('/api/insurance-policies/expiring?limit=10&total=true', headers=headers).get_json()
+
+    assert data['total'] == 1
+    assert len(data['policies']) == 1
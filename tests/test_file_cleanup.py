@@ -0,0 +1,56 @@
+import io
+import pytest
+from app import db, storage
+from app.models.vehicle import Vehicle
+from app.models.vehicle_image import VehicleImage
+
+
+def _vehicle_with_image(app):
+    """Vehículo 1 del usuario 1 con una imagen (tres variantes) en el almacenamiento local"""
+    with app.app_context():
+        vehicle = Vehicle(user_id=1, make='Honda', model='CB500', year=2020, color='rojo', license_plate='ABC123')
+        db.session.add(vehicle)
+        db.session.flush()
+        urls = [
+            storage.upload(io.BytesIO(b'imagen ' + name.encode()), f'{name}.jpg', 'image/jpeg', ['Vehicles', 'user_1'])['url']
+            for name in ('full', 'medium', 'thumbnail')
+        ]
+        image = VehicleImage(vehicle_id=vehicle.id, image_path=urls[0], medium_path=urls[1], thumbnail_path=urls[2])
+        db.session.add(image)
+        db.session.commit()
+        return vehicle.id, image.id, [storage.file_id(url) for url in urls]
+
+
+def _exists(app, file_ids):
+    with app.app_context():
+        return [storage.exists(file_id) for file_id in file_ids]
+
+
+@pytest.mark.parametrize('path', ['/api/vehicles/{vehicle_id}', '/api/vehicle-images/{image_id}', '/api/users/1'])
+def test_files_are_deleted_after_commit(app, client, auth_headers, path):
+    headers = auth_headers()
+    vehicle_id, image_id, file_ids = _vehicle_with_image(app)
+
+    response = client.delete(path.format(vehicle_id=vehicle_id, image_id=image_id), headers=headers)
+
+    assert response.status_code == 200
+    assert _exists(app, file_ids) == [False, False, False]
+
+
+@pytest.mark.parametrize('path', ['/api/vehicles/{vehicle_id}', '/api/vehicle-images/{image_id}', '/api/users/1'])
+def test_files_survive_failed_commit(app, client, auth_headers, monkeypatch, path):
+    headers = auth_headers()
+    vehicle_id, image_id, file_ids = _vehicle_with_image(app)
+
+    def failing_commit(session):
+        raise RuntimeError('commit fallido')
+
+    with app.app_context():
+        session_class = type(db.session())
+    monkeypatch.setattr(session_class, 'commit', failing_commit)
+    app.config['PROPAGATE_EXCEPTIONS'] = False  # el error del commit llega como 500
+
+    response = client.delete(path.format(vehicle_id=vehicle_id, image_id=image_id), headers=headers)
+
+    assert response.status_code >= 400
+    assert _exists(app, file_ids) == [True, True, True]
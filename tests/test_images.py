@@ -0,0 +1,27 @@
+from PIL import Image
+from app.utils import images
+
+
+def _noisy_image():
+    return Image.effect_noise((640, 480), 60).convert('RGB')
+
+
+def test_adaptive_quality_encodes_once_when_it_fits(monkeypatch):
+    saves = []
+    original = images._save
+    monkeypatch.setattr(images, '_save', lambda *args: saves.append(args[-1]) or original(*args))
+
+    output, mime, _ = images._encode(_noisy_image(), 'image/jpeg', 80, target_bytes=10 * 1024 * 1024)
+
+    assert saves == [80]
+    assert mime == 'image/jpeg' and Image.open(output).format == 'JPEG'
+
+
+def test_adaptive_quality_meets_target():
+    image = _noisy_image()
+    full, _, _ = images._encode(image, 'image/jpeg', 80)
+    target = len(full.getvalue()) * 3 // 4
+
+    output, _, _ = images._encode(image, 'image/jpeg', 80, target_bytes=target)
+
+    assert len(output.getvalue()) <= target
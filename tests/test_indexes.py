@@ -0,0 +1,127 @@
+import os
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models.emergency_contact import EmergencyContact
+from app.models.insurance_policy import InsurancePolicy
+from app.models.user import User
+from app.models.vehicle import Vehicle
+from app.models.vehicle_image import VehicleImage
+
+TODAY = date(2026, 1, 1)
+
+# (consulta caliente, índice que debe usar); {dialecto: nombre} si el nombre depende de la base
+HOT_QUERIES = {
+    'login_by_email': (
+        select(User).where(User.email == 'user1@club.test'),
+        # Índice de la restricción UNIQUE de email
+        {'sqlite': 'sqlite_autoindex_users_2', 'mysql': 'email'},
+    ),
+    'vehicles_by_user': (
+        select(Vehicle).where(Vehicle.user_id == 1),
+        'ix_vehicles_user_id',
+    ),
+    'images_by_vehicle': (
+        select(VehicleImage).where(VehicleImage.vehicle_id == 1),
+        'ix_vehicle_images_vehicle_id',
+    ),
+    'policies_by_vehicle': (
+        select(InsurancePolicy).where(InsurancePolicy.vehicle_id == 1),
+        'ix_insurance_policies_vehicle_id',
+    ),
+    'expiring_policies_admin': (
+        # /expiring de un admin: rango de end_date sin filtro de usuario, con el vehículo
+        select(InsurancePolicy, Vehicle).join(Vehicle)
+        .where(InsurancePolicy.end_date.between(TODAY, TODAY + timedelta(days=30)))
+        .order_by(InsurancePolicy.end_date, InsurancePolicy.id),
+        'ix_insurance_policies_end_date',
+    ),
+    'policies_by_user_end_date': (
+        select(InsurancePolicy)
+        .where(InsurancePolicy.user_id == 1, InsurancePolicy.end_date.between(TODAY, TODAY + timedelta(days=30)))
+        .order_by(InsurancePolicy.end_date, InsurancePolicy.id),
+        'ix_insurance_policies_user_id_end_date',
+    ),
+    'contacts_by_user': (
+        select(EmergencyContact).where(EmergencyContact.user_id == 1),
+        'ix_emergency_contacts_user_id',
+    ),
+}
+
+
+def _sql(statement, engine):
+    return str(statement.compile(engine, compile_kwargs={'literal_binds': True}))
+
+
+def _index_name(index, engine):
+    return index[engine.dialect.name] if isinstance(index, dict) else index
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_sqlite_query_plan_uses_index(app, name):
+    statement, index = HOT_QUERIES[name]
+    with app.app_context():
+        with db.engine.connect() as conn:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {_sql(statement, db.engine)}").all()
+
+        index = _index_name(index, db.engine)
+
+    details = ' | '.join(row[-1] for row in plan)
+    assert f'INDEX {index}' in details, details
+
+
+@pytest.fixture
+def mysql_engine():
+    """Base MySQL vacía indicada en TEST_MYSQL_URL (mysql+pymysql://...); sin ella el test se salta"""
+    url = os.environ.get('TEST_MYSQL_URL')
+    if not url:
+        pytest.skip('TEST_MYSQL_URL no configurada')
+    engine = create_engine(url)
+    try:
+        with engine.connect():
+            pass
+    except OperationalError as e:
+        pytest.skip(f'MySQL no disponible: {e}')
+    db.metadata.create_all(engine)
+    yield engine
+    db.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def _fill(conn):
+    # Con las tablas vacías el optimizador de MySQL prefiere recorrerlas enteras
+    users = [{'id': n, 'username': f'user{n}', 'email': f'user{n}@club.test', 'password_hash': 'x', 'role': 'user'}
+             for n in range(1, 51)]
+    conn.execute(text(
+        "INSERT INTO users (id, username, email, password_hash, role) VALUES (:id, :username, :email, :password_hash, :role)"
+    ), users)
+    vehicles = [{'id': n, 'user_id': n % 50 + 1} for n in range(1, 501)]
+    conn.execute(text(
+        "INSERT INTO vehicles (id, user_id, make, model, year, color, license_plate) "
+        "VALUES (:id, :user_id, 'Honda', 'CB500', 2020, 'rojo', 'ABC123')"
+    ), vehicles)
+    conn.execute(text(
+        "INSERT INTO vehicle_images (vehicle_id, image_path, upload_status) VALUES (:id, 'img.jpg', 'ready')"
+    ), vehicles)
+    conn.execute(text(
+        "INSERT INTO insurance_policies (vehicle_id, user_id, company, policy_number, start_date, end_date) "
+        "VALUES (:id, :user_id, 'Seguros', 'P', '2025-01-01', DATE_ADD('2026-01-01', INTERVAL :id DAY))"
+    ), vehicles)
+    conn.execute(text(
+        "INSERT INTO emergency_contacts (user_id, name, phone_number, relationship) VALUES (:user_id, 'Ana', '600', 'madre')"
+    ), vehicles)
+    for table in ('users', 'vehicles', 'vehicle_images', 'insurance_policies', 'emergency_contacts'):
+        conn.execute(text(f"ANALYZE TABLE {table}"))
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_mysql_explain_uses_index(mysql_engine, name):
+    statement, index = HOT_QUERIES[name]
+    with mysql_engine.begin() as conn:
+        _fill(conn)
+        plan = conn.exec_driver_sql(f"EXPLAIN {_sql(statement, mysql_engine)}").mappings().all()
+
+    # Con join hay una fila por tabla: basta con que la tabla filtrada use el índice
+    assert _index_name(index, mysql_engine) in [row['key'] for row in plan], plan
@@ -0,0 +1,51 @@
+from unittest import mock
+from app import db
+from app.models.vehicle import Vehicle
+from app.utils import pagination
+from app.utils.pagination import keyset_page
+
+
+def _add_vehicles(app, auth_headers, owners):
+    for user_id in set(owners):
+        auth_headers(user_id=user_id, role='user')
+    with app.app_context():
+        db.session.add_all(
+            Vehicle(user_id=user_id, make='Honda', model='CB500', year=2020, color='rojo', license_plate=f'P{n}')
+            for n, user_id in enumerate(owners)
+        )
+        db.session.commit()
+
+
+def test_total_counts_the_filtered_query(app, auth_headers):
+    _add_vehicles(app, auth_headers, [1, 1, 2, 2, 2])
+
+    with app.test_request_context('/?limit=1&total=true'):
+        with mock.patch.object(pagination, 'approximate_count') as estimate:
+            items, page = keyset_page(Vehicle.query.filter_by(user_id=1), Vehicle.id)
+
+    assert page['total'] == 2
+    assert len(items) == 1 and page['next_cursor']
+    estimate.assert_not_called()
+
+
+def test_total_counts_remaining_pages_the_same(app, auth_headers):
+    _add_vehicles(app, auth_headers, [1, 1, 1, 2])
+
+    with app.test_request_context('/?limit=2&total=true'):
+        _, first = keyset_page(Vehicle.query.filter_by(user_id=1), Vehicle.id)
+    with app.test_request_context(f"/?limit=2&total=true&cursor={first['next_cursor']}"):
+        items, second = keyset_page(Vehicle.query.filter_by(user_id=1), Vehicle.id)
+
+    assert first['total'] == second['total'] == 3
+    assert len(items) == 1 and second['next_cursor'] is None
+
+
+def test_total_of_whole_table_uses_the_estimate(app, auth_headers):
+    _add_vehicles(app, auth_headers, [1, 2])
+
+    with app.test_request_context('/?limit=1&total=true'):
+        with mock.patch.object(pagination, 'approximate_count', return_value=42) as estimate:
+            _, page = keyset_page(Vehicle.query, Vehicle.id)
+
+    assert page['total'] == 42
+    estimate.assert_called_once_with(Vehicle)
@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+import pytest
+from app import db
+from app.models.emergency_contact import EmergencyContact
+from app.models.insurance_policy import InsurancePolicy
+from app.models.vehicle import Vehicle
+from app.models.vehicle_image import VehicleImage
+
+PATHS = ['/api/vehicles/user/1', '/api/vehicles/', '/api/users/1/profile']
+
+
+def _add_vehicles(app, count, images_per_vehicle=3):
+    """Vehículos del usuario 1, cada uno con varias imágenes, una póliza y un contacto"""
+    with app.app_context():
+        for _ in range(count):
+            vehicle = Vehicle(user_id=1, make='Honda', model='CB500', year=2020, color='rojo', license_plate='ABC123')
+            db.session.add(vehicle)
+            db.session.flush()
+            db.session.add_all(
+                VehicleImage(vehicle_id=vehicle.id, image_path=f'/files/{vehicle.id}_{n}.jpg',
+                             thumbnail_path=f'/files/{vehicle.id}_{n}_thumb.jpg', upload_status='ready')
+                for n in range(images_per_vehicle)
+            )
+            db.session.add(InsurancePolicy(vehicle_id=vehicle.id, user_id=1, company='Seguros', policy_number='P',
+                                           start_date=date.today(), end_date=date.today() + timedelta(days=365)))
+            db.session.add(EmergencyContact(user_id=1, name='Ana', relationship='madre', phone_number='600'))
+        db.session.commit()
+
+
+def _query_count(client, headers, path):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    vehicles = response.get_json()['vehicles']
+    assert vehicles and all(vehicle['image_content_url'] for vehicle in vehicles)
+    return int(response.headers['X-Query-Count'])
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_query_count_does_not_grow_with_vehicles(app, client, auth_headers, path):
+    headers = auth_headers()
+
+    _add_vehicles(app, 1)
+    with_one = _query_count(client, headers, path)
+    _add_vehicles(app, 9)
+    with_ten = _query_count(client, headers, path)
+
+    assert with_one == with_ten
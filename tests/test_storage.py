@@ -0,0 +1,37 @@
+import io
+from app import db
+from app.models.stored_blob import StoredBlob
+from app.services.storage import Storage
+
+
+class SharedSessionBackend:
+    """Backend cuya subida termina en el archivo que otro worker ya indexó (misma sesión reanudable)"""
+
+    name = 'drive'
+
+    def __init__(self, storage, file_id):
+        self.storage = storage
+        self.file_id = file_id
+        self.deleted = []
+
+    def upload(self, file_stream, filename, mimetype, folder_parts, resume_key=None):
+        # El otro worker registra el archivo mientras esta subida termina
+        self.storage.index.register(self.name, 'hash', 'original', {'id': self.file_id, 'url': 'u', 'name': 'n'})
+        return {'id': self.file_id, 'url': 'u', 'name': 'n'}
+
+    def delete(self, file_id):
+        self.deleted.append(file_id)
+
+
+def test_upload_losing_race_on_same_file_keeps_it(app):
+    storage = Storage()
+    storage.dedup = True
+    storage.backend = SharedSessionBackend(storage, 'drive-file-1')
+
+    with app.app_context():
+        uploaded = storage.upload(io.BytesIO(b'x'), 'a.pdf', 'application/pdf', ['Policies'], content_hash='hash')
+
+        assert uploaded['id'] == 'drive-file-1'
+        assert storage.backend.deleted == []
+        # Las dos subidas tienen su referencia al mismo archivo
+        assert db.session.query(StoredBlob.ref_count).filter_by(file_id='drive-file-1').scalar() == 2
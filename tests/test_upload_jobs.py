@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.upload_job import UploadJob
+from app.services.upload_jobs import UploadJobQueue
+
+
+def _enqueue_broken_job(app, queue):
+    """Trabajo cuyo archivo en spool no existe: cada intento falla"""
+    item = {
+        'target_id': 1, 'spool_path': '/nonexistent/upload.pdf', 'mimetype': 'application/pdf',
+        'filename': 'upload.pdf', 'compress': False,
+    }
+    job = queue.enqueue(UploadJob.KIND_INSURANCE_POLICY, 1, ['insurance_policies', 'user_1'], [item])
+    db.session.commit()
+    return job.id
+
+
+def test_failed_job_waits_before_retry(app, auth_headers):
+    auth_headers()
+    from app import upload_jobs
+
+    with app.app_context():
+        job_id = _enqueue_broken_job(app, upload_jobs)
+        assert upload_jobs.run_pending() == 1
+
+        job = db.session.get(UploadJob, job_id)
+        assert job.status == UploadJob.STATUS_PENDING
+        assert job.attempts == 1
+        assert job.next_attempt_at > datetime.utcnow() + timedelta(seconds=upload_jobs.retry_delay - 5)
+
+        # Dentro de la espera no se vuelve a reclamar
+        assert upload_jobs.claim_next() is None
+
+        job.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        claimed = upload_jobs.claim_next()
+        assert claimed is not None and claimed.id == job_id and claimed.attempts == 2
+
+
+def test_retry_delay_doubles(app):
+    from app import upload_jobs
+
+    assert [upload_jobs.retry_delay_for(n) for n in (1, 2, 3)] == [
+        upload_jobs.retry_delay, upload_jobs.retry_delay * 2, upload_jobs.retry_delay * 4
+    ]
+
+
+def test_worker_starts_with_first_request_only(app, client, monkeypatch):
+    app.config['TESTING'] = False
+    app.config['UPLOAD_WORKER_ENABLED'] = True
+    queue = UploadJobQueue()
+    started = []
+    monkeypatch.setattr(queue, 'start_worker', lambda flask_app: started.append(flask_app))
+
+    queue.init_app(app)
+    assert started == []  # create_app / comandos CLI no arrancan el hilo
+
+    client.get('/health')
+    assert started == [app]